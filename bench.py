@@ -0,0 +1,133 @@
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from docstosaurus.arraytree import categorize_lines_array, np
+from docstosaurus.engine import categorize_lines
+from docstosaurus.hooks import Hooks
+from docstosaurus.scan import scan_outline
+from docstosaurus.stats import outline_stats
+
+
+def generate_outline(path, line_count, seed=0):
+    """
+    Writes a synthetic nested list with body lines, blank lines and duplicate titles.
+
+    Args:
+        path (str): Where to write the outline.
+        line_count (int): The number of lines to generate.
+        seed (int): Seed for the random generator.
+    """
+    rng = random.Random(seed)
+    depth = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for number in range(line_count):
+            roll = rng.random()
+            if roll < 0.05:
+                f.write('\n')
+                continue
+            if roll < 0.15 and number:
+                f.write('  ' * (depth + 1) + f'- **Body line {number} for the page above**\n')
+                continue
+            depth = max(0, min(depth + rng.choice((-2, -1, 0, 0, 1, 1)), 12))
+            f.write('  ' * depth + f'- Node {rng.randrange(1000)} title text {number}\n')
+
+
+def timed(label, func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<40} {best * 1000:10.1f} ms")
+    return result
+
+
+def read_text(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        list_content = [line.rstrip() for line in f]
+    indent_levels = [len(line) - len(line.lstrip()) for line in list_content]
+    return list_content, indent_levels
+
+
+def read_scanned(path):
+    with scan_outline(path) as scan:
+        return scan.lines()
+
+
+def bench_reading(path, repeat):
+    print("== Reading lines and indentation ==")
+    timed("text mode + rstrip/lstrip", lambda: read_text(path), repeat)
+    timed("scan_outline (chunked)", lambda: read_scanned(path), repeat)
+    print("== Reading and categorizing ==")
+    timed("text mode + categorize_lines", lambda: categorize_lines(read_text(path)[0]), repeat)
+    timed("scan_outline + categorize_lines", lambda: categorize_lines(*read_scanned(path)), repeat)
+    timed("outline_stats (streaming, no tree)", lambda: outline_stats(path), repeat)
+
+
+def walk(node):
+    # Touch what create_structure reads from every node
+    for child in node.get('Children', []):
+        child['Content'], child['UniqueID'], child['BodyLines']
+        walk(child)
+
+
+def bench_parsing(path, repeat):
+    print("== Parsing (dict stack vs NumPy arrays) ==")
+    if np is None:
+        print("NumPy is not installed, skipping categorize_lines_array")
+        return
+    list_content, indent_levels = read_scanned(path)
+    timed("categorize_lines", lambda: categorize_lines(list_content, indent_levels), repeat)
+    hooks = Hooks()
+    hooks.add_listener(lambda events: None)
+    timed("categorize_lines + event listener",
+          lambda: categorize_lines(list_content, indent_levels, hooks=hooks), repeat)
+    timed("categorize_lines_array", lambda: categorize_lines_array(list_content, indent_levels), repeat)
+    timed("categorize_lines + full walk", lambda: walk(categorize_lines(list_content, indent_levels)), repeat)
+    timed("categorize_lines_array + full walk",
+          lambda: walk(categorize_lines_array(list_content, indent_levels).root()), repeat)
+
+
+def import_time(statement):
+    # A fresh interpreter each run, so nothing is already in sys.modules
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', statement], check=True)
+    return time.perf_counter() - start
+
+
+def bench_import(repeat):
+    print("== Import time (fresh interpreter) ==")
+    timed("python -c pass", lambda: import_time('pass'), repeat)
+    timed("import docstosaurus", lambda: import_time('import docstosaurus'), repeat)
+    timed("import docstosaurus.gui", lambda: import_time('import docstosaurus.gui'), repeat)
+    loaded = subprocess.run(
+        [sys.executable, '-c', "import sys, docstosaurus; print(' '.join("
+         "m for m in ('tkinter', 'hashlib') if m in sys.modules))"],
+        check=True, capture_output=True, text=True).stdout.split()
+    if loaded:
+        print(f"import docstosaurus loaded {', '.join(loaded)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the outline conversion engine.")
+    parser.add_argument('--lines', type=int, default=200000, help="Lines in the synthetic outline")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement, best is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'outline.md')
+        generate_outline(path, args.lines)
+        print(f"Outline: {args.lines} lines, {os.path.getsize(path)} bytes")
+        bench_import(args.repeat)
+        bench_reading(path, args.repeat)
+        bench_parsing(path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
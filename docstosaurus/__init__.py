@@ -0,0 +1,48 @@
+"""
+Docstosaurus converts a nested list into a tree of directories and Markdown files.
+
+The conversion engine is importable without tkinter; the GUI lives in docstosaurus.gui
+and each command line tool runs as ``python -m docstosaurus.<tool>``.
+"""
+from .engine import (
+    alternative_sanitize_and_clean_name,
+    categorize_lines,
+    configure_logging,
+    content_truncation,
+    create_structure,
+    d2cgood_alternative_sanitize_and_clean_name,
+    escape_title,
+    front_matter,
+    generate_unique_id,
+    make_sanitizer,
+    page_layout,
+    page_title,
+    sanitize_and_clean_name,
+    set_content_titles,
+    truncate_name,
+    write_md_file,
+    write_page,
+)
+from .hooks import Hooks, Throughput
+
+__all__ = [
+    'Hooks',
+    'Throughput',
+    'alternative_sanitize_and_clean_name',
+    'categorize_lines',
+    'configure_logging',
+    'content_truncation',
+    'create_structure',
+    'd2cgood_alternative_sanitize_and_clean_name',
+    'escape_title',
+    'front_matter',
+    'generate_unique_id',
+    'make_sanitizer',
+    'page_layout',
+    'page_title',
+    'sanitize_and_clean_name',
+    'set_content_titles',
+    'truncate_name',
+    'write_md_file',
+    'write_page',
+]
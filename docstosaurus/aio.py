@@ -0,0 +1,135 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .engine import content_truncation, page_layout, sanitize_and_clean_name, write_page
+from .importers import load_outline
+from .plan import plan_structure, summarize_plan, write_entry
+
+# Files written between two 'writing' progress events
+PROGRESS_EVERY = 256
+
+
+def _make_directories(plan):
+    for entry in plan:
+        if entry['Kind'] == 'directory':
+            os.makedirs(entry['Path'], exist_ok=True)
+        elif entry['Kind'] == 'bucket':
+            write_entry(entry)
+
+
+def _write_entry(entry, include_base):
+    child = entry['Node']
+    write_page(entry['File'], page_layout(child), child.get('BodyLines', []), include_base)
+
+
+async def convert_events(input_file, base_dir, sanitize_function=sanitize_and_clean_name, allow_empty_folders=False,
+                         concurrency=8, executor=None, budget=None):
+    """
+    Converts an outline without blocking the event loop, yielding progress events.
+
+    Parsing and planning run in the thread pool. Files are then written by
+    `concurrency` tasks that each hand one file at a time to the pool, so no more
+    than that many writes are in flight. A file that the outline writes more than
+    once is only written with its final content, which makes the order of the
+    writes irrelevant and the result identical to create_structure.
+
+    Cancelling the task iterating the events stops new writes from starting;
+    writes already handed to a thread finish.
+
+    Args:
+        input_file (str): The outline file, in any format load_outline reads.
+        base_dir (str): The base directory to write into.
+        sanitize_function (function): The function to use for sanitizing names.
+        allow_empty_folders (bool): Whether to allow empty folders.
+        concurrency (int): How many files are written at once.
+        executor (Executor, optional): The pool to run blocking work in. A private
+            one with `concurrency` threads is used by default.
+        budget (Budget, optional): Limits enforced while parsing and planning;
+            BudgetExceeded is raised before anything is written.
+
+    Yields:
+        dict: Events with a 'Stage' of 'parsed', 'planned', 'writing' or 'done'.
+        'planned' and 'done' carry the plan 'Summary'; 'writing' and 'done' carry
+        'Done' and 'Total' file counts.
+    """
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+    workers = []
+    runner = None
+    started = time.perf_counter()
+    try:
+        root = await loop.run_in_executor(executor, load_outline, input_file, budget, None,
+                                          content_truncation(sanitize_function))
+        yield {'Stage': 'parsed'}
+
+        include_base = os.path.dirname(os.path.abspath(input_file))
+        plan = await loop.run_in_executor(executor, plan_structure, root, base_dir, sanitize_function,
+                                          allow_empty_folders, None, include_base, budget)
+        summary = summarize_plan(plan)
+        yield {'Stage': 'planned', 'Summary': summary}
+
+        # Only the last write to each path is visible in the result
+        final = {}
+        for entry in plan:
+            if entry['File']:
+                final[entry['File']] = entry
+        total = len(final)
+
+        os.makedirs(base_dir, exist_ok=True)
+        await loop.run_in_executor(executor, _make_directories, plan)
+
+        queue = asyncio.Queue()
+        entries = iter(final.values())
+        progress = {'Done': 0}
+
+        async def worker():
+            # The iterator is shared, each entry goes to whichever worker is free
+            for entry in entries:
+                await loop.run_in_executor(executor, _write_entry, entry, include_base)
+                progress['Done'] += 1
+                if progress['Done'] % PROGRESS_EVERY == 0:
+                    queue.put_nowait({'Stage': 'writing', 'Done': progress['Done'], 'Total': total})
+
+        async def run_workers():
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                queue.put_nowait(None)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(max(1, concurrency))]
+        runner = asyncio.ensure_future(run_workers())
+        while True:
+            event = await queue.get()
+            if event is None:
+                break
+            yield event
+        await runner  # Raises the first failed write
+
+        yield {'Stage': 'done', 'Done': progress['Done'], 'Total': total, 'Summary': summary,
+               'Seconds': time.perf_counter() - started}
+    finally:
+        for task in workers:
+            task.cancel()
+        if runner is not None:
+            runner.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def convert_async(input_file, base_dir, sanitize_function=sanitize_and_clean_name, allow_empty_folders=False,
+                        concurrency=8, executor=None, budget=None):
+    """
+    Converts an outline without blocking the event loop, see convert_events.
+
+    Returns:
+        dict: The final 'done' event.
+    """
+    event = None
+    async for event in convert_events(input_file, base_dir, sanitize_function, allow_empty_folders,
+                                      concurrency, executor, budget):
+        pass
+    return event
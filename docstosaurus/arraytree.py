@@ -0,0 +1,233 @@
+import re
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, only this parser needs it
+    np = None
+
+from .engine import generate_unique_id, sanitize_and_clean_name
+
+# Lines made only of these characters may sanitize to nothing; any other character
+# always survives sanitize_and_clean_name, so only these lines need the full check.
+_MAYBE_EMPTY = re.compile(r'[\s.\-<>:"/\\|?]*')
+
+# Above this many distinct indent levels the per-level passes cost more than a stack
+_MAX_VECTOR_LEVELS = 64
+
+
+class ArrayTree:
+    """
+    Array-backed hierarchy produced by `categorize_lines_array`.
+
+    Node i is described by parallel arrays instead of a dict per node:
+
+        line_index[i]    index of the node's line in the source lines (its title)
+        indent[i]        indentation of the line
+        parent[i]        parent node, -1 for top-level nodes
+        first_child[i]   first child node, -1 for leaves
+        next_sibling[i]  next node with the same parent, -1 for the last one
+        body_start[i], body_end[i]
+                         slice of `body_index` holding the node's body line indices
+
+    Content and unique IDs are computed only when a node is visited, with long
+    titles shortened by `truncation`.
+    """
+
+    def __init__(self, lines, line_index, indent, parent, first_child, next_sibling,
+                 root_first_child, body_index, body_start, body_end, truncation='middle'):
+        self.lines = lines
+        self.line_index = line_index
+        self.indent = indent
+        self.parent = parent
+        self.first_child = first_child
+        self.next_sibling = next_sibling
+        self.root_first_child = root_first_child
+        self.body_index = body_index
+        self.body_start = body_start
+        self.body_end = body_end
+        self.truncation = truncation
+        # Plain lists are much faster than NumPy scalars for walking one node at a time
+        self._line_index = line_index.tolist()
+        self._indent = indent.tolist()
+        self._first_child = first_child.tolist()
+        self._next_sibling = next_sibling.tolist()
+        self._body_index = body_index.tolist()
+        self._body_start = body_start.tolist()
+        self._body_end = body_end.tolist()
+        self._content = [None] * len(self._line_index)
+
+    def __len__(self):
+        return len(self._line_index)
+
+    def root(self):
+        return ArrayNode(self, -1)
+
+    def children(self, index):
+        child = self.root_first_child if index < 0 else self._first_child[index]
+        next_sibling = self._next_sibling
+        children = []
+        while child >= 0:
+            children.append(child)
+            child = next_sibling[child]
+        return children
+
+    def full_line(self, index):
+        return self.lines[self._line_index[index]]
+
+    def content(self, index):
+        content = self._content[index]
+        if content is None:
+            content = sanitize_and_clean_name(self.full_line(index), truncation=self.truncation).strip()
+            self._content[index] = content
+        return content
+
+    def unique_id(self, index):
+        return generate_unique_id(f"{self._indent[index]}_{self.content(index)}_{self._line_index[index] + 1}")
+
+    def body_lines(self, index):
+        if index < 0:
+            return []
+        lines = self.lines
+        return [lines[i].rstrip() for i in self._body_index[self._body_start[index]:self._body_end[index]]]
+
+    def to_dict(self):
+        """
+        Converts the tree into the nested dicts `categorize_lines` returns.
+        """
+        def build(index):
+            return {
+                'IndentLevel': self._indent[index],
+                'Content': self.content(index),
+                'Children': [build(child) for child in self.children(index)],
+                'BodyLines': self.body_lines(index),
+                'UniqueID': self.unique_id(index),
+                'FULLLINE': self.full_line(index)
+            }
+
+        return {'Children': [build(child) for child in self.children(-1)], 'BodyLines': [], 'UniqueID': 'root'}
+
+
+class ArrayNode:
+    """
+    Read-only view of one ArrayTree node with the keys of a `categorize_lines` node,
+    so `create_structure` can walk an ArrayTree unchanged. Index -1 is the root.
+    """
+
+    __slots__ = ('tree', 'index')
+
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+
+    def __getitem__(self, key):
+        tree = self.tree
+        index = self.index
+        if key == 'Children':
+            return [ArrayNode(tree, child) for child in tree.children(index)]
+        if key == 'BodyLines':
+            return tree.body_lines(index)
+        if key == 'UniqueID':
+            return 'root' if index < 0 else tree.unique_id(index)
+        if index >= 0:
+            if key == 'Content':
+                return tree.content(index)
+            if key == 'FULLLINE':
+                return tree.full_line(index)
+            if key == 'IndentLevel':
+                return tree._indent[index]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+def _parents_by_level(indent):
+    """
+    Finds each node's parent, the nearest earlier node with a smaller indent, with
+    one vectorized pass per distinct indent level.
+    """
+    positions = np.arange(len(indent))
+    parent = np.full(len(indent), -1, dtype=np.int64)
+    for level in np.unique(indent):
+        # Latest earlier node shallower than this level, at every position
+        shallower = np.maximum.accumulate(np.where(indent < level, positions, -1))
+        at_level = indent == level
+        parent[at_level] = shallower[at_level]
+    return parent
+
+
+def _parents_by_stack(indent):
+    parent = np.full(len(indent), -1, dtype=np.int64)
+    stack = []
+    for position, level in enumerate(indent.tolist()):
+        while stack and stack[-1][1] >= level:
+            stack.pop()
+        if stack:
+            parent[position] = stack[-1][0]
+        stack.append((position, level))
+    return parent
+
+
+def categorize_lines_array(list_content, indent_levels=None, truncation='middle'):
+    """
+    Alternate `categorize_lines` that computes indentation and parent links for all
+    lines as NumPy arrays instead of building a dict per node on a stack.
+
+    Args:
+        list_content (list): The list of lines to categorize.
+        indent_levels (sequence, optional): Precomputed indentation per line, as
+            produced by `scan_outline`.
+        truncation (str): How long titles are shortened in each node's Content.
+
+    Returns:
+        ArrayTree: The hierarchy. Use `tree.root()` to walk it with `create_structure`.
+    """
+    if np is None:
+        raise ImportError("categorize_lines_array requires NumPy")
+
+    if indent_levels is None:
+        indent_levels = [len(line) - len(line.lstrip()) for line in list_content]
+
+    # Classify every line: skipped (empty after sanitizing), body line or node
+    maybe_empty = _MAYBE_EMPTY.fullmatch
+    empty = np.array([not line or (maybe_empty(line) is not None
+                                   and not sanitize_and_clean_name(line, truncation=truncation).strip())
+                      for line in list_content], dtype=bool)
+    body = np.array(['**' in line for line in list_content], dtype=bool)
+    node_index = np.flatnonzero(~empty & ~body)
+    body_index = np.flatnonzero(~empty & body)
+    indent = np.asarray(indent_levels, dtype=np.int64)[node_index]
+    count = len(node_index)
+
+    if len(np.unique(indent)) <= _MAX_VECTOR_LEVELS:
+        parent = _parents_by_level(indent)
+    else:
+        parent = _parents_by_stack(indent)
+
+    # Body lines belong to the closest node above them
+    owner = np.searchsorted(node_index, body_index, side='right') - 1
+    if len(owner) and owner[0] < 0:
+        raise ValueError(f"Body line {body_index[0] + 1} appears before any heading")
+    nodes = np.arange(count)
+    body_start = np.searchsorted(owner, nodes, side='left')
+    body_end = np.searchsorted(owner, nodes, side='right')
+
+    # Group nodes by parent, keeping line order inside each group, to link siblings
+    order = np.argsort(parent, kind='stable')
+    grouped_parent = parent[order]
+    first_child = np.full(count, -1, dtype=np.int64)
+    next_sibling = np.full(count, -1, dtype=np.int64)
+    same_parent = grouped_parent[1:] == grouped_parent[:-1]
+    next_sibling[order[:-1][same_parent]] = order[1:][same_parent]
+    group_starts = np.flatnonzero(np.concatenate(([True], ~same_parent))) if count else np.empty(0, dtype=np.int64)
+    group_parents = grouped_parent[group_starts]
+    group_heads = order[group_starts]
+    has_parent = group_parents >= 0
+    first_child[group_parents[has_parent]] = group_heads[has_parent]
+    root_first_child = int(group_heads[0]) if count and group_parents[0] < 0 else -1
+
+    return ArrayTree(list_content, node_index, indent, parent, first_child, next_sibling,
+                     root_first_child, body_index, body_start, body_end, truncation)
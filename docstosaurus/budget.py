@@ -0,0 +1,198 @@
+import os
+import time
+
+from .engine import make_sanitizer
+
+# Check the clock once per this many nodes or planned entries
+_CLOCK_EVERY = 1024
+
+
+class BudgetExceeded(ValueError):
+    """
+    Raised when an outline goes over one of the limits of a Budget.
+
+    The `report` attribute is a dict with 'Limit' (the Budget attribute that was
+    exceeded), 'Allowed', 'Value', 'Line' and 'Path' (where it happened, if
+    known), 'Nodes', 'Bytes', 'Seconds' (progress so far) and 'Message'.
+    """
+
+    def __init__(self, report):
+        super().__init__(report['Message'])
+        self.report = report
+
+
+class Budget:
+    """
+    Limits on what a conversion may do, checked while the outline is parsed and
+    planned so a runaway input stops before anything is written.
+
+    Every limit is optional; None means unlimited.
+
+    Args:
+        max_nodes (int): Nodes in the outline.
+        max_depth (int): Nesting depth, i.e. directories inside each other.
+        max_bytes (int): Bytes the planned files add up to.
+        max_files_per_dir (int): New files and folders in any one directory.
+        max_seconds (float): Wall time from start() until planning finishes.
+    """
+
+    def __init__(self, max_nodes=None, max_depth=None, max_bytes=None, max_files_per_dir=None, max_seconds=None):
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+        self.max_files_per_dir = max_files_per_dir
+        self.max_seconds = max_seconds
+        self.start()
+
+    @classmethod
+    def defaults(cls):
+        """
+        Limits generous for any real documentation tree but far below what fills a disk.
+        """
+        return cls(max_nodes=1000000, max_depth=32, max_bytes=1 << 30, max_files_per_dir=10000, max_seconds=600)
+
+    def start(self):
+        """
+        Resets the counters and starts the clock.
+        """
+        self.started = time.monotonic()
+        self.nodes = 0
+        self.entries = 0
+        self.bytes = 0
+        self.per_dir = {}
+
+    def _exceeded(self, limit, value, message, line=None, path=None):
+        raise BudgetExceeded({
+            'Limit': limit,
+            'Allowed': getattr(self, limit),
+            'Value': value,
+            'Line': line,
+            'Path': path,
+            'Nodes': self.nodes,
+            'Bytes': self.bytes,
+            'Seconds': time.monotonic() - self.started,
+            'Message': message
+        })
+
+    def check_time(self, line=None, path=None):
+        if self.max_seconds is not None:
+            elapsed = time.monotonic() - self.started
+            if elapsed > self.max_seconds:
+                self._exceeded('max_seconds', elapsed, f"Conversion took longer than {self.max_seconds} seconds",
+                               line, path)
+
+    def add_node(self, depth, line):
+        """
+        Counts a parsed node at the given depth (1 for top-level nodes).
+        """
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            self._exceeded('max_nodes', self.nodes, f"Outline has more than {self.max_nodes} nodes", line)
+        if self.max_depth is not None and depth > self.max_depth:
+            self._exceeded('max_depth', depth, f"Nodes are nested {depth} levels deep, more than {self.max_depth}",
+                           line)
+        if self.nodes % _CLOCK_EVERY == 0:
+            self.check_time(line)
+
+    def check_tree(self, root):
+        """
+        Counts every node of an already parsed tree.
+        """
+        pending = [(child, 1) for child in reversed(root.get('Children', []))]
+        while pending:
+            node, depth = pending.pop()
+            self.add_node(depth, None)
+            pending.extend((child, depth + 1) for child in reversed(node['Children']))
+
+    def add_entry(self, entry):
+        """
+        Counts an entry produced by plan_structure.
+        """
+        self.entries += 1
+        self.bytes += entry['Bytes']
+        if self.max_bytes is not None and self.bytes > self.max_bytes:
+            self._exceeded('max_bytes', self.bytes, f"Planned files add up to more than {self.max_bytes} bytes",
+                           path=entry['Path'])
+        if self.max_files_per_dir is not None and entry['Kind'] != 'skipped' and entry['Action'] == 'create':
+            parent = os.path.dirname(entry['Path'])
+            count = self.per_dir.get(parent, 0) + 1
+            self.per_dir[parent] = count
+            if count > self.max_files_per_dir:
+                self._exceeded('max_files_per_dir', count, f"More than {self.max_files_per_dir} files and folders "
+                                                           f"planned in {parent}", path=parent)
+        if self.entries % _CLOCK_EVERY == 0:
+            self.check_time(path=entry['Path'])
+
+
+def format_report(report):
+    """
+    Formats a BudgetExceeded report for the log.
+    """
+    where = []
+    if report['Line'] is not None:
+        where.append(f"line {report['Line']}")
+    if report['Path'] is not None:
+        where.append(report['Path'])
+    location = f" at {', '.join(where)}" if where else ""
+    return (f"Aborted{location}: {report['Message']} ({report['Limit']} = {report['Allowed']}). "
+            f"Nothing was converted. Progress: {report['Nodes']} nodes, {report['Bytes']} bytes planned, "
+            f"{report['Seconds']:.1f} seconds.")
+
+
+# Budget attribute -> key used for it in JSON requests
+_KEYS = {
+    'max_nodes': 'MaxNodes',
+    'max_depth': 'MaxDepth',
+    'max_bytes': 'MaxBytes',
+    'max_files_per_dir': 'MaxFilesPerDir',
+    'max_seconds': 'MaxSeconds',
+}
+
+
+def budget_from_dict(limits):
+    """
+    Creates a Budget from a mapping such as {'MaxNodes': 100000, 'MaxDepth': 16}.
+    """
+    unknown = set(limits) - set(_KEYS.values())
+    if unknown:
+        raise ValueError(f"Unknown budget limits: {', '.join(sorted(unknown))}")
+    return Budget(**{name: limits[key] for name, key in _KEYS.items() if key in limits})
+
+
+def add_budget_arguments(parser):
+    """
+    Adds a --max-... option for every limit to an argparse parser.
+    """
+    parser.add_argument('--max-nodes', type=int, help="Abort if the outline has more nodes than this")
+    parser.add_argument('--max-depth', type=int, help="Abort if nodes are nested deeper than this")
+    parser.add_argument('--max-bytes', type=int, help="Abort if the files would add up to more bytes than this")
+    parser.add_argument('--max-files-per-dir', type=int, help="Abort if any folder would get more entries than this")
+    parser.add_argument('--max-seconds', type=float, help="Abort if parsing and planning take longer than this")
+
+
+def budget_from_args(args):
+    """
+    Creates a Budget from options added by add_budget_arguments, or None if none were given.
+    """
+    limits = {name: getattr(args, name) for name in _KEYS}
+    if all(value is None for value in limits.values()):
+        return None
+    return Budget(**limits)
+
+
+def add_sanitizer_arguments(parser, empty_folders=True):
+    """
+    Adds the options choosing how names are sanitized to an argparse parser,
+    and --allow-empty-folders unless `empty_folders` is False.
+    """
+    parser.add_argument('--alternative-sanitization', action='store_true', help="Remove digits from names")
+    parser.add_argument('--cut-long-names', action='store_true', help="Cut long names instead of shortening the middle")
+    if empty_folders:
+        parser.add_argument('--allow-empty-folders', action='store_true', help="Allow empty folders")
+
+
+def sanitizer_from_args(args):
+    """
+    Creates the sanitize function chosen with options added by add_sanitizer_arguments.
+    """
+    return make_sanitizer(args.alternative_sanitization, 'cut' if args.cut_long_names else 'middle')
@@ -0,0 +1,211 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+
+from .budget import (BudgetExceeded, add_budget_arguments, add_sanitizer_arguments, budget_from_args, format_report,
+                     sanitizer_from_args)
+from .dockeys import assign_doc_keys
+from .engine import configure_logging, content_truncation, sanitize_and_clean_name, set_content_titles
+from .importers import load_outline
+from .links import dump_path_map, resolve_links
+from .plan import plan_structure, write_entry
+from .templates import apply_templates, load_templates
+
+# Name of the checkpoint file kept in the base directory while a run is in progress
+CHECKPOINT_NAME = '.d2c-checkpoint'
+
+# Completed entries between two checkpoint records
+CHECKPOINT_EVERY = 256
+
+CHECKPOINT_VERSION = 1
+
+
+def fingerprint(input_file, sanitize_function, allow_empty_folders, links=False, bucket_size=None, doc_keys=False,
+                templates=None, content_titles=False):
+    """
+    Identifies an outline and the options it is converted with, so a checkpoint
+    is only resumed by the run that wrote it.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(input_file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digest.update(f"\0{sanitize_function.__name__}\0{bool(allow_empty_folders)}".encode('utf-8'))
+    if links:
+        digest.update(b"\0links")
+    if bucket_size:
+        digest.update(f"\0buckets{bucket_size}".encode('utf-8'))
+    if doc_keys:
+        digest.update(b"\0dockeys")
+    if content_titles:
+        digest.update(b"\0contenttitles")
+    for level, text in sorted((templates or {}).items(), key=lambda item: item[0] or 0):
+        digest.update(f"\0template{level}\0{text}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def read_checkpoint(path):
+    """
+    Reads a checkpoint file.
+
+    The first line is a JSON header with the run's fingerprint and the unique IDs
+    of the nodes that got a collision suffix; every following line is the number
+    of plan entries completed so far. A torn last line is ignored.
+
+    Returns:
+        tuple: (header dict, number of completed entries)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        completed = 0
+        for line in f:
+            if line.endswith('\n'):
+                completed = int(line)
+    return header, completed
+
+
+def _sync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def convert_resumable(input_file, base_dir, sanitize_function=sanitize_and_clean_name, allow_empty_folders=False,
+                      include_base=None, budget=None, checkpoint_path=None, id_to_path_map=None, links=False,
+                      path_map=None, bucket_size=None, doc_keys=False, templates=None, template_processes=None,
+                      content_titles=False):
+    """
+    Converts an outline, journaling progress so an interrupted run can be resumed.
+
+    A fresh run plans the tree as create_structure would and records which nodes
+    got collision suffixes. A resumed run replays those decisions instead of
+    looking at the partly written tree, so nothing it wrote itself is mistaken
+    for an existing name, and continues after the last recorded entry. Entries
+    done after that record are written again with the same content, so the result
+    is the same as an uninterrupted run. The checkpoint is removed on success.
+
+    Args:
+        input_file (str): The outline file.
+        base_dir (str): The base directory to write into.
+        sanitize_function (function): The function to use for sanitizing names.
+        allow_empty_folders (bool): Whether to allow empty folders.
+        include_base (str, optional): The directory include directives are resolved
+            against, the outline's directory by default.
+        budget (Budget, optional): Limits enforced while parsing and planning.
+        checkpoint_path (str, optional): Where to keep the checkpoint, CHECKPOINT_NAME
+            in `base_dir` by default.
+        id_to_path_map (dict, optional): Filled with the mapping from unique IDs to paths.
+        links (bool): Resolve `[[Node Title]]` links in body lines, see resolve_links.
+        path_map (str, optional): Where to write the unique ID to path map as JSON
+            once the run completes, see dump_path_map.
+        bucket_size (int, optional): Split folders with more children into bucket
+            folders, see plan_structure.
+        doc_keys (bool): Put Docusaurus ids, slugs and sidebar positions in the
+            front matter, see assign_doc_keys.
+        templates (dict, optional): Page templates per depth, see apply_templates.
+        template_processes (int, optional): Render the templates in a pool of
+            this many processes.
+        content_titles (bool): Title pages with the sanitized names, as
+            d2cgood.py did, see set_content_titles.
+
+    Returns:
+        dict: 'Resumed', 'Skipped' (entries done by an earlier attempt), 'Written'
+        and 'Entries', plus 'LinkProblems' when links are resolved.
+    """
+    if include_base is None:
+        include_base = os.path.dirname(os.path.abspath(input_file))
+    if checkpoint_path is None:
+        checkpoint_path = os.path.join(base_dir, CHECKPOINT_NAME)
+    run_id = fingerprint(input_file, sanitize_function, allow_empty_folders, links, bucket_size, doc_keys, templates,
+                         content_titles)
+    root = load_outline(input_file, budget, truncation=content_truncation(sanitize_function))
+    if content_titles:
+        set_content_titles(root)
+    if doc_keys:
+        assign_doc_keys(root)
+    if templates:
+        apply_templates(root, templates, template_processes)
+
+    if os.path.exists(checkpoint_path):
+        header, completed = read_checkpoint(checkpoint_path)
+        if header.get('Version') != CHECKPOINT_VERSION or header.get('Fingerprint') != run_id:
+            raise ValueError(f"{checkpoint_path} belongs to a different outline or options; "
+                             f"delete it to start over")
+        plan = plan_structure(root, base_dir, sanitize_function, allow_empty_folders, include_base=include_base,
+                              budget=budget, collisions=set(header['Collisions']), id_to_path_map=id_to_path_map,
+                              bucket_size=bucket_size)
+        resumed = True
+        logging.info(f"Resuming after {completed} of {len(plan)} entries")
+    else:
+        plan = plan_structure(root, base_dir, sanitize_function, allow_empty_folders, include_base=include_base,
+                              budget=budget, id_to_path_map=id_to_path_map, bucket_size=bucket_size)
+        completed = 0
+        resumed = False
+        header = {
+            'Version': CHECKPOINT_VERSION,
+            'Fingerprint': run_id,
+            'Collisions': [entry['UniqueID'] for entry in plan if entry['Collision']]
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(checkpoint_path)), exist_ok=True)
+        with open(checkpoint_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header) + '\n')
+            _sync(f)
+
+    link_problems = resolve_links(plan, include_base) if links else None
+
+    os.makedirs(base_dir, exist_ok=True)
+    with open(checkpoint_path, 'a', encoding='utf-8') as journal:
+        for index in range(completed, len(plan)):
+            write_entry(plan[index], include_base)
+            if (index + 1) % CHECKPOINT_EVERY == 0:
+                journal.write(f"{index + 1}\n")
+                _sync(journal)
+    os.remove(checkpoint_path)
+
+    if path_map is not None:
+        with open(path_map, 'w', encoding='utf-8') as f:
+            dump_path_map(plan, base_dir, f)
+
+    stats = {'Resumed': resumed, 'Skipped': completed, 'Written': len(plan) - completed, 'Entries': len(plan)}
+    if link_problems is not None:
+        stats['LinkProblems'] = link_problems
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert an outline, resuming an interrupted run of the same outline.")
+    parser.add_argument('input_file', help="The outline to convert")
+    parser.add_argument('base_dir', help="The base directory to write into")
+    add_sanitizer_arguments(parser)
+    parser.add_argument('--checkpoint', help=f"Checkpoint file (default: {CHECKPOINT_NAME} in the base directory)")
+    parser.add_argument('--resolve-links', action='store_true', help="Turn [[Node Title]] in body lines into links")
+    parser.add_argument('--path-map', help="Write the unique ID to path map as JSON to this file")
+    parser.add_argument('--bucket-size', type=int, help="Split folders with more children than this into buckets")
+    parser.add_argument('--doc-keys', action='store_true', help="Add ids, slugs and sidebar positions to front matter")
+    parser.add_argument('--templates', help="Lay pages out with the page.md and level-N.md templates in this folder")
+    parser.add_argument('--template-processes', type=int, help="Render the templates in this many processes")
+    parser.add_argument('--content-titles', action='store_true',
+                        help="Title pages with their sanitized names, as d2cgood.py did")
+    add_budget_arguments(parser)
+    args = parser.parse_args()
+
+    configure_logging()
+
+    sanitize_function = sanitizer_from_args(args)
+    try:
+        stats = convert_resumable(args.input_file, args.base_dir, sanitize_function, args.allow_empty_folders,
+                                  budget=budget_from_args(args), checkpoint_path=args.checkpoint,
+                                  links=args.resolve_links, path_map=args.path_map, bucket_size=args.bucket_size,
+                                  doc_keys=args.doc_keys,
+                                  templates=load_templates(args.templates) if args.templates else None,
+                                  template_processes=args.template_processes, content_titles=args.content_titles)
+    except BudgetExceeded as e:
+        sys.stderr.write(format_report(e.report) + '\n')
+        sys.exit(2)
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import argparse
+import json
+import logging
+import os
+import socketserver
+import stat
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from .budget import BudgetExceeded, budget_from_dict
+from .dedup import write_plan_deduplicated
+from .dockeys import assign_doc_keys, clear_doc_keys
+from .engine import configure_logging, content_truncation, make_sanitizer, set_content_titles
+from .hooks import Hooks, Throughput
+from .importers import load_outline
+from .links import dump_path_map, resolve_links
+from .plan import plan_structure, summarize_plan, write_plan
+from .search import SearchIndex
+from .sqlstore import write_plan_sqlite
+from .templates import apply_templates, clear_templates, load_templates
+
+# Parsed outlines kept between requests
+CACHE_SIZE = 8
+
+
+class Engine:
+    """
+    Runs conversion requests in a long-lived process.
+
+    Parsed trees are cached per input file and reused while the file's size and
+    modification time are unchanged, so converting the same outline into several
+    targets, or re-running an unchanged one, skips parsing entirely. Requests are
+    run one at a time.
+    """
+
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # (absolute path, truncation) -> ((size, mtime), tree)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def load(self, input_file, budget=None, hooks=None, truncation='middle'):
+        """
+        Returns (tree, cached) for an outline, parsing it only if it changed.
+        Trees are kept per truncation, which their nodes' Content depends on.
+        """
+        path = os.path.abspath(input_file)
+        stat = os.stat(path)
+        key = (stat.st_size, stat.st_mtime_ns)
+        cache_key = (path, truncation)
+        cached = self.cache.get(cache_key)
+        if cached is not None and cached[0] == key:
+            self.cache.move_to_end(cache_key)
+            return cached[1], True
+        root = load_outline(path, budget, hooks, truncation)
+        self.cache[cache_key] = (key, root)
+        self.cache.move_to_end(cache_key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return root, False
+
+    def handle(self, request):
+        """
+        Runs one request and returns its response.
+
+        Args:
+            request (dict): 'InputFile' and 'BaseDir', and optionally 'Id',
+                'AlternativeSanitization', 'Truncation' ('middle' or 'cut'),
+                'AllowEmptyFolders', 'Deduplicate',
+                'DryRun' (plan only), 'Budget' (limits such as {'MaxNodes': 1000}),
+                'Metrics' (add throughput from the engine's events to the stats)
+                'SearchIndex' (where to write the search index of the pages),
+                'ResolveLinks' (turn [[Node Title]] into links), 'PathMap'
+                (where to write the unique ID to path map), 'BucketSize'
+                (split folders with more children into bucket folders),
+                'DocKeys' (add ids, slugs and sidebar positions to front matter),
+                'Templates' (a folder of page templates, see load_templates),
+                'TemplateProcesses' (render them in a pool of this many processes),
+                'Database' (write the pages into this SQLite file instead of
+                files), 'FullText' (index the database for full-text search) and
+                'ContentTitles' (title pages with their sanitized names, as
+                d2cgood.py did), or 'Command' set to 'stats'.
+
+        Returns:
+            dict: 'Id', 'Ok', and 'Stats' on success or 'Error' on failure, plus
+            the abort 'Report' when a budget was exceeded.
+        """
+        response = {'Id': request.get('Id'), 'Ok': True}
+        try:
+            with self.lock:
+                self.requests += 1
+                if request.get('Command') == 'stats':
+                    response['Stats'] = {'Requests': self.requests, 'CachedOutlines': len(self.cache)}
+                else:
+                    response['Stats'] = self.convert(request)
+        except BudgetExceeded as e:
+            response['Ok'] = False
+            response['Error'] = f"BudgetExceeded: {e}"
+            response['Report'] = e.report
+        except Exception as e:
+            logging.error(f"Request {request.get('Id')} failed: {e}")
+            response['Ok'] = False
+            response['Error'] = f"{type(e).__name__}: {e}"
+        return response
+
+    def convert(self, request):
+        input_file = request['InputFile']
+        base_dir = request['BaseDir']
+        sanitize_function = make_sanitizer(bool(request.get('AlternativeSanitization')),
+                                           request.get('Truncation', 'middle'))
+
+        budget = budget_from_dict(request['Budget']) if request.get('Budget') else None
+        hooks = throughput = None
+        if request.get('Metrics'):
+            hooks = Hooks()
+            throughput = hooks.add_listener(Throughput())
+
+        started = time.perf_counter()
+        root, cached = self.load(input_file, budget, hooks, content_truncation(sanitize_function))
+        parsed = time.perf_counter()
+        if cached and budget is not None:
+            # Parsed without this request's limits, so count the cached tree against them
+            budget.check_tree(root)
+        if request.get('ContentTitles') or cached:
+            set_content_titles(root, bool(request.get('ContentTitles')))
+        if request.get('DocKeys'):
+            assign_doc_keys(root)
+        elif cached:
+            clear_doc_keys(root)  # An earlier request may have added them to the cached tree
+        if cached:
+            clear_templates(root)  # Layouts from an earlier request's templates or keys
+        if request.get('Templates'):
+            apply_templates(root, load_templates(request['Templates']), request.get('TemplateProcesses'))
+
+        include_base = os.path.dirname(os.path.abspath(input_file))
+        plan = plan_structure(root, base_dir, sanitize_function, bool(request.get('AllowEmptyFolders')),
+                              include_base=include_base, budget=budget, hooks=hooks,
+                              bucket_size=request.get('BucketSize'))
+        link_problems = resolve_links(plan, include_base) if request.get('ResolveLinks') else None
+        stats = summarize_plan(plan)
+        if link_problems is not None:
+            stats['LinkProblems'] = link_problems
+        planned = time.perf_counter()
+
+        if request.get('DryRun'):
+            pass  # Plan only
+        elif request.get('Database'):
+            # One SQLite file instead of a tree of files
+            stats.update(write_plan_sqlite(plan, request['Database'], base_dir, include_base,
+                                           bool(request.get('FullText'))))
+        else:
+            os.makedirs(base_dir, exist_ok=True)
+            if request.get('Deduplicate'):
+                stats.update(write_plan_deduplicated(plan, include_base=include_base))
+            else:
+                write_plan(plan, include_base, hooks)
+        if request.get('PathMap'):
+            with open(request['PathMap'], 'w', encoding='utf-8') as f:
+                dump_path_map(plan, base_dir, f)
+        if request.get('SearchIndex'):
+            index = SearchIndex(base_dir)
+            index.add_plan(plan)
+            index.write(request['SearchIndex'])
+            stats['IndexedPages'] = len(index.pages)
+        written = time.perf_counter()
+
+        stats.update({
+            'Cached': cached,
+            'ParseSeconds': parsed - started,
+            'PlanSeconds': planned - parsed,
+            'WriteSeconds': written - planned,
+            'TotalSeconds': written - started
+        })
+        if throughput is not None:
+            stats['Metrics'] = throughput.report()
+        return stats
+
+
+def serve_lines(engine, lines, write):
+    """
+    Answers JSON-lines requests, one response line per request line.
+
+    Args:
+        engine (Engine): The engine running the requests.
+        lines (iterable): The request lines.
+        write (function): Called with each response line, newline included.
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a JSON object")
+        except ValueError as e:
+            response = {'Id': None, 'Ok': False, 'Error': f"Invalid request: {e}"}
+        else:
+            response = engine.handle(request)
+        write(json.dumps(response, ensure_ascii=False) + '\n')
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        lines = (line.decode('utf-8') for line in self.rfile)
+
+        def write(text):
+            self.wfile.write(text.encode('utf-8'))
+            self.wfile.flush()
+
+        serve_lines(self.server.engine, lines, write)
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve_socket(engine, path):
+    """
+    Accepts JSON-lines connections on a Unix socket until interrupted.
+
+    A socket already at `path`, left behind by a daemon that did not shut down
+    cleanly, is replaced; anything else there raises FileExistsError.
+    """
+    if os.path.lexists(path):
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            raise FileExistsError(f"{path} exists and is not a socket")
+        os.unlink(path)
+    with _UnixServer(path, _RequestHandler) as server:
+        server.engine = engine
+        logging.info(f"Listening on {path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(path)
+
+
+def serve_stdin(engine):
+    """
+    Answers JSON-lines requests from stdin on stdout until stdin closes.
+    """
+    def write(text):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    serve_lines(engine, sys.stdin, write)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep the converter loaded and run conversion requests "
+                                                 "sent as JSON lines.")
+    parser.add_argument('--socket', help="Listen on this Unix socket instead of reading stdin")
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help="Parsed outlines to keep")
+    args = parser.parse_args()
+
+    configure_logging(logging.INFO)
+    engine = Engine(args.cache_size)
+    if args.socket:
+        serve_socket(engine, args.socket)
+    else:
+        serve_stdin(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import errno
+import hashlib
+import os
+
+from .engine import page_layout, write_page
+from .plan import page_size, render_page, write_entry
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows
+    fcntl = None
+
+# ioctl request for a copy-on-write clone of a whole file (btrfs, XFS, bcachefs)
+FICLONE = 0x40049409
+
+# Errors that mean "this filesystem cannot link or clone here", not a real failure
+_UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP, errno.ENOTTY,
+                errno.EINVAL, errno.ENOSYS, errno.EBADF}
+
+
+def _encode(text):
+    # Same bytes text mode would write on this platform
+    if os.linesep != '\n':
+        text = text.replace('\n', os.linesep)
+    return text.encode('utf-8')
+
+
+def _write_new(path, data):
+    with open(path, 'wb') as md_file:
+        md_file.write(data)
+
+
+def _reflink(source, path):
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are not supported on this platform")
+    with open(source, 'rb') as src, open(path, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.unlink(path)
+            raise
+
+
+def write_plan_deduplicated(plan, link_mode='auto', include_base=None):
+    """
+    Carries out a plan from plan_structure, writing each distinct rendered
+    document once and materializing identical documents as links to it.
+
+    Hardlinked copies share one inode, so an editor that saves in place changes
+    every copy; reflinks (copy-on-write clones) do not have that problem but need
+    a filesystem that supports them. Paths are unlinked before being written so a
+    file is never modified through an existing link, and write_page and
+    write_md_file replace a hardlinked file the same way, so a later plain run
+    does not write one page's text into its copies.
+
+    Args:
+        plan (list): The planned entries.
+        link_mode (str): 'hardlink', 'reflink', or 'auto' to try a reflink first
+            and fall back to a hardlink. Whatever cannot be linked is written out.
+        include_base (str, optional): The directory include directives are resolved against.
+            Documents are keyed by their directives, so the same included file is
+            spliced once per distinct document.
+
+    Returns:
+        dict: 'Files', 'Written', 'Linked', 'BytesWritten' and 'BytesSaved'.
+    """
+    stats = {'Files': 0, 'Written': 0, 'Linked': 0, 'BytesWritten': 0, 'BytesSaved': 0}
+    canonical = {}  # Content digest -> path known to hold that content
+    path_digest = {}  # Path -> digest of what this run wrote there
+    try_reflink = link_mode in ('auto', 'reflink')
+    try_hardlink = link_mode in ('auto', 'hardlink')
+
+    for entry in plan:
+        if entry['Kind'] == 'skipped':
+            continue
+        if entry['Kind'] == 'bucket':
+            write_entry(entry)
+            continue
+        if entry['Kind'] == 'directory':
+            os.makedirs(entry['Path'], exist_ok=True)
+
+        child = entry['Node']
+        path = entry['File']
+        layout = page_layout(child)
+        lines = child.get('BodyLines', [])
+        data = _encode(render_page(layout, lines))
+        has_includes = any('!include' in line for line in lines)
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        stats['Files'] += 1
+
+        # The path may be overwritten: forget it as a source for its old content
+        old_digest = path_digest.pop(path, None)
+        if old_digest is not None and canonical.get(old_digest) == path:
+            del canonical[old_digest]
+        if os.path.lexists(path):
+            os.unlink(path)
+
+        source = canonical.get(digest)
+        linked = False
+        if source is not None:
+            if try_reflink:
+                try:
+                    _reflink(source, path)
+                    linked = True
+                except OSError as e:
+                    if e.errno not in _UNSUPPORTED:
+                        raise
+                    try_reflink = False  # Do not retry a filesystem that refused
+            if not linked and try_hardlink:
+                try:
+                    os.link(source, path)
+                    linked = True
+                except OSError as e:
+                    if e.errno not in _UNSUPPORTED:
+                        raise
+
+        size = page_size(layout, lines, include_base) if has_includes else len(data)
+        if linked:
+            stats['Linked'] += 1
+            stats['BytesSaved'] += size
+        else:
+            if has_includes:
+                write_page(path, layout, lines, include_base)
+            else:
+                _write_new(path, data)
+            canonical.setdefault(digest, path)
+            stats['Written'] += 1
+            stats['BytesWritten'] += size
+        path_digest[path] = digest
+
+    return stats
@@ -0,0 +1,337 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from collections import deque
+
+from .budget import add_sanitizer_arguments, sanitizer_from_args
+from .engine import configure_logging, content_truncation, page_layout, sanitize_and_clean_name
+from .hooks import Hooks
+from .importers import load_outline
+from .plan import plan_structure, render_page
+
+# Order of the change kinds in reports
+CHANGE_KINDS = ('added', 'removed', 'moved', 'retitled', 'body_changed')
+
+
+class _Version:
+    """
+    One parsed outline, indexed for diffing: nodes in preorder with their parent,
+    normalized title and body, and the hash and size of their whole subtree.
+    """
+
+    def __init__(self, root):
+        self.order = []
+        self.parent = {}
+        self.position = {}
+        self.nodes = {}
+        pending = [(child, None) for child in reversed(root.get('Children', []))]
+        while pending:
+            node, parent = pending.pop()
+            uid = node['UniqueID']
+            self.order.append(uid)
+            self.nodes[uid] = node
+            self.parent[uid] = parent
+            pending.extend((child, uid) for child in reversed(node['Children']))
+        for children in [root.get('Children', [])] + [node['Children'] for node in self.nodes.values()]:
+            for position, child in enumerate(children):
+                self.position[child['UniqueID']] = position
+
+        # Whitespace is normalized so re-indenting a subtree does not change it
+        self.title = {uid: ' '.join(node['FULLLINE'].split()) for uid, node in self.nodes.items()}
+        self.body = {uid: tuple(line.strip() for line in node.get('BodyLines', []))
+                     for uid, node in self.nodes.items()}
+        self.hash = {}
+        self.size = {}
+        for uid in reversed(self.order):  # Children before their parents
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(self.title[uid].encode('utf-8'))
+            digest.update(b'\0' + '\n'.join(self.body[uid]).encode('utf-8') + b'\0')
+            size = 1
+            for child in self.nodes[uid]['Children']:
+                digest.update(self.hash[child['UniqueID']])
+                size += self.size[child['UniqueID']]
+            self.hash[uid] = digest.digest()
+            self.size[uid] = size
+
+    def subtree(self, uid):
+        # The node and its descendants in preorder
+        result = []
+        pending = [self.nodes[uid]]
+        while pending:
+            node = pending.pop()
+            result.append(node['UniqueID'])
+            pending.extend(reversed(node['Children']))
+        return result
+
+
+def _take(queue, taken):
+    # The first entry of a queue that is not matched yet, dropping matched ones
+    while queue:
+        uid = queue.popleft()
+        if uid not in taken:
+            return uid
+    return None
+
+
+def match_trees(old_root, new_root):
+    """
+    Pairs up the nodes of two versions of an outline in near-linear time.
+
+    Unique IDs include line numbers, so they cannot be compared across versions.
+    Instead nodes are matched in three passes, each over the nodes the previous
+    ones left:
+        1. Identical subtrees, by a hash of their titles, body lines and
+           children, so a moved or re-indented subtree matches as a whole.
+        2. Nodes with the same title, preferring one under the counterpart of
+           the old node's parent.
+        3. Retitled nodes: one whose children, body or place under its matched
+           parent carried over.
+    Titles and body lines are compared with whitespace normalized.
+
+    Returns:
+        tuple: (old version, new version, {old unique ID: new unique ID}).
+    """
+    old, new = _Version(old_root), _Version(new_root)
+    match = {}
+    matched_new = set()
+
+    def pair(old_uid, new_uid):
+        match[old_uid] = new_uid
+        matched_new.add(new_uid)
+
+    # 1. Identical subtrees, largest first: a smaller one matched earlier could be
+    # part of a larger one on either side, and the larger one would pair its nodes again
+    by_hash = {}
+    for uid in new.order:
+        by_hash.setdefault(new.hash[uid], deque()).append(uid)
+    for uid in sorted(old.order, key=old.size.get, reverse=True):  # Stable, so in preorder within a size
+        if uid in match:
+            continue
+        found = _take(by_hash.get(old.hash[uid], deque()), matched_new)
+        if found is not None:
+            for old_uid, new_uid in zip(old.subtree(uid), new.subtree(found)):
+                if old_uid not in match and new_uid not in matched_new:
+                    pair(old_uid, new_uid)
+
+    # 2. Same title, under the matched parent if possible
+    by_title = {}
+    by_title_and_parent = {}
+    for uid in new.order:
+        if uid not in matched_new:
+            by_title.setdefault(new.title[uid], deque()).append(uid)
+            by_title_and_parent.setdefault((new.title[uid], new.parent[uid]), deque()).append(uid)
+    for uid in old.order:
+        if uid in match:
+            continue
+        title = old.title[uid]
+        parent = old.parent[uid]
+        found = None
+        if parent is None or parent in match:
+            found = _take(by_title_and_parent.get((title, match.get(parent)), deque()), matched_new)
+        if found is None:
+            found = _take(by_title.get(title, deque()), matched_new)
+        if found is not None:
+            pair(uid, found)
+
+    # 3. Retitled: the children, the body or the place under the same parent carried over
+    by_body = {}
+    by_place = {}
+    for uid in new.order:
+        if uid not in matched_new:
+            if new.body[uid]:
+                by_body.setdefault((new.parent[uid], new.body[uid]), deque()).append(uid)
+            by_place[(new.parent[uid], new.position[uid])] = uid
+    for uid in old.order:
+        if uid in match:
+            continue
+        found = None
+        for child in old.nodes[uid]['Children']:
+            counterpart = match.get(child['UniqueID'])
+            candidate = new.parent[counterpart] if counterpart is not None else None
+            if candidate is not None and candidate not in matched_new:
+                found = candidate
+                break
+        parent = old.parent[uid]
+        if found is None and (parent is None or parent in match):
+            new_parent = match.get(parent)
+            if old.body[uid]:
+                found = _take(by_body.get((new_parent, old.body[uid]), deque()), matched_new)
+            if found is None:
+                candidate = by_place.get((new_parent, old.position[uid]))
+                if candidate is not None and candidate not in matched_new:
+                    found = candidate
+        if found is not None:
+            pair(uid, found)
+
+    return old, new, match
+
+
+def diff_trees(old_root, new_root):
+    """
+    Computes the structural changes between two versions of an outline.
+
+    Returns:
+        list: Changes as dicts with 'Change' (one of CHANGE_KINDS), 'Title',
+        'OldID' and 'NewID' (unique IDs in either version, None where the node
+        does not exist), plus 'OldTitle' when retitled. A moved or removed
+        folder counts once; its descendants move or go with it. A node can
+        appear several times, e.g. both moved and retitled.
+    """
+    old, new, match = match_trees(old_root, new_root)
+    matched_new = set(match.values())
+    changes = []
+
+    for uid in old.order:
+        counterpart = match.get(uid)
+        if counterpart is None:
+            parent = old.parent[uid]
+            if parent is None or parent in match:  # Reported with the removed ancestor otherwise
+                changes.append({'Change': 'removed', 'Title': old.title[uid], 'OldID': uid, 'NewID': None})
+            continue
+        parent = old.parent[uid]
+        if parent is None:
+            moved = new.parent[counterpart] is not None
+        else:
+            moved = parent not in match or new.parent[counterpart] != match[parent]
+        if moved:
+            changes.append({'Change': 'moved', 'Title': new.title[counterpart], 'OldID': uid, 'NewID': counterpart})
+        if old.title[uid] != new.title[counterpart]:
+            changes.append({'Change': 'retitled', 'Title': new.title[counterpart], 'OldTitle': old.title[uid],
+                            'OldID': uid, 'NewID': counterpart})
+        if old.body[uid] != new.body[counterpart]:
+            changes.append({'Change': 'body_changed', 'Title': new.title[counterpart], 'OldID': uid,
+                            'NewID': counterpart})
+
+    for uid in new.order:
+        if uid not in matched_new:
+            parent = new.parent[uid]
+            if parent is None or parent in matched_new:
+                changes.append({'Change': 'added', 'Title': new.title[uid], 'OldID': None, 'NewID': uid})
+
+    return changes
+
+
+def _load(input_file, truncation):
+    # The tree and the line number of each node, from the parser's events
+    lines = {}
+    hooks = Hooks()
+
+    @hooks.add_listener
+    def record(events):
+        for event in events:
+            if event['Event'] == 'node_parsed':
+                lines[event['UniqueID']] = event['LineNumber']
+
+    root = load_outline(input_file, hooks=hooks, truncation=truncation)
+    return root, lines
+
+
+def _planned_files(root, base_dir, sanitize_function, allow_empty_folders, include_base):
+    # ({unique ID: page relative to base_dir}, {page: digest of its final content})
+    plan = plan_structure(root, base_dir, sanitize_function, allow_empty_folders, include_base=include_base)
+    pages = {}
+    contents = {}
+    skip = len(os.path.join(base_dir, ''))  # Planned paths all start with base_dir
+    for entry in plan:
+        if not entry['File']:
+            continue
+        relative = entry['File'][skip:].replace(os.sep, '/')
+        pages[entry['UniqueID']] = relative
+        node = entry['Node']
+        text = render_page(page_layout(node), node.get('BodyLines', []))
+        contents[relative] = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    return pages, contents
+
+
+def diff_outlines(old_file, new_file, sanitize_function=sanitize_and_clean_name, allow_empty_folders=False):
+    """
+    Compares two versions of an outline file, structurally and by the pages
+    their conversions into an empty directory would write.
+
+    Returns:
+        dict: 'Changes', see diff_trees, each with 'OldLine', 'NewLine',
+        'OldPath' and 'NewPath' added (None where not known); 'Summary', the
+        number of changes per kind; and 'Paths', the pages relative to the
+        output directory that are 'Added', 'Removed' or 'Changed' in content.
+        Pages can change without a structural change, e.g. when a collision
+        suffix, which depends on line numbers, changes.
+    """
+    old_root, old_lines = _load(old_file, content_truncation(sanitize_function))
+    new_root, new_lines = _load(new_file, content_truncation(sanitize_function))
+    changes = diff_trees(old_root, new_root)
+
+    with tempfile.TemporaryDirectory() as empty_dir:
+        old_pages, old_contents = _planned_files(old_root, empty_dir, sanitize_function, allow_empty_folders,
+                                                 os.path.dirname(os.path.abspath(old_file)))
+        new_pages, new_contents = _planned_files(new_root, empty_dir, sanitize_function, allow_empty_folders,
+                                                 os.path.dirname(os.path.abspath(new_file)))
+
+    for change in changes:
+        change['OldLine'] = old_lines.get(change['OldID'])
+        change['NewLine'] = new_lines.get(change['NewID'])
+        change['OldPath'] = old_pages.get(change['OldID'])
+        change['NewPath'] = new_pages.get(change['NewID'])
+
+    summary = {kind: 0 for kind in CHANGE_KINDS}
+    for change in changes:
+        summary[change['Change']] += 1
+    paths = {
+        'Added': sorted(set(new_contents) - set(old_contents)),
+        'Removed': sorted(set(old_contents) - set(new_contents)),
+        'Changed': sorted(path for path in set(old_contents) & set(new_contents)
+                          if old_contents[path] != new_contents[path]),
+    }
+    return {'Changes': changes, 'Summary': summary, 'Paths': paths}
+
+
+def format_diff(report):
+    """
+    Formats a report from diff_outlines for reading: a summary line, one line
+    per change, and the page counts.
+    """
+    summary = report['Summary']
+    lines = [', '.join(f"{count} {kind.replace('_', ' ')}" for kind, count in summary.items())]
+    for kind in CHANGE_KINDS:
+        for change in report['Changes']:
+            if change['Change'] != kind:
+                continue
+            where = f"line {change['NewLine'] if change['NewLine'] is not None else change['OldLine']}"
+            if kind == 'retitled':
+                detail = f"{change['OldTitle']!r} -> {change['Title']!r}"
+            else:
+                detail = repr(change['Title'])
+            if kind == 'moved':
+                detail += f"  {change['OldPath']} -> {change['NewPath']}"
+            else:
+                path = change['NewPath'] or change['OldPath']
+                if path:
+                    detail += f"  {path}"
+            lines.append(f"  {kind.replace('_', ' '):<13} {where:<12} {detail}")
+    paths = report['Paths']
+    lines.append(f"Pages: {len(paths['Added'])} added, {len(paths['Removed'])} removed, "
+                 f"{len(paths['Changed'])} changed")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show how an outline changed between two versions, node by node.")
+    parser.add_argument('old_file', help="The earlier version of the outline")
+    parser.add_argument('new_file', help="The later version of the outline")
+    add_sanitizer_arguments(parser)
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+
+    configure_logging()
+
+    sanitize_function = sanitizer_from_args(args)
+    report = diff_outlines(args.old_file, args.new_file, sanitize_function, args.allow_empty_folders)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+    else:
+        print(format_diff(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import re
+
+from .links import title_key
+
+_WORD_RE = re.compile(r'\w+')
+
+# Segment used for a title without a single word character
+EMPTY_SEGMENT = 'page'
+
+
+def slugify(title):
+    """
+    Turns a node title into a URL segment: the words of the title without its
+    list marker, lowercased and joined by '-'.
+    """
+    return '-'.join(_WORD_RE.findall(title_key(title))) or EMPTY_SEGMENT
+
+
+def assign_doc_keys(root):
+    """
+    Computes the Docusaurus `id`, `slug` and `sidebar_position` of every node
+    once, from the outline alone, and stores them rendered as front matter lines
+    in the node's 'FrontMatter', which front_matter puts in every page.
+
+    The slug is the path of the slugified titles from the top level down, so a
+    page's URL does not change with the file names sanitizing and collision
+    suffixes produce. Siblings with the same segment get '-2', '-3', ... in
+    outline order, and a child never reuses its parent's segment, so the id,
+    which is the segment, is unique within each folder as well.
+    `sidebar_position` is the node's place among its siblings, so the sidebar
+    follows the outline instead of sorting by name. plan_structure sees the keys
+    and splits such siblings into bucket folders in outline order too.
+
+    Args:
+        root (dict): The tree from categorize_lines or an importer. It is modified.
+
+    Returns:
+        int: The number of nodes given keys.
+    """
+    count = 0
+    pending = [(root, '', None)]
+    while pending:
+        node, parent_slug, parent_segment = pending.pop()
+        taken = {parent_segment} if parent_segment else set()
+        for position, child in enumerate(node.get('Children', []), 1):
+            base = slugify(child['FULLLINE'])
+            segment = base
+            number = 1
+            while segment in taken:
+                number += 1
+                segment = f"{base}-{number}"
+            taken.add(segment)
+            slug = f"{parent_slug}/{segment}"
+            child['FrontMatter'] = f'id: "{segment}"\nslug: "{slug}"\nsidebar_position: {position}\n'
+            count += 1
+            if child['Children']:
+                pending.append((child, slug, segment))
+    return count
+
+
+def clear_doc_keys(root):
+    """
+    Removes the keys assign_doc_keys stored in a tree.
+    """
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        for child in node.get('Children', []):
+            child.pop('FrontMatter', None)
+            pending.append(child)
@@ -0,0 +1,426 @@
+import logging
+import os
+import re
+
+from .include import write_body_line
+
+# Imported on first use, so importing the engine stays cheap
+_md5 = None
+
+def configure_logging(level=logging.DEBUG):
+    """
+    Sends log records to stderr in the format the GUI and command line tools use.
+    Libraries embedding the engine leave logging to the application.
+    """
+    logging.basicConfig(level=level, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Utility Functions
+
+def generate_unique_id(content):
+    global _md5
+    if _md5 is None:
+        from hashlib import md5 as _md5
+    return _md5(content.encode('utf-8')).hexdigest()
+
+def escape_title(title):
+    if '"' in title:
+        title = title.replace('"', '\\"')
+    return f'title: "{title}"\n'
+
+def page_title(node):
+    """
+    Returns the title written into a node's page: its line as in the outline, or
+    the 'Title' set_content_titles stored in it.
+    """
+    return node.get('Title', node['FULLLINE'])
+
+def set_content_titles(root, enabled=True):
+    """
+    Titles every page with its node's sanitized Content instead of its line, as
+    d2cgood.py did, or goes back to the lines when `enabled` is false.
+
+    Args:
+        root (dict): The tree from categorize_lines or an importer. It is modified.
+        enabled (bool): Whether to use the Content titles.
+    """
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        for child in node.get('Children', []):
+            if enabled:
+                child['Title'] = child['Content']
+            else:
+                child.pop('Title', None)
+            pending.append(child)
+
+def front_matter(node):
+    """
+    Returns the front matter written for a node: its title, inside the block that
+    write_md_file wraps once more, preceded by the Docusaurus keys from
+    assign_doc_keys when the node has them. Those land in the outer block, the
+    one Docusaurus reads.
+    """
+    return f"{node.get('FrontMatter', '')}---\n{escape_title(page_title(node))}---\n\n"
+
+def page_layout(node):
+    """
+    Returns the text written before and after a node's body lines: the layout
+    apply_templates stored in the node's 'Layout', or the one write_md_file
+    writes around front_matter.
+
+    Returns:
+        tuple: (head, tail).
+    """
+    layout = node.get('Layout')
+    if layout is not None:
+        return layout
+    return f"---\n{front_matter(node)}---\n\n\n", ''
+
+def truncate_name(name, max_length=20, truncation='middle'):
+    """
+    Truncates a sanitized name, keeping its extension.
+
+    Args:
+        name (str): The sanitized name.
+        max_length (int): The maximum length of the name without its extension.
+        truncation (str): 'middle' keeps the start and end of a long name around
+            '...' and removes periods and spaces from its last 5 characters; 'cut'
+            keeps the first `max_length` characters, as d2cgood.py did.
+    """
+    base, ext = os.path.splitext(name)
+    if truncation == 'cut':
+        return base[:max_length] + ext if len(base) > max_length else base + ext
+
+    # Truncate the name if it exceeds the maximum length
+    if len(base) > max_length:
+        base = base[:max_length//2] + '...' + base[-max_length//2:]
+    
+    # Disallow invalid folder characters like . or space in the last 5 characters
+    if len(base) > 5:
+        base = base[:-5] + re.sub(r'[ .]', '', base[-5:])
+    else:
+        base = re.sub(r'[ .]', '', base)
+    
+    return base + ext
+
+def sanitize_and_clean_name(name, max_length=20, truncation='middle'):
+    """
+    Strips list indicators, sanitizes, and truncates the name to ensure it is within the maximum length.
+
+    Args:
+        name (str): The name to be sanitized and cleaned.
+        max_length (int): The maximum length for the cleaned name.
+        truncation (str): How long names are shortened, see truncate_name.
+    """
+    # Combine regex operations to remove periods, invalid characters, preserve double asterisks
+    name = re.sub(r'^[\.\-]+\s*|[<>:"/\\|?]', '', name).strip()
+    # Remove trailing spaces
+    name = name.rstrip()
+    
+    return truncate_name(name, max_length, truncation)
+
+def alternative_sanitize_and_clean_name(name, max_length=20, truncation='middle'):
+    """
+    Alternative sanitization function that removes numbers and replaces periods with underscores.
+removes digits#######################also uses unsndersocres?
+    Args:
+        name (str): The name to be sanitized and cleaned.
+        max_length (int): The maximum length for the cleaned name.
+        truncation (str): How long names are shortened, see truncate_name.
+    """
+    # Remove invalid characters and replace periods and numbers
+    name = re.sub(r'[<>:"/\\|?]', '', name)  # Remove invalid characters
+    name = re.sub(r'\.', '', name)  # Replace periods with nothing
+    name = re.sub(r'^\d+', '', name)  # Remove digits only if they appear as the first character in a line
+    
+
+       # Remove trailing spaces
+    name = name.rstrip()
+    
+    return truncate_name(name, max_length, truncation)
+
+def d2cgood_alternative_sanitize_and_clean_name(name, max_length=20):
+    """
+    The digit-removing sanitizer of d2cgood.py: strips the name before removing
+    leading digits and periods, and shortens long names in the middle without
+    cleaning up their last 5 characters.
+
+    Args:
+        name (str): The name to be sanitized and cleaned.
+        max_length (int): The maximum length for the cleaned name.
+    """
+    name = re.sub(r'[<>:"/\\|?]', '', name).strip()
+    name = re.sub(r'^\d+', '', name)
+    name = name.replace('.', '')
+    base, ext = os.path.splitext(name)
+    if len(base) > max_length:
+        base = base[:max_length//2] + '...' + base[-max_length//2:]
+    return base + ext
+
+def make_sanitizer(remove_digits=False, truncation='middle'):
+    """
+    Returns the sanitize function for a combination of options.
+
+    Args:
+        remove_digits (bool): Use alternative_sanitize_and_clean_name, or with
+            'cut' truncation d2cgood_alternative_sanitize_and_clean_name.
+        truncation (str): How long names are shortened, see truncate_name.
+            'cut' reproduces d2cgood.py, so the returned function carries it in
+            its `truncation` attribute for the parser, see content_truncation.
+    """
+    if truncation == 'middle':
+        return alternative_sanitize_and_clean_name if remove_digits else sanitize_and_clean_name
+
+    if remove_digits:
+        def sanitize_with_truncation(name, max_length=20):
+            return d2cgood_alternative_sanitize_and_clean_name(name, max_length)
+        name = d2cgood_alternative_sanitize_and_clean_name.__name__
+    else:
+        def sanitize_with_truncation(name, max_length=20):
+            return sanitize_and_clean_name(name, max_length, truncation)
+        name = f"{sanitize_and_clean_name.__name__}_{truncation}"
+
+    # Named so it can be told apart, e.g. in checkpoint fingerprints
+    sanitize_with_truncation.__name__ = name
+    sanitize_with_truncation.truncation = truncation
+    return sanitize_with_truncation
+
+def content_truncation(sanitize_function):
+    """
+    Returns how node Content is truncated when parsing for a sanitize function
+    from make_sanitizer: the same way as its names, so 'cut' titles are cut.
+    """
+    return getattr(sanitize_function, 'truncation', 'middle')
+
+def write_md_file(path, content, lines, front_matter=None, include_base=None):
+    """
+    Writes content and front matter to a Markdown file.
+
+    Args:
+        path (str): The path to the Markdown file.
+        content (str): The main content to write.
+        lines (list): Additional content lines to write.
+        front_matter (str, optional): The front matter to include at the top of the file.
+        include_base (str, optional): The directory `**!include path**` lines are resolved against.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)  # Ensure parent directories exist
+    with _open_page(path) as md_file:
+        # Write the front matter if provided
+        if front_matter:
+            md_file.write('---\n')  # Start of front matter
+            md_file.write(front_matter)  # Write the front matter content
+            md_file.write('---\n\n')  # End of front matter and add a blank line
+
+        # Write the main content
+        md_file.write(content + '\n')
+
+        # Write additional content lines
+        _write_body_lines(md_file, lines, include_base)
+
+def write_page(path, layout, lines, include_base=None):
+    """
+    Writes a page: its layout around its body lines.
+
+    Args:
+        path (str): The path to the Markdown file.
+        layout (tuple): (head, tail), see page_layout.
+        lines (list): The body lines, with '**' markers still in place.
+        include_base (str, optional): The directory `**!include path**` lines are resolved against.
+    """
+    head, tail = layout
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _open_page(path) as md_file:
+        md_file.write(head)
+        _write_body_lines(md_file, lines, include_base)
+        md_file.write(tail)
+
+def _open_page(path):
+    # A file with other hardlinks, as write_plan_deduplicated leaves them, is replaced
+    # rather than truncated, so writing it does not change the other paths too
+    try:
+        if os.lstat(path).st_nlink > 1:
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+    return open(path, 'w', encoding='utf-8')
+
+def _write_body_lines(md_file, lines, include_base):
+    for line in lines:
+        if '!include' in line:
+            # Splice the referenced file in place of an include directive
+            write_body_line(md_file, line, include_base)
+            continue
+        # Remove '**' markers from the line
+        cleaned_line = line.replace('**', '')
+        # Write the cleaned line to the file
+        md_file.write(cleaned_line + '\n')
+
+def categorize_lines(list_content, indent_levels=None, budget=None, hooks=None, truncation='middle'):
+    """
+    Categorizes lines from the list content into a hierarchical structure.
+
+    Args:
+        list_content (list): The list of lines to categorize.
+        indent_levels (sequence, optional): Precomputed indentation per line, as
+            produced by `scan_outline`, so lines are not stripped a second time.
+        budget (Budget, optional): Limits on node count, depth and time, checked per node.
+        hooks (Hooks, optional): Receives a 'node_parsed' event per node and
+            'phase_finished' for the 'parse' phase.
+        truncation (str): How long titles are shortened in each node's Content,
+            see truncate_name and content_truncation.
+
+    Returns:
+        dict: The hierarchical structure of categorized lines.
+    """
+    if hooks is not None:
+        if not hooks.listeners:
+            hooks = None
+        elif not hooks.in_phase('parse'):
+            with hooks.phase('parse'):
+                return categorize_lines(list_content, indent_levels, budget, hooks, truncation)
+
+    stack = []
+    root = {'Children': [], 'BodyLines': [], 'UniqueID': 'root'}
+
+    for line_number, line in enumerate(list_content, 1):
+        if not line:
+            continue  # Skip blank lines without sanitizing them
+        # Preserve original line for body lines
+        original_line = line.rstrip()
+        # Sanitize and clean the line for structure determination
+        line_content = sanitize_and_clean_name(line, truncation=truncation)
+        if indent_levels is not None:
+            indent_level = indent_levels[line_number - 1]
+        else:
+            indent_level = len(line) - len(line.lstrip())
+        content = line_content.strip()
+
+        if not content:
+            continue  # Skip empty lines
+
+        is_body_line = '**' in original_line
+
+        if is_body_line:
+            parent_node = stack[-1]
+            parent_node.setdefault('BodyLines', []).append(original_line)
+            continue
+
+        unique_id = generate_unique_id(f"{indent_level}_{content}_{line_number}")
+        node = {
+            'IndentLevel': indent_level,
+            'Content': content,
+            'Children': [],
+            'BodyLines': [],
+            'UniqueID': unique_id,
+            'FULLLINE': line
+        }
+
+        while stack and stack[-1]['IndentLevel'] >= indent_level:
+            stack.pop()
+
+        if budget is not None:
+            budget.add_node(len(stack) + 1, line_number)
+
+        if hooks is not None:
+            hooks.emit({'Event': 'node_parsed', 'UniqueID': unique_id, 'LineNumber': line_number,
+                        'Depth': len(stack) + 1})
+
+        if stack:
+            parent_node = stack[-1]
+            parent_node['Children'].append(node)
+        else:
+            root['Children'].append(node)
+
+        stack.append(node)
+
+    return root
+
+# Structure Creation Function
+def create_structure(node, parent_path, id_to_path_map, sanitize_function, allow_empty_folders=False, include_base=None,
+                     hooks=None):
+    """
+    Recursively creates directories and Markdown files based on the hierarchical structure.
+
+    Args:
+        node (dict): The current node in the hierarchical structure.
+        parent_path (str): The path to the parent directory.
+        id_to_path_map (dict): A mapping from unique IDs to paths.
+        sanitize_function (function): The function to use for sanitizing names.
+        allow_empty_folders (bool): Whether to allow empty folders.
+        include_base (str, optional): The directory include directives are resolved against.
+        hooks (Hooks, optional): Receives 'path_planned', 'collision_resolved' and
+            'file_written' events and 'phase_finished' for the 'write' phase.
+    """
+    if hooks is not None:
+        if not hooks.listeners:
+            hooks = None
+        elif not hooks.in_phase('write'):
+            with hooks.phase('write'):
+                create_structure(node, parent_path, id_to_path_map, sanitize_function, allow_empty_folders,
+                                 include_base, hooks)
+            return
+
+    for child in node.get('Children', []):
+        content = child['Content']
+        sanitized_name = sanitize_function(content)
+        current_path = os.path.join(parent_path, sanitized_name)
+
+        # Normalize paths to ensure consistent comparison
+        normalized_parent_path = os.path.normpath(parent_path)
+        normalized_current_path = os.path.normpath(current_path)
+
+        # Ensure the path is within the intended directory
+        if not os.path.commonpath([normalized_current_path, normalized_parent_path]) == normalized_parent_path:
+            raise ValueError(f"Invalid path detected: {normalized_current_path} is not within {normalized_parent_path}")
+
+        # Handle name conflicts by appending a unique identifier
+        if os.path.exists(normalized_current_path):
+            suffix = '_' + child['UniqueID'][:6]
+            sanitized_name += suffix
+            normalized_current_path = os.path.join(normalized_parent_path, sanitized_name)
+            if hooks is not None:
+                hooks.emit({'Event': 'collision_resolved', 'UniqueID': child['UniqueID'],
+                            'Path': normalized_current_path, 'Suffix': suffix})
+
+        # Store the mapping from unique ID to path
+        id_to_path_map[child['UniqueID']] = normalized_current_path
+
+        # The front matter with proper escaping, or the node's template layout
+        layout = page_layout(child)
+
+        if child['Children']:
+            # Create a directory for nodes with children
+            os.makedirs(normalized_current_path, exist_ok=True)
+            # Create an index.md file for the directory
+            md_file_path = os.path.join(normalized_current_path, 'index.md')
+            write_page(md_file_path, layout, child.get('BodyLines', []), include_base)
+            if hooks is not None:
+                _emit_written(hooks, child, normalized_current_path, 'directory', md_file_path)
+            # Recursively create structure for child nodes
+            create_structure(child, normalized_current_path, id_to_path_map, sanitize_function, allow_empty_folders, include_base,
+                             hooks)
+        elif allow_empty_folders:
+            # Check if any siblings have children
+            siblings_have_children = any(sibling['Children'] for sibling in node['Children'] if sibling != child)
+
+            if siblings_have_children:
+                # Create a directory with index.md if any siblings have children
+                os.makedirs(normalized_current_path, exist_ok=True)
+                md_file_path = os.path.join(normalized_current_path, 'index.md')
+                write_page(md_file_path, layout, child.get('BodyLines', []), include_base)
+                if hooks is not None:
+                    _emit_written(hooks, child, normalized_current_path, 'directory', md_file_path)
+            elif hooks is not None:
+                _emit_written(hooks, child, normalized_current_path, 'skipped', None)
+        else:
+                # Create a .md file if no siblings have children
+                md_file_path = f"{normalized_current_path}.md"
+                write_page(md_file_path, layout, child.get('BodyLines', []), include_base)
+                if hooks is not None:
+                    _emit_written(hooks, child, normalized_current_path, 'file', md_file_path)
+
+def _emit_written(hooks, child, path, kind, md_file_path):
+    hooks.emit({'Event': 'path_planned', 'UniqueID': child['UniqueID'], 'Path': path, 'Kind': kind})
+    if md_file_path is not None:
+        hooks.emit({'Event': 'file_written', 'Path': md_file_path})
+
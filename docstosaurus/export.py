@@ -0,0 +1,286 @@
+import argparse
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from .budget import add_sanitizer_arguments, sanitizer_from_args
+from .engine import configure_logging, content_truncation, generate_unique_id, sanitize_and_clean_name
+
+# Exact layout written by create_structure/write_md_file: the front matter block is
+# wrapped in a second pair of '---' lines, which may hold the keys from
+# assign_doc_keys, followed by the empty content line.
+_GENERATED_RE = re.compile(r'---\n((?:\w+: .*\n)*)---\ntitle: "(.*)"\n---\n\n---\n\n\n')
+_TITLE_RE = re.compile(r'^title:\s*(.*?)\s*$', re.M)
+_POSITION_RE = re.compile(r'^sidebar_position:\s*(\d+)\s*$', re.M)
+_SUFFIX_RE = re.compile(r'_([0-9a-f]{6})$')
+_LIST_MARKER_RE = re.compile(r'^[-*+]\s+')
+
+# How far ahead to look for the line number that produced a collision suffix
+MAX_LINE_SEARCH = 1 << 20
+
+
+def unescape_title(value):
+    """
+    Reverses escape_title on the quoted value of a `title:` line.
+    """
+    return value.replace('\\"', '"')
+
+
+def read_doc(path):
+    """
+    Reads the title, body lines and sidebar position of a Markdown file written
+    by create_structure.
+
+    Files that were edited by hand are accepted too: the title is taken from any
+    `title:` front matter key and everything after the front matter is the body.
+
+    Args:
+        path (str): The path to the Markdown file.
+
+    Returns:
+        tuple: (title or None, list of body lines, `sidebar_position` from
+        assign_doc_keys or None)
+    """
+    with open(path, 'r', encoding='utf-8') as md_file:
+        text = md_file.read()
+
+    match = _GENERATED_RE.match(text)
+    if match:
+        body = text[match.end():]
+        lines = body.split('\n')
+        if lines and not lines[-1]:
+            lines.pop()
+        return unescape_title(match.group(2)), lines, _position(match.group(1))
+
+    title = None
+    position = None
+    body = text
+    if text.startswith('---\n'):
+        end = text.find('\n---\n', 3)
+        if end >= 0:
+            front_matter = text[4:end]
+            body = text[end + 5:]
+            position = _position(front_matter)
+            title_match = _TITLE_RE.search(front_matter)
+            if title_match:
+                title = title_match.group(1)
+                if len(title) >= 2 and title[0] == title[-1] and title[0] in '"\'':
+                    title = unescape_title(title[1:-1])
+    lines = body.split('\n')
+    while lines and not lines[-1].strip():
+        lines.pop()
+    while lines and not lines[0].strip():
+        lines.pop(0)
+    return title, lines, position
+
+
+def _position(front_matter):
+    match = _POSITION_RE.search(front_matter)
+    return int(match.group(1)) if match else None
+
+
+def scan_tree(base_dir):
+    """
+    Walks a docs tree with os.scandir.
+
+    Args:
+        base_dir (str): The directory create_structure wrote into.
+
+    Returns:
+        dict: The root node, with nested 'Children'. Each node has 'Name' (the
+        entry name without '.md'), 'Doc' (the Markdown file holding its title and
+        body, or None) and 'Children'.
+    """
+    def scan(path):
+        children = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    node = scan(entry.path)
+                    node['Name'] = entry.name
+                    node['IsDir'] = True
+                    children.append(node)
+                elif entry.name.endswith('.md') and entry.name != 'index.md' and entry.is_file():
+                    children.append({'Name': entry.name[:-3], 'Doc': entry.path, 'Children': [], 'IsDir': False})
+        index_path = os.path.join(path, 'index.md')
+        return {'Doc': index_path if os.path.isfile(index_path) else None, 'Children': children}
+
+    return scan(base_dir)
+
+
+def _indent_of(line):
+    return len(line) - len(line.lstrip())
+
+
+def _next_anchor(candidates, first_line):
+    """
+    Finds which of the collision-suffixed siblings comes next, and on which line,
+    by searching forward for the first line number whose unique ID reproduces one
+    of their suffixes.
+
+    Args:
+        candidates (list): Suffixed nodes, each with 'Title', 'Content' and 'Name'.
+        first_line (int): The first line number still available.
+
+    Returns:
+        tuple: (node, line number), or (None, None) if nothing matched in range.
+    """
+    keys = [(f"{_indent_of(node['Title'])}_{node['Content']}_", node['Name'][-6:], node) for node in candidates]
+    for line_number in range(first_line, first_line + MAX_LINE_SEARCH):
+        for prefix, suffix, node in keys:
+            if generate_unique_id(f"{prefix}{line_number}").startswith(suffix):
+                return node, line_number
+    return None, None
+
+
+def _has_suffixed(node):
+    """
+    Whether a subtree contains a node whose name carries a collision suffix.
+    """
+    if 'HasSuffixed' not in node:
+        node['HasSuffixed'] = any(child.get('Suffixed') or _has_suffixed(child) for child in node['Children'])
+    return node['HasSuffixed']
+
+
+def export_outline(base_dir, sanitize_function=sanitize_and_clean_name, max_workers=16):
+    """
+    Regenerates the nested list that create_structure would turn into `base_dir`.
+
+    Titles come from the front matter written by escape_title (they keep the
+    original indentation and list marker), body lines are re-wrapped in '**' so
+    they become body lines again, and nodes whose names carry a collision suffix
+    are placed on the line number that reproduces it. Siblings that all carry a
+    `sidebar_position` from assign_doc_keys are emitted in that order, which is
+    the outline's; others are ordered by name. Files and folders added by hand
+    are given a title from their name and nested by directory depth.
+
+    Args:
+        base_dir (str): The docs directory to export.
+        sanitize_function (function): The sanitizer the tree was generated with.
+        max_workers (int): Threads used to read the Markdown files.
+
+    Returns:
+        list: The outline lines.
+    """
+    root = scan_tree(base_dir)
+
+    # Read every document in parallel, the tree walk itself only lists directories
+    nodes = []
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        nodes.append(node)
+        pending.extend(node['Children'])
+    docs = [node['Doc'] for node in nodes if node['Doc']]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        read = dict(zip(docs, executor.map(read_doc, docs)))
+    for node in nodes:
+        node['Title'], node['BodyLines'], node['Position'] = read[node['Doc']] if node['Doc'] else (None, [], None)
+
+    truncation = content_truncation(sanitize_function)
+
+    def prepare(node, parent_indent):
+        children = node['Children']
+        for child in children:
+            title = child['Title']
+            content = sanitize_and_clean_name(title, truncation=truncation).strip() if title is not None else ''
+            if not content or _indent_of(title) <= parent_indent:
+                # Added or retitled by hand, re-nest it below
+                child['Label'] = _LIST_MARKER_RE.sub('', title.strip()) if content else child['Name']
+                child['Title'] = None
+                child['Suffixed'] = False
+                continue
+            child['Content'] = content
+            suffix = _SUFFIX_RE.search(child['Name'])
+            child['Suffixed'] = bool(suffix) and sanitize_function(content) + suffix.group(0) == child['Name']
+
+        # Files and folders added by hand nest at the shallowest sibling indentation
+        titled = [child for child in children if child['Title'] is not None]
+        indent = min(_indent_of(child['Title']) for child in titled) if titled else parent_indent + 2
+        for child in children:
+            if child['Title'] is None:
+                child['Title'] = ' ' * indent + '- ' + child.get('Label', child['Name'])
+                child['HandAdded'] = True
+            prepare(child, _indent_of(child['Title']))
+
+    outline = []
+
+    def emit(node):
+        # Siblings must keep non-increasing indentation to stay siblings. Within one
+        # indentation, suffixed nodes are emitted in the order their suffixes are
+        # found on successive line numbers, after the subtrees that contain suffixed
+        # nodes and the folders they collided with. A file comes before a folder of
+        # the same name, as it would not have been written otherwise.
+        children = node['Children']
+        if children and all(child['Position'] is not None for child in children):
+            # Pages with doc keys keep their sidebar order, which is the outline order
+            for child in sorted(children, key=lambda child: child['Position']):
+                if child['Suffixed']:
+                    _, line_number = _next_anchor([child], len(outline) + 1)
+                    if line_number is None:
+                        logging.warning(f"No line number reproduces the collision suffix of {child['Name']}")
+                    else:
+                        outline.extend([''] * (line_number - len(outline) - 1))
+                emit_node(child)
+            return
+        for indent in sorted({_indent_of(child['Title']) for child in children}, reverse=True):
+            group = [child for child in children if _indent_of(child['Title']) == indent]
+            anchored = [child for child in group if child['Suffixed']]
+            bases = {child['Name'][:-7] for child in anchored}
+            free = sorted((child for child in group if not child['Suffixed']),
+                          key=lambda child: (child.get('HandAdded', False), child['Name'], child['IsDir']))
+            leading = ([child for child in free if _has_suffixed(child)]
+                       + [child for child in free if child['Name'] in bases and not _has_suffixed(child)])
+            trailing = [child for child in free if not (child['Name'] in bases or _has_suffixed(child))]
+
+            for child in leading:
+                emit_node(child)
+            while anchored:
+                child, line_number = _next_anchor(anchored, len(outline) + 1)
+                if child is None:
+                    logging.warning(f"No line number reproduces the collision suffix of {anchored[0]['Name']}")
+                    for child in anchored:
+                        emit_node(child)
+                    break
+                outline.extend([''] * (line_number - len(outline) - 1))
+                anchored.remove(child)
+                emit_node(child)
+            for child in trailing:
+                emit_node(child)
+
+    def emit_node(child):
+        outline.append(child['Title'])
+        for line in child['BodyLines']:
+            text = line.lstrip()
+            outline.append(line[:len(line) - len(text)] + '**' + text + '**')
+        emit(child)
+
+    prepare(root, -2)  # Top-level nodes added by hand get no indentation
+    emit(root)
+    return outline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a generated docs tree back to a nested list.")
+    parser.add_argument('base_dir', help="The docs directory to export")
+    parser.add_argument('-o', '--output', help="Outline file to write (default: stdout)")
+    add_sanitizer_arguments(parser, empty_folders=False)
+    parser.add_argument('--workers', type=int, default=16, help="Threads used to read files")
+    args = parser.parse_args()
+
+    configure_logging()
+
+    sanitize_function = sanitizer_from_args(args)
+    outline = export_outline(args.base_dir, sanitize_function, args.workers)
+    text = ''.join(line + '\n' for line in outline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,692 @@
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+from .aio import convert_async
+from .arraytree import categorize_lines_array, np
+from .checkpoint import convert_resumable
+from .dedup import write_plan_deduplicated
+from .engine import (categorize_lines, content_truncation, create_structure, escape_title, make_sanitizer,
+                     set_content_titles)
+from .importers import load_outline
+from .include import include_path
+from .plan import plan_structure, write_plan
+from .scan import scan_outline
+
+# Title pieces chosen to hit sanitizing, truncation, quoting and collisions
+_WORDS = [
+    'Same', 'same', 'Same ', 'Other', 'a.md', 'report.final.txt', '..', '...x', 'x.', 'x ', '-', '- -',
+    'x/y', 'a\\b', '"quoted"', 'a:b?', '<tag>', '|pipe|', '*star*', '**', 'héllo', 'naïve', '日本語', '🙂',
+    'tab\there', 'nbsp\u00a0end', 'line\u2028sep', 'feed\x0cform', 'cr\rsplit', '007', '42 Answer',
+    'A' * 40, 'word ' * 8, 'Name Name Name Name', '!include', '[[Same]]',
+]
+
+_MARKERS = ['- ', '- ', '- ', '* ', '+ ', '1. ', '2) ', '', '-', '. ', '-- ']
+
+# Lines that sanitize to nothing and are skipped wherever they appear
+_EMPTY_LINES = ['', '   ', '-', '- ', '---', '- ...', '  -  .', '<>', '"?"', '\t']
+
+INCLUDED_NAME = 'included.md'
+
+# Include directives as list items and bare, all of which include_path accepts
+_INCLUDE_FORMS = ['- **!include {}**', '**!include {}**', '1. **!include "{}"**', '* **!include {} **']
+
+INCLUDED_TEXT = "Included text with **stars**\n\n"
+
+OUTLINE_NAME = 'outline.md'
+
+BASE_NAME = 'out'
+
+
+def random_title(rng):
+    return ' '.join(rng.choice(_WORDS) for _ in range(rng.choice((1, 1, 1, 2, 3))))
+
+
+def random_outline(rng, max_lines=60):
+    """
+    Generates an indented-list outline meant to break equivalence: repeated and
+    near-repeated titles, body lines, include directives, blank and
+    punctuation-only lines, odd whitespace and characters, mixed list markers,
+    uneven indentation, deep nesting and sudden dedents.
+
+    The first line is always a node with a title that survives sanitizing, so
+    most outlines get past categorize_lines, which rejects body lines that come
+    before any node.
+
+    Args:
+        rng (random.Random): The source of randomness.
+        max_lines (int): The most lines to generate.
+
+    Returns:
+        str: The outline text, with '\\n' or '\\r\\n' line endings.
+    """
+    lines = [f"- Start {random_title(rng)}"]
+    depth = 0
+    unit = rng.choice((2, 4, 4, 1, 3))
+    for _ in range(rng.randint(0, max_lines - 1)):
+        roll = rng.random()
+        if roll < 0.08:
+            lines.append(rng.choice(_EMPTY_LINES))
+            continue
+        if roll < 0.25:
+            indent = ' ' * (unit * (depth + 1))
+            if rng.random() < 0.1:
+                lines.append(indent + rng.choice(_INCLUDE_FORMS).format(INCLUDED_NAME))
+            else:
+                lines.append(f"{indent}- **{random_title(rng)}** {rng.choice(('', 'text', '# Heading', '[[Same]]'))}")
+            continue
+        if roll < 0.3:
+            depth = rng.randint(depth, depth + 12)  # A deep run
+        else:
+            depth = max(0, depth + rng.choice((-3, -1, -1, 0, 0, 1, 1, 1)))
+        indent = ' ' * (unit * depth + rng.choice((0, 0, 0, 0, 1)))
+        if rng.random() < 0.05:
+            indent = '\t' * depth
+        lines.append(f"{indent}{rng.choice(_MARKERS)}{random_title(rng)}{rng.choice(('', '', '  ', '.'))}")
+    newline = '\r\n' if rng.random() < 0.1 else '\n'
+    return newline.join(lines) + newline
+
+
+def random_options(rng):
+    """
+    Picks conversion options: a sanitizer and whether empty folders are allowed.
+    """
+    return {
+        'AlternativeSanitization': rng.random() < 0.3,
+        'Truncation': rng.choice(('middle', 'middle', 'cut')),
+        'AllowEmptyFolders': rng.random() < 0.4,
+    }
+
+
+def _engine(input_file, base_dir, sanitize_function, allow_empty_folders):
+    with open(input_file, 'r', encoding='utf-8') as f:
+        list_content = [line.rstrip() for line in f]
+    root = categorize_lines(list_content, truncation=content_truncation(sanitize_function))
+    id_to_path_map = {'root': base_dir}
+    create_structure(root, base_dir, id_to_path_map, sanitize_function, allow_empty_folders,
+                     os.path.dirname(input_file))
+    return id_to_path_map
+
+
+def _scanned(input_file, base_dir, sanitize_function, allow_empty_folders):
+    with scan_outline(input_file) as scan:
+        list_content, indent_levels = scan.lines()
+    root = categorize_lines(list_content, indent_levels, truncation=content_truncation(sanitize_function))
+    id_to_path_map = {'root': base_dir}
+    create_structure(root, base_dir, id_to_path_map, sanitize_function, allow_empty_folders,
+                     os.path.dirname(input_file))
+    return id_to_path_map
+
+
+def _array(input_file, base_dir, sanitize_function, allow_empty_folders):
+    with scan_outline(input_file) as scan:
+        list_content, indent_levels = scan.lines()
+    root = categorize_lines_array(list_content, indent_levels, content_truncation(sanitize_function)).root()
+    id_to_path_map = {'root': base_dir}
+    create_structure(root, base_dir, id_to_path_map, sanitize_function, allow_empty_folders,
+                     os.path.dirname(input_file))
+    return id_to_path_map
+
+
+def _planned(input_file, base_dir, sanitize_function, allow_empty_folders):
+    id_to_path_map = {'root': base_dir}
+    include_base = os.path.dirname(input_file)
+    root = load_outline(input_file, truncation=content_truncation(sanitize_function))
+    plan = plan_structure(root, base_dir, sanitize_function, allow_empty_folders, id_to_path_map, include_base)
+    write_plan(plan, include_base)
+    return id_to_path_map
+
+
+def _deduplicated(input_file, base_dir, sanitize_function, allow_empty_folders):
+    id_to_path_map = {'root': base_dir}
+    include_base = os.path.dirname(input_file)
+    root = load_outline(input_file, truncation=content_truncation(sanitize_function))
+    plan = plan_structure(root, base_dir, sanitize_function, allow_empty_folders, id_to_path_map, include_base)
+    os.makedirs(base_dir, exist_ok=True)
+    write_plan_deduplicated(plan, include_base=include_base)
+    return id_to_path_map
+
+
+def _resumable(input_file, base_dir, sanitize_function, allow_empty_folders):
+    id_to_path_map = {'root': base_dir}
+    convert_resumable(input_file, base_dir, sanitize_function, allow_empty_folders, id_to_path_map=id_to_path_map)
+    return id_to_path_map
+
+
+def _asynchronous(input_file, base_dir, sanitize_function, allow_empty_folders):
+    asyncio.run(convert_async(input_file, base_dir, sanitize_function, allow_empty_folders, concurrency=4))
+    return None
+
+
+# Conversions checked against reference_convert, by name
+FAST_PATHS = {
+    'engine': _engine,
+    'scan': _scanned,
+    'plan': _planned,
+    'dedup': _deduplicated,
+    'resumable': _resumable,
+    'async': _asynchronous,
+}
+if np is not None:
+    FAST_PATHS['array'] = _array
+
+
+def register_fast_path(name, convert):
+    """
+    Adds or replaces a conversion to check against the reference.
+
+    Args:
+        name (str): The name reports and --paths use.
+        convert (function): Takes the outline file, the base directory, the
+            sanitize function and allow_empty_folders, writes the pages, and
+            returns the unique ID to path map, or None if it has none.
+    """
+    FAST_PATHS[name] = convert
+
+
+def _d2cgood_name(name, max_length=20):
+    # sanitize_and_clean_name of d2cgood.py
+    name = re.sub(r'^[\.\-]+\s*|[<>:"/\\|?]', '', name).strip()
+    base, ext = os.path.splitext(name)
+    return base[:max_length] + ext if len(base) > max_length else base + ext
+
+
+def _d2cgood_alternative_name(name, max_length=20):
+    # alternative_sanitize_and_clean_name of d2cgood.py
+    name = re.sub(r'[<>:"/\\|?]', '', name)
+    name = name.strip()
+    name = re.sub(r'^\d+', '', name)
+    name = re.sub(r'\.', '', name)
+    base, ext = os.path.splitext(name)
+    if len(base) > max_length:
+        base = base[:max_length//2] + '...' + base[-max_length//2:]
+    return base + ext
+
+
+def _baseline_name(name, max_length=20, remove_digits=False):
+    # sanitize_and_clean_name and alternative_sanitize_and_clean_name of the original d2c.py
+    if remove_digits:
+        name = re.sub(r'[<>:"/\\|?]', '', name)
+        name = re.sub(r'\.', '', name)
+        name = re.sub(r'^\d+', '', name)
+    else:
+        name = re.sub(r'^[\.\-]+\s*|[<>:"/\\|?]', '', name).strip()
+    name = name.rstrip()
+    base, ext = os.path.splitext(name)
+    if len(base) > max_length:
+        base = base[:max_length//2] + '...' + base[-max_length//2:]
+    if len(base) > 5:
+        base = base[:-5] + re.sub(r'[ .]', '', base[-5:])
+    else:
+        base = re.sub(r'[ .]', '', base)
+    return base + ext
+
+
+def _baseline_write(path, lines, front_matter, include_base):
+    # write_md_file of the original d2c.py, with include directives spliced in by
+    # reading the whole file rather than with splice_file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as md_file:
+        md_file.write('---\n' + front_matter + '---\n\n' + '\n')
+        for line in lines:
+            included = include_path(line, include_base)
+            if included is not None:
+                try:
+                    with open(included, 'rb') as f:
+                        data = f.read()
+                except OSError:
+                    pass
+                else:
+                    md_file.flush()
+                    md_file.buffer.write(data if not data or data.endswith(b'\n') else data + b'\n')
+                    continue
+            md_file.write(line.replace('**', '') + '\n')
+
+
+def reference_convert(input_file, base_dir, remove_digits=False, truncation='middle', allow_empty_folders=False):
+    """
+    The conversion every fast path must match: categorize_lines and
+    create_structure of the original d2c.py, ported as they were so a change to
+    the engine's own versions is caught too. Only what d2c.py did not have is
+    added: 'cut' truncation with d2cgood.py's sanitizers, and include directives,
+    recognized by include_path.
+
+    Args:
+        input_file (str): The outline.
+        base_dir (str): The base directory to write into.
+        remove_digits (bool): Use the alternative sanitization.
+        truncation (str): 'middle' or 'cut', see truncate_name.
+        allow_empty_folders (bool): Whether to allow empty folders.
+
+    Returns:
+        dict: The unique ID to path map.
+    """
+    if truncation == 'cut':
+        parse_name = _d2cgood_name
+        sanitize = _d2cgood_alternative_name if remove_digits else _d2cgood_name
+    else:
+        parse_name = _baseline_name
+
+        def sanitize(name):
+            return _baseline_name(name, remove_digits=remove_digits)
+    include_base = os.path.dirname(input_file)
+    with open(input_file, 'r', encoding='utf-8') as f:
+        list_content = [line.rstrip() for line in f]
+
+    stack = []
+    root = {'Children': [], 'BodyLines': [], 'UniqueID': 'root'}
+    for line_number, line in enumerate(list_content, 1):
+        original_line = line.rstrip()
+        content = parse_name(line).strip()
+        indent_level = len(line) - len(line.lstrip())
+        if not content:
+            continue
+        if '**' in original_line:
+            stack[-1].setdefault('BodyLines', []).append(original_line)
+            continue
+        unique_id = hashlib.md5(f"{indent_level}_{content}_{line_number}".encode('utf-8')).hexdigest()
+        node = {'IndentLevel': indent_level, 'Content': content, 'Children': [], 'BodyLines': [],
+                'UniqueID': unique_id, 'FULLLINE': line}
+        while stack and stack[-1]['IndentLevel'] >= indent_level:
+            stack.pop()
+        (stack[-1] if stack else root)['Children'].append(node)
+        stack.append(node)
+
+    id_to_path_map = {'root': base_dir}
+
+    def create(node, parent_path):
+        for child in node.get('Children', []):
+            sanitized_name = sanitize(child['Content'])
+            normalized_parent_path = os.path.normpath(parent_path)
+            normalized_current_path = os.path.normpath(os.path.join(parent_path, sanitized_name))
+            if not os.path.commonpath([normalized_current_path, normalized_parent_path]) == normalized_parent_path:
+                raise ValueError(f"Invalid path detected: {normalized_current_path} is not within "
+                                 f"{normalized_parent_path}")
+            if os.path.exists(normalized_current_path):
+                sanitized_name += '_' + child['UniqueID'][:6]
+                normalized_current_path = os.path.join(normalized_parent_path, sanitized_name)
+            id_to_path_map[child['UniqueID']] = normalized_current_path
+            title = child['FULLLINE'].replace('"', '\\"')
+            front_matter = f'---\ntitle: "{title}"\n---\n\n'
+            lines = child.get('BodyLines', [])
+            if child['Children']:
+                os.makedirs(normalized_current_path, exist_ok=True)
+                _baseline_write(os.path.join(normalized_current_path, 'index.md'), lines, front_matter, include_base)
+                create(child, normalized_current_path)
+            elif allow_empty_folders:
+                if any(sibling['Children'] for sibling in node['Children'] if sibling != child):
+                    os.makedirs(normalized_current_path, exist_ok=True)
+                    _baseline_write(os.path.join(normalized_current_path, 'index.md'), lines, front_matter,
+                                    include_base)
+            else:
+                _baseline_write(f"{normalized_current_path}.md", lines, front_matter, include_base)
+
+    create(root, base_dir)
+    return id_to_path_map
+
+
+def d2cgood_convert(input_file, base_dir, remove_digits=False):
+    """
+    The conversion d2cgood.py did before it became a launcher for the engine,
+    ported as it was, as the reference for the engine's d2cgood profile: names
+    and titles cut to 20 characters, pages titled with them, and a page for
+    every leaf. It knows nothing of include directives.
+
+    Args:
+        input_file (str): The outline.
+        base_dir (str): The base directory to write into.
+        remove_digits (bool): Use d2cgood.py's alternative sanitization.
+
+    Returns:
+        dict: The unique ID to path map.
+    """
+    os.makedirs(base_dir, exist_ok=True)
+    with open(input_file, 'r', encoding='utf-8') as f:
+        list_content = [line.rstrip() for line in f]
+
+    stack = []
+    root = {'Children': [], 'BodyLines': [], 'UniqueID': 'root'}
+    for line_number, line in enumerate(list_content, 1):
+        original_line = line.rstrip()
+        content = _d2cgood_name(line).strip()
+        indent_level = len(line) - len(line.lstrip())
+        if not content:
+            continue
+        if '**' in original_line:
+            stack[-1].setdefault('BodyLines', []).append(original_line)
+            continue
+        unique_id = hashlib.md5(f"{indent_level}_{content}_{line_number}".encode('utf-8')).hexdigest()
+        node = {'IndentLevel': indent_level, 'Content': content, 'Children': [], 'BodyLines': [],
+                'UniqueID': unique_id}
+        while stack and stack[-1]['IndentLevel'] >= indent_level:
+            stack.pop()
+        (stack[-1] if stack else root)['Children'].append(node)
+        stack.append(node)
+
+    sanitize = _d2cgood_alternative_name if remove_digits else _d2cgood_name
+    id_to_path_map = {'root': base_dir}
+
+    def write(path, lines, front_matter):
+        with open(path, 'w', encoding='utf-8') as md_file:
+            md_file.write('---\n' + front_matter + '---\n\n' + '\n')
+            for line in lines:
+                md_file.write(line.replace('**', '') + '\n')
+
+    def create(node, parent_path):
+        for child in node.get('Children', []):
+            content = child['Content']
+            sanitized_name = sanitize(content)
+            normalized_parent_path = os.path.normpath(parent_path)
+            normalized_current_path = os.path.normpath(os.path.join(parent_path, sanitized_name))
+            if not os.path.commonpath([normalized_current_path, normalized_parent_path]) == normalized_parent_path:
+                raise ValueError(f"Invalid path detected: {normalized_current_path} is not within "
+                                 f"{normalized_parent_path}")
+            if os.path.exists(normalized_current_path):
+                sanitized_name += '_' + child['UniqueID'][:6]
+                normalized_current_path = os.path.join(normalized_parent_path, sanitized_name)
+            id_to_path_map[child['UniqueID']] = normalized_current_path
+            front_matter = f"---\n{escape_title(content)}---\n\n"
+            if child['Children']:
+                os.makedirs(normalized_current_path, exist_ok=True)
+                write(os.path.join(normalized_current_path, 'index.md'), child.get('BodyLines', []), front_matter)
+                create(child, normalized_current_path)
+            else:
+                write(f"{normalized_current_path}.md", child.get('BodyLines', []), front_matter)
+
+    create(root, base_dir)
+    return id_to_path_map
+
+
+def d2cgood_profile_convert(input_file, base_dir, remove_digits=False):
+    """
+    The engine set up as d2cgood.py launches it: make_sanitizer with 'cut'
+    truncation, Content cut the same way, pages titled with set_content_titles
+    and no empty folders. It must write what d2cgood_convert writes.
+    """
+    sanitize_function = make_sanitizer(remove_digits, 'cut')
+    with open(input_file, 'r', encoding='utf-8') as f:
+        list_content = [line.rstrip() for line in f]
+    root = categorize_lines(list_content, truncation=content_truncation(sanitize_function))
+    set_content_titles(root)
+    os.makedirs(base_dir, exist_ok=True)
+    id_to_path_map = {'root': base_dir}
+    create_structure(root, base_dir, id_to_path_map, sanitize_function, include_base=os.path.dirname(input_file))
+    return id_to_path_map
+
+
+def snapshot(base_dir):
+    """
+    Returns {path relative to base_dir: file bytes, or None for a folder}.
+    """
+    tree = {}
+    for dirpath, dirnames, filenames in os.walk(base_dir):
+        for name in dirnames:
+            tree[os.path.relpath(os.path.join(dirpath, name), base_dir)] = None
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            with open(path, 'rb') as f:
+                tree[os.path.relpath(path, base_dir)] = f.read()
+    return tree
+
+
+def _outcome(convert, input_file, work_dir, sanitize_function, allow_empty_folders, passes):
+    # What a conversion leaves behind after each pass, or the error it raised. The
+    # base directory is one level down, so files written next to it are seen too.
+    base_dir = os.path.join(work_dir, BASE_NAME)
+    results = []
+    for _ in range(passes):
+        try:
+            id_to_path_map = convert(input_file, base_dir, sanitize_function, allow_empty_folders)
+        except Exception as e:
+            results.append(('error', type(e).__name__))
+            break
+        if id_to_path_map is not None:
+            id_to_path_map = {key: os.path.relpath(path, work_dir) for key, path in id_to_path_map.items()}
+        tree = snapshot(work_dir)
+        tree.pop(BASE_NAME, None)  # Whether an empty base directory gets created does not matter
+        results.append(('ok', tree, id_to_path_map))
+    return results
+
+
+def _describe(expected, actual):
+    # The first difference between two outcomes, in a few words
+    if expected[0] == 'error' and actual[0] == 'error':
+        return None  # Failing is what matters, not the exception type
+    if expected[0] == 'error':
+        return f"no error where the reference raised {expected[1]}"
+    if actual[0] == 'error':
+        return f"raised {actual[1]} where the reference did not"
+    expected_tree, actual_tree = expected[1], actual[1]
+    for path in sorted(set(expected_tree) | set(actual_tree)):
+        if path not in actual_tree:
+            return f"missing {path}"
+        if path not in expected_tree:
+            return f"unexpected {path}"
+        if expected_tree[path] != actual_tree[path]:
+            return f"different content in {path}"
+    if actual[2] is not None and expected[2] != actual[2]:
+        keys = set(expected[2]) | set(actual[2])
+        differing = sorted(key for key in keys if expected[2].get(key) != actual[2].get(key))
+        return f"different paths for {len(differing)} nodes, first {differing[0]}"
+    return None
+
+
+def check_outline(text, options, paths=None, passes=2):
+    """
+    Converts one outline with the reference and every fast path and compares them.
+
+    Each conversion runs `passes` times into the same folder, so later passes
+    also check how existing files are collided with and overwritten. The output
+    trees are compared file by file, byte for byte, along with the unique ID to
+    path maps. A fast path has to fail where the reference fails, with any
+    exception.
+
+    Args:
+        text (str): The outline.
+        options (dict): 'AlternativeSanitization', 'Truncation' and
+            'AllowEmptyFolders', see random_options.
+        paths (list, optional): Names from FAST_PATHS to check, all by default.
+        passes (int): Conversions per folder.
+
+    Returns:
+        list: Problems as (path name, pass number, description); empty when
+        every fast path matches the reference.
+    """
+    sanitize_function = make_sanitizer(options['AlternativeSanitization'], options['Truncation'])
+    allow_empty_folders = options['AllowEmptyFolders']
+    problems = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_file = os.path.join(temp_dir, OUTLINE_NAME)
+        with open(input_file, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        with open(os.path.join(temp_dir, INCLUDED_NAME), 'w', encoding='utf-8', newline='') as f:
+            f.write(INCLUDED_TEXT)
+
+        expected = _outcome(lambda i, b, s, a: reference_convert(i, b, options['AlternativeSanitization'],
+                                                                 options['Truncation'], a),
+                            input_file, os.path.join(temp_dir, 'reference'), None, allow_empty_folders, passes)
+        for name in paths or FAST_PATHS:
+            actual = _outcome(FAST_PATHS[name], input_file, os.path.join(temp_dir, name), sanitize_function,
+                              allow_empty_folders, passes)
+            for number, (want, got) in enumerate(zip(expected, actual), 1):
+                difference = _describe(want, got)
+                if difference:
+                    problems.append((name, number, difference))
+                    break
+    return problems
+
+
+def check_d2cgood(text, options, paths=None, passes=2):
+    """
+    Converts one outline with d2cgood_convert and d2cgood_profile_convert and
+    compares them as check_outline does. Include directives, which d2cgood.py
+    did not have, are removed from the outline first.
+
+    Args:
+        text (str): The outline.
+        options (dict): 'AlternativeSanitization'; truncation is always 'cut'
+            and empty folders are never allowed.
+        paths: Unused, so check_seed and shrink can take either check.
+        passes (int): Conversions per folder.
+
+    Returns:
+        list: Problems as ('d2cgood', pass number, description).
+    """
+    text = ''.join(line for line in text.splitlines(keepends=True) if '!include' not in line)
+    remove_digits = options['AlternativeSanitization']
+    problems = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_file = os.path.join(temp_dir, OUTLINE_NAME)
+        with open(input_file, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        expected = _outcome(lambda i, b, s, a: d2cgood_convert(i, b, remove_digits), input_file,
+                            os.path.join(temp_dir, 'reference'), None, False, passes)
+        actual = _outcome(lambda i, b, s, a: d2cgood_profile_convert(i, b, remove_digits), input_file,
+                          os.path.join(temp_dir, 'd2cgood'), None, False, passes)
+        for number, (want, got) in enumerate(zip(expected, actual), 1):
+            difference = _describe(want, got)
+            if difference:
+                problems.append(('d2cgood', number, difference))
+                break
+    return problems
+
+
+def check_include(paths=None):
+    """
+    Checks that an include directive written as a list item, as random_outline
+    writes them, splices the included file into the page with the reference
+    and every fast path, so the random outlines really exercise includes.
+
+    Returns:
+        list: Problems as (path name, 1, description).
+    """
+    text = f"- Page\n  - **!include {INCLUDED_NAME}**\n"
+    converts = [('reference', lambda i, b, s, a: reference_convert(i, b))]
+    converts += [(name, FAST_PATHS[name]) for name in paths or FAST_PATHS]
+    problems = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_file = os.path.join(temp_dir, OUTLINE_NAME)
+        with open(input_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+        with open(os.path.join(temp_dir, INCLUDED_NAME), 'w', encoding='utf-8', newline='') as f:
+            f.write(INCLUDED_TEXT)
+        for name, convert in converts:
+            outcome = _outcome(convert, input_file, os.path.join(temp_dir, name), make_sanitizer(), False, 1)[0]
+            if outcome[0] == 'error':
+                problems.append((name, 1, f"raised {outcome[1]} on an include directive"))
+            elif not any(data and INCLUDED_TEXT.encode('utf-8') in data for data in outcome[1].values()):
+                problems.append((name, 1, f"did not include {INCLUDED_NAME}"))
+    return problems
+
+
+def check_seed(seed, max_lines=60, paths=None, check=check_outline):
+    """
+    Generates the outline and options for a seed and checks them, see check_outline.
+
+    Args:
+        check (function): check_outline, or check_d2cgood to compare with d2cgood.py.
+
+    Returns:
+        tuple: (outline text, options, problems).
+    """
+    rng = random.Random(seed)
+    text = random_outline(rng, max_lines)
+    options = random_options(rng)
+    if check is check_d2cgood:
+        options.update(Truncation='cut', AllowEmptyFolders=False)
+    return text, options, check(text, options, paths)
+
+
+def _signature(problems):
+    # Which paths failed and how, ignoring the details, so shrinking keeps the same failure
+    return {(name, difference.split()[0]) for name, _, difference in problems}
+
+
+def shrink(text, options, problems, check=check_outline):
+    """
+    Removes lines from a failing outline for as long as it fails the same way.
+
+    Args:
+        text (str): The failing outline.
+        options (dict): The options it failed with.
+        problems (list): Its problems, see check_outline.
+        check (function): The check it failed, see check_seed.
+
+    Returns:
+        str: The smallest outline found that fails the same way.
+    """
+    signature = _signature(problems)
+    paths = sorted({name for name, _, _ in problems})
+    lines = text.splitlines(keepends=True)
+    step = max(1, len(lines) // 2)
+    while step:
+        index = 0
+        while index < len(lines):
+            candidate = lines[:index] + lines[index + step:]
+            if candidate and _signature(check(''.join(candidate), options, paths)) == signature:
+                lines = candidate
+            else:
+                index += step
+        step //= 2
+    return ''.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that the fast conversion paths write exactly what the reference conversion writes, "
+                    "on random outlines.")
+    parser.add_argument('--seed', type=int, default=0, help="The first seed (default: 0)")
+    parser.add_argument('--count', type=int, default=100, help="Outlines to check (default: 100)")
+    parser.add_argument('--seconds', type=float,
+                        help="Keep checking new seeds for this long instead, for a long fuzz session")
+    parser.add_argument('--max-lines', type=int, default=60, help="The most lines per outline (default: 60)")
+    parser.add_argument('--paths', help=f"Comma-separated fast paths to check (default: {','.join(FAST_PATHS)})")
+    parser.add_argument('--save-dir', default='.', help="Where to save shrunk failing outlines (default: .)")
+    parser.add_argument('--d2cgood', action='store_true',
+                        help="Compare the engine's d2cgood profile with the old d2cgood.py conversion instead")
+    args = parser.parse_args()
+
+    paths = args.paths.split(',') if args.paths else None
+    unknown = [name for name in paths or [] if name not in FAST_PATHS]
+    if unknown:
+        parser.error(f"unknown fast paths: {', '.join(unknown)}")
+
+    # Random body lines that look like include directives name files that do not exist
+    logging.disable(logging.ERROR)
+
+    check = check_d2cgood if args.d2cgood else check_outline
+    started = time.perf_counter()
+    seed = args.seed
+    checked = failures = 0
+    if not args.d2cgood:
+        for name, number, difference in check_include(paths):
+            failures += 1
+            print(f"include check: {name} {difference}")
+    while (time.perf_counter() - started < args.seconds) if args.seconds else checked < args.count:
+        text, options, problems = check_seed(seed, args.max_lines, paths, check)
+        checked += 1
+        if problems:
+            failures += 1
+            smallest = shrink(text, options, problems, check)
+            path = os.path.join(args.save_dir, f"fuzz-failure-{seed}.md")
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.write(smallest)
+            for name, number, difference in problems:
+                print(f"seed {seed} {options}: {name} differs on pass {number}: {difference}")
+            print(f"Saved a {len(smallest.splitlines())}-line outline that still fails to {path}")
+        seed += 1
+
+    print(f"Checked {checked} outlines (seeds {args.seed} to {seed - 1}) in {time.perf_counter() - started:.1f} "
+          f"seconds: {failures} failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
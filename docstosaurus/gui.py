@@ -0,0 +1,436 @@
+import os
+import logging
+import queue
+import threading
+import tkinter as tk
+from tkinter import filedialog, messagebox, scrolledtext
+
+from .budget import Budget, BudgetExceeded, format_report
+from .checkpoint import convert_resumable
+from .dedup import write_plan_deduplicated
+from .dockeys import assign_doc_keys
+from .engine import configure_logging, content_truncation, create_structure, make_sanitizer, set_content_titles
+from .importers import load_outline
+from .links import PATH_MAP_NAME, dump_path_map, resolve_links
+from .plan import dump_plan, plan_structure, summarize_plan, write_plan
+from .preview import TreePreview, planned_files
+from .search import SEARCH_INDEX_NAME, SearchIndex
+from .stage import create_staging_dir, rollback, swap_into_place
+from .templates import apply_templates, load_templates
+
+# Folders with more children than this are split into buckets when asked to
+BUCKET_SIZE = 1000
+
+def build_tree(input_file, budget=None, truncation='middle', content_titles=False, doc_keys=False, templates=None):
+    """
+    Parses an outline and adds what the chosen options put into its pages, so
+    Run, Dry Run and Preview all plan the same tree.
+
+    Returns:
+        tuple: (root, number of pages laid out with templates)
+    """
+    # Build the hierarchy tree, reading outliner exports (OPML, JSON, YAML) straight into it
+    root = load_outline(input_file, budget, truncation=truncation)
+
+    if content_titles:
+        set_content_titles(root)
+
+    if doc_keys:
+        # Computed once from the outline, so URLs do not depend on file names
+        assign_doc_keys(root)
+
+    # Compiled once and rendered for every page before anything is written
+    laid_out = apply_templates(root, templates) if templates else 0
+    return root, laid_out
+
+class ProcessingApp:
+    def __init__(self, root, truncation='middle', content_titles=False):
+        self.root = root
+        self.root.title("Processing App")
+        self.create_widgets()
+        self.cut_long_names.set(truncation == 'cut')
+        self.content_titles.set(content_titles)
+
+    def create_widgets(self):
+        # Input File Selection
+        self.file_button = tk.Button(self.root, text="Select Input Markdown File", command=self.select_input_file)
+        self.file_button.pack(pady=5)
+
+        # Base Directory Selection
+        self.base_dir_button = tk.Button(self.root, text="Select Base Directory (Output)", command=self.select_base_dir)
+        self.base_dir_button.pack(pady=5)
+
+        # Page Templates Folder Selection
+        self.templates_button = tk.Button(self.root, text="Select Page Templates Folder (Optional)",
+                                          command=self.select_templates_dir)
+        self.templates_button.pack(pady=5)
+
+        # Checkbox for Alternative Sanitization
+        self.use_alternative_sanitization = tk.BooleanVar()
+        self.sanitization_checkbox = tk.Checkbutton(self.root, text="Remove Digits", variable=self.use_alternative_sanitization)
+        self.sanitization_checkbox.pack(pady=5)
+
+        # Checkbox for Cutting Long Names
+        self.cut_long_names = tk.BooleanVar()
+        self.truncation_checkbox = tk.Checkbutton(self.root, text="Cut Long Names Instead of Shortening the Middle",
+                                                  variable=self.cut_long_names)
+        self.truncation_checkbox.pack(pady=5)
+
+        # Checkbox for Titling Pages With Their Names
+        self.content_titles = tk.BooleanVar()
+        self.content_titles_checkbox = tk.Checkbutton(self.root, text="Title Pages With Their Sanitized Names",
+                                                      variable=self.content_titles)
+        self.content_titles_checkbox.pack(pady=5)
+
+        # Checkbox for Allow Empty Folders
+        self.allow_empty_folders = tk.BooleanVar()
+        self.empty_folders_checkbox = tk.Checkbutton(self.root, text="Allow Empty Folders", variable=self.allow_empty_folders)
+        self.empty_folders_checkbox.pack(pady=5)
+
+        # Checkbox for Deduplicating Identical Files
+        self.deduplicate_files = tk.BooleanVar()
+        self.deduplicate_checkbox = tk.Checkbutton(self.root, text="Link Identical Files", variable=self.deduplicate_files)
+        self.deduplicate_checkbox.pack(pady=5)
+
+        # Checkbox for Resource Limits
+        self.enforce_limits = tk.BooleanVar(value=True)
+        self.limits_checkbox = tk.Checkbutton(self.root, text="Enforce Resource Limits", variable=self.enforce_limits)
+        self.limits_checkbox.pack(pady=5)
+
+        # Checkbox for Resumable Runs
+        self.resumable = tk.BooleanVar()
+        self.resumable_checkbox = tk.Checkbutton(self.root, text="Resume Interrupted Runs", variable=self.resumable)
+        self.resumable_checkbox.pack(pady=5)
+
+        # Checkbox for Staged Output
+        self.stage_output = tk.BooleanVar()
+        self.stage_checkbox = tk.Checkbutton(self.root, text="Stage Output and Swap When Done", variable=self.stage_output)
+        self.stage_checkbox.pack(pady=5)
+
+        # Checkbox for the Search Index
+        self.build_search_index = tk.BooleanVar()
+        self.search_index_checkbox = tk.Checkbutton(self.root, text="Build Search Index", variable=self.build_search_index)
+        self.search_index_checkbox.pack(pady=5)
+
+        # Checkbox for Cross-Reference Links
+        self.resolve_links = tk.BooleanVar()
+        self.links_checkbox = tk.Checkbutton(self.root, text="Resolve [[Node Title]] Links and Save Path Map",
+                                             variable=self.resolve_links)
+        self.links_checkbox.pack(pady=5)
+
+        # Checkbox for Splitting Large Folders
+        self.split_large_folders = tk.BooleanVar()
+        self.split_checkbox = tk.Checkbutton(self.root, text=f"Split Folders Over {BUCKET_SIZE} Items",
+                                             variable=self.split_large_folders)
+        self.split_checkbox.pack(pady=5)
+
+        # Checkbox for Docusaurus Front Matter Keys
+        self.doc_keys = tk.BooleanVar()
+        self.doc_keys_checkbox = tk.Checkbutton(self.root, text="Add Ids, Slugs and Sidebar Positions",
+                                                variable=self.doc_keys)
+        self.doc_keys_checkbox.pack(pady=5)
+
+        # Run Processing Button
+        self.run_button = tk.Button(self.root, text="Run Processing", command=self.run_processing)
+        self.run_button.pack(pady=20)
+
+        # Dry Run Button
+        self.dry_run_button = tk.Button(self.root, text="Dry Run (Save Write Plan)", command=self.run_dry_run)
+        self.dry_run_button.pack(pady=5)
+
+        # Preview Button
+        self.preview_button = tk.Button(self.root, text="Preview Structure", command=self.run_preview)
+        self.preview_button.pack(pady=5)
+
+        # Roll Back Button
+        self.rollback_button = tk.Button(self.root, text="Roll Back to Previous Output", command=self.rollback_output)
+        self.rollback_button.pack(pady=5)
+
+        # Delete Contents Button
+        self.delete_button = tk.Button(self.root, text="Delete Contents of Base Directory", command=self.delete_base_directory_contents)
+        self.delete_button.pack(pady=5)
+
+        # Output Text Area
+        self.output_text = scrolledtext.ScrolledText(self.root, height=15, state='disabled')
+        self.output_text.pack(pady=10)
+
+    def log(self, message):
+        self.output_text.config(state='normal')
+        self.output_text.insert(tk.END, message + '\n')
+        self.output_text.config(state='disabled')
+        self.output_text.see(tk.END)
+
+    def select_input_file(self):
+        self.input_file = filedialog.askopenfilename(filetypes=[("Markdown files", "*.md"), ("Outliner exports", "*.opml *.json *.yaml *.yml"), ("All files", "*.*")])
+        if self.input_file:
+            self.log(f"Selected input file: {self.input_file}")
+
+    def select_base_dir(self):
+        self.base_dir = filedialog.askdirectory()
+        if self.base_dir:
+            self.log(f"Selected base directory: {self.base_dir}")
+
+    def select_templates_dir(self):
+        self.templates_dir = filedialog.askdirectory()
+        if self.templates_dir:
+            self.log(f"Selected page templates folder: {self.templates_dir}")
+
+    def templates(self):
+        templates_dir = getattr(self, 'templates_dir', None)
+        return load_templates(templates_dir) if templates_dir else None
+
+    def run_processing(self):
+        if not hasattr(self, 'input_file') or not self.input_file:
+            messagebox.showerror("Error", "Please select an input Markdown file.")
+            return
+
+        if not hasattr(self, 'base_dir') or not self.base_dir:
+            messagebox.showerror("Error", "Please select a base directory.")
+            return
+
+        self.execute_processing(self.base_dir, self.input_file)
+
+    def run_dry_run(self):
+        if not hasattr(self, 'input_file') or not self.input_file:
+            messagebox.showerror("Error", "Please select an input Markdown file.")
+            return
+
+        if not hasattr(self, 'base_dir') or not self.base_dir:
+            messagebox.showerror("Error", "Please select a base directory.")
+            return
+
+        plan_file = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")])
+        if not plan_file:
+            return
+
+        try:
+            sanitize_function = self.sanitize_function()
+            root, _ = build_tree(self.input_file, truncation=content_truncation(sanitize_function),
+                                 **self.tree_options())
+            include_base = os.path.dirname(os.path.abspath(self.input_file))
+            plan = plan_structure(root, self.base_dir, sanitize_function, self.allow_empty_folders.get(),
+                                  include_base=include_base, bucket_size=self.bucket_size())
+            if self.resolve_links.get():
+                self.log_link_problems(resolve_links(plan, include_base))
+            with open(plan_file, 'w', encoding='utf-8') as f:
+                dump_plan(plan, self.base_dir, f)
+            self.log(f"Dry run plan saved to {plan_file}: {summarize_plan(plan)}")
+        except Exception as e:
+            self.log(f"An error occurred during the dry run:\n{str(e)}")
+
+    def run_preview(self):
+        if not hasattr(self, 'input_file') or not self.input_file:
+            messagebox.showerror("Error", "Please select an input Markdown file.")
+            return
+
+        if not hasattr(self, 'base_dir') or not self.base_dir:
+            messagebox.showerror("Error", "Please select a base directory.")
+            return
+
+        # Parse and plan off the Tk thread so the window keeps responding
+        input_file, base_dir = self.input_file, self.base_dir
+        sanitize_function = self.sanitize_function()
+        allow_empty_folders = self.allow_empty_folders.get()
+        budget = Budget.defaults() if self.enforce_limits.get() else None
+        bucket_size = self.bucket_size()
+        tree_options = self.tree_options()
+        links = self.resolve_links.get()
+        results = queue.Queue()
+
+        def work():
+            try:
+                root, _ = build_tree(input_file, budget, content_truncation(sanitize_function), **tree_options)
+                include_base = os.path.dirname(os.path.abspath(input_file))
+                plan = plan_structure(root, base_dir, sanitize_function, allow_empty_folders,
+                                      include_base=include_base, budget=budget, bucket_size=bucket_size)
+                if links:
+                    resolve_links(plan, include_base)
+                results.put((root, planned_files(plan, base_dir), None))
+            except Exception as e:
+                results.put((None, None, e))
+
+        def poll():
+            try:
+                root, files, error = results.get_nowait()
+            except queue.Empty:
+                self.root.after(100, poll)
+                return
+            self.preview_button.config(state='normal')
+            if isinstance(error, BudgetExceeded):
+                self.log(format_report(error.report))
+            elif error is not None:
+                self.log(f"An error occurred while preparing the preview:\n{str(error)}")
+            else:
+                TreePreview(self.root, root, files, title=f"Preview of {os.path.basename(input_file)}")
+                self.log("Preview ready")
+
+        self.preview_button.config(state='disabled')
+        self.log("Preparing preview...")
+        threading.Thread(target=work, daemon=True).start()
+        self.root.after(100, poll)
+
+    def rollback_output(self):
+        if not hasattr(self, 'base_dir') or not self.base_dir:
+            messagebox.showerror("Error", "Please select a base directory.")
+            return
+
+        try:
+            rollback(self.base_dir)
+            self.log(f"Rolled back {self.base_dir} to the previous tree")
+        except Exception as e:
+            error_msg = f"Failed to roll back: {e}"
+            self.log(error_msg)
+            logging.error(error_msg)
+
+    def delete_base_directory_contents(self):
+        if not hasattr(self, 'base_dir') or not self.base_dir:
+            messagebox.showerror("Error", "Please select a base directory.")
+            return
+    
+        for root, dirs, files in os.walk(self.base_dir, topdown=False):
+            for name in files:
+                try:
+                    os.remove(os.path.join(root, name))
+                except Exception as e:
+                    logging.error(f"Failed to delete file {name}: {e}")
+            for name in dirs:
+                try:
+                    os.rmdir(os.path.join(root, name))
+                except Exception as e:
+                    logging.error(f"Failed to delete directory {name}: {e}")
+    
+        self.log(f"Deleted contents of base directory: {self.base_dir}")
+        messagebox.showinfo("Info", "Contents of base directory deleted successfully.")
+
+    def sanitize_function(self):
+        return make_sanitizer(self.use_alternative_sanitization.get(), 'cut' if self.cut_long_names.get() else 'middle')
+
+    def bucket_size(self):
+        return BUCKET_SIZE if self.split_large_folders.get() else None
+
+    def tree_options(self):
+        # Read on the Tk thread, for build_tree
+        return {'content_titles': self.content_titles.get(), 'doc_keys': self.doc_keys.get(),
+                'templates': self.templates()}
+
+    def log_link_problems(self, problems):
+        for problem in problems or []:
+            message = f"Link [[{problem['Target']}]] is {problem['Problem']}"
+            self.log(message)
+            logging.warning(message)
+
+    def execute_processing(self, base_dir, input_file):
+        try:
+            self.log("Starting processing...")
+            if self.stage_output.get():
+                # Build next to the live tree and swap it into place once complete
+                output_dir = create_staging_dir(base_dir, keep_existing=self.resumable.get())
+            else:
+                output_dir = base_dir
+            os.makedirs(output_dir, exist_ok=True)
+
+            # Configure logging to write to a file in the base directory
+            log_file_path = os.path.join(output_dir, 'processing.log')
+            file_handler = logging.FileHandler(log_file_path)
+            file_handler.setLevel(logging.DEBUG)
+            formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+            file_handler.setFormatter(formatter)
+            logging.getLogger().addHandler(file_handler)
+
+            # Limits are checked while parsing and planning, before anything is written
+            budget = Budget.defaults() if self.enforce_limits.get() else None
+
+            # Select the sanitization function based on the checkbox state
+            sanitize_function = self.sanitize_function()
+            truncation = content_truncation(sanitize_function)
+
+            tree_options = self.tree_options()
+            templates = tree_options['templates']
+
+            # A resumable run parses the outline and adds keys and layouts itself, so the
+            # outline is parsed once and its nodes are counted against the budget once
+            root = None
+            if not self.resumable.get():
+                root, laid_out = build_tree(input_file, budget, truncation, **tree_options)
+                if templates:
+                    self.log(f"Laid out {laid_out} pages with templates")
+
+            # Include directives are resolved relative to the outline
+            include_base = os.path.dirname(os.path.abspath(input_file))
+
+            # Mapping from unique IDs to filesystem paths
+            id_to_path_map = {'root': output_dir}
+
+            links = self.resolve_links.get()
+            path_map_file = os.path.join(output_dir, PATH_MAP_NAME)
+
+            plan = None
+            if self.resumable.get():
+                # Journal progress so a run that dies partway continues where it stopped
+                stats = convert_resumable(input_file, output_dir, sanitize_function, self.allow_empty_folders.get(),
+                                          include_base, budget, id_to_path_map=id_to_path_map, links=links,
+                                          path_map=path_map_file if links else None, bucket_size=self.bucket_size(),
+                                          doc_keys=tree_options['doc_keys'], templates=templates,
+                                          content_titles=tree_options['content_titles'])
+                if stats['Resumed']:
+                    self.log(f"Resumed an interrupted run after {stats['Skipped']} of {stats['Entries']} entries")
+                self.log_link_problems(stats.get('LinkProblems'))
+            elif self.deduplicate_files.get() or budget is not None or links or self.split_large_folders.get():
+                # Plan the whole tree first so it can be checked before writing
+                plan = plan_structure(root, output_dir, sanitize_function, self.allow_empty_folders.get(), id_to_path_map,
+                                      include_base, budget, bucket_size=self.bucket_size())
+                if links:
+                    # Links need every page's final path, which only the complete plan has
+                    self.log_link_problems(resolve_links(plan, include_base))
+                    with open(path_map_file, 'w', encoding='utf-8') as f:
+                        dump_path_map(plan, output_dir, f)
+                if self.deduplicate_files.get():
+                    # Write each distinct document once and link the identical ones to it
+                    stats = write_plan_deduplicated(plan, include_base=include_base)
+                    self.log(f"Wrote {stats['Written']} files and linked {stats['Linked']} identical ones "
+                             f"({stats['BytesSaved']} bytes saved)")
+                else:
+                    write_plan(plan, include_base)
+            else:
+                # Create the folder structure and .md files using the selected sanitization function
+                create_structure(root, output_dir, id_to_path_map, sanitize_function, self.allow_empty_folders.get(),
+                                 include_base)
+
+            if self.build_search_index.get():
+                # Index the pages from the tree in memory instead of crawling what was written
+                index = SearchIndex(output_dir)
+                if plan is not None:
+                    index.add_plan(plan)
+                else:
+                    if root is None:
+                        # Parsed again for the index; the resumable run already checked the limits
+                        root = load_outline(input_file, truncation=truncation)
+                    index.add_tree(root, id_to_path_map, self.allow_empty_folders.get())
+                index.write(os.path.join(output_dir, SEARCH_INDEX_NAME))
+                self.log(f"Indexed {len(index.pages)} pages for search")
+
+            if output_dir != base_dir:
+                previous_dir = swap_into_place(output_dir, base_dir)
+                if previous_dir:
+                    self.log(f"Swapped the new tree into place, the previous one is kept in {previous_dir}")
+
+            self.log("Processing completed successfully!")
+            logging.info("Processing completed successfully!")
+
+        except BudgetExceeded as e:
+            error_msg = format_report(e.report)
+            self.log(error_msg)
+            logging.error(error_msg)
+        except Exception as e:
+            error_msg = f"An error occurred during processing:\n{str(e)}"
+            self.log(error_msg)
+            logging.error(error_msg)
+
+def main(truncation='middle', content_titles=False):
+    configure_logging()
+    root = tk.Tk()
+    app = ProcessingApp(root, truncation, content_titles)
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,119 @@
+import logging
+import time
+from contextlib import contextmanager
+
+# Events buffered before the listeners are called
+BATCH_SIZE = 1024
+
+
+class Hooks:
+    """
+    Collects conversion events and hands them to listeners in batches.
+
+    Pass an instance as `hooks` to categorize_lines, create_structure,
+    load_outline, plan_structure or write_plan. Without listeners the engine
+    treats it like no hooks at all, so an idle instance costs nothing.
+
+    Every event is a dict whose 'Event' is one of:
+        'node_parsed'        'UniqueID', 'LineNumber', 'Depth'
+        'path_planned'       'UniqueID', 'Path', 'Kind'
+        'collision_resolved' 'UniqueID', 'Path', 'Suffix'
+        'file_written'       'Path', plus 'Bytes' when written from a plan
+        'phase_finished'     'Phase' ('parse', 'plan' or 'write'), 'Seconds'
+
+    Listeners are called with a list of events, at most `batch_size` at a time,
+    and always when a phase finishes, so nothing is held back past the end of a
+    run. A listener that raises is logged and does not stop the conversion.
+    One instance observes one run at a time; it is not thread-safe.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.listeners = []
+        self.batch_size = batch_size
+        self._events = []
+        self._phases = set()
+
+    def add_listener(self, listener):
+        """
+        Registers a callable taking a list of events. Returns it, so it can decorate.
+        """
+        self.listeners.append(listener)
+        return listener
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def emit(self, event):
+        self._events.append(event)
+        if len(self._events) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Delivers the buffered events to every listener.
+        """
+        if not self._events:
+            return
+        events, self._events = self._events, []
+        for listener in self.listeners:
+            try:
+                listener(events)
+            except Exception as e:
+                logging.error(f"Event listener {listener!r} failed: {e}")
+
+    def in_phase(self, name):
+        return name in self._phases
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Times a phase and emits 'phase_finished' when it completes.
+        """
+        self._phases.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+            self._events.append({'Event': 'phase_finished', 'Phase': name,
+                                 'Seconds': time.perf_counter() - started})
+        finally:
+            self._phases.discard(name)
+            self.flush()
+
+
+class Throughput:
+    """
+    A listener counting events and phase time, for exporting throughput metrics.
+
+    Example:
+        throughput = hooks.add_listener(Throughput())
+        ...
+        metrics = throughput.report()
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.seconds = {}
+
+    def __call__(self, events):
+        counts = self.counts
+        for event in events:
+            kind = event['Event']
+            counts[kind] = counts.get(kind, 0) + 1
+            if kind == 'phase_finished':
+                phase = event['Phase']
+                self.seconds[phase] = self.seconds.get(phase, 0.0) + event['Seconds']
+
+    def report(self):
+        """
+        Returns:
+            dict: 'Counts' per event, 'Seconds' per phase, and 'NodesPerSecond',
+            'PathsPerSecond' and 'FilesPerSecond' for the phases that ran.
+        """
+        report = {'Counts': dict(self.counts), 'Seconds': dict(self.seconds)}
+        for key, event, phase in (('NodesPerSecond', 'node_parsed', 'parse'),
+                                  ('PathsPerSecond', 'path_planned', 'plan'),
+                                  ('FilesPerSecond', 'file_written', 'write')):
+            seconds = self.seconds.get(phase)
+            if seconds:
+                report[key] = self.counts.get(event, 0) / seconds
+        return report
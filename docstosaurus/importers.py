@@ -0,0 +1,249 @@
+import json
+import os
+import xml.etree.ElementTree as ET
+
+from .engine import categorize_lines, generate_unique_id, sanitize_and_clean_name
+from .scan import scan_outline
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional, only the YAML importer needs it
+    yaml = None
+
+# Spaces per level in the list lines imported nodes stand for
+INDENT_WIDTH = 2
+
+# Keys that hold a node's title, children and note in JSON and YAML outlines
+_TITLE_KEYS = ('text', 'title', 'name')
+_CHILDREN_KEYS = ('children', 'items')
+_NOTE_KEYS = ('note', '_note', 'body')
+
+
+class OutlineBuilder:
+    """
+    Builds the tree `categorize_lines` returns from start/end events.
+
+    Every node is given the line it would have in an equivalent indented list
+    (INDENT_WIDTH spaces per level and a '- ' marker, with note lines as bold
+    body lines below it), and that line's number, so titles, names and unique
+    IDs come out as if the list had been written out and parsed. The hierarchy
+    is the one the events give rather than the one the text would parse to: a
+    title's '**' markers are removed instead of turning it into a body line, and
+    a node whose title leaves no name is left out, its note and children going
+    to its nearest named ancestor (notes at the top level are dropped).
+    """
+
+    def __init__(self, budget=None, truncation='middle'):
+        self.budget = budget
+        self.truncation = truncation
+        self.root = {'Children': [], 'BodyLines': [], 'UniqueID': 'root'}
+        self.stack = [self.root]  # Open nodes, None for unnamed ones
+        self.depth = 0  # Named nodes on the stack
+        self.line_number = 0
+
+    def start(self, title, note=None):
+        """
+        Opens a node below the current one.
+
+        Args:
+            title (str): The node's title.
+            note (str or list, optional): Text written into the node's file.
+        """
+        indent_level = (len(self.stack) - 1) * INDENT_WIDTH
+        line = ' ' * indent_level + '- ' + ' '.join(str(title).splitlines()).replace('**', '')
+        self.line_number += 1
+        content = sanitize_and_clean_name(line, truncation=self.truncation).strip()
+        if not content:
+            self.stack.append(None)  # Nothing to name it by, its children move up
+            self._add_note(self._parent(), note, indent_level)
+            return
+
+        node = {
+            'IndentLevel': indent_level,
+            'Content': content,
+            'Children': [],
+            'BodyLines': [],
+            'UniqueID': generate_unique_id(f"{indent_level}_{content}_{self.line_number}"),
+            'FULLLINE': line
+        }
+        self.depth += 1
+        if self.budget is not None:
+            self.budget.add_node(self.depth, self.line_number)
+        self._parent()['Children'].append(node)
+        self.stack.append(node)
+        self._add_note(node, note, indent_level)
+
+    def end(self):
+        """
+        Closes the most recently opened node.
+        """
+        if self.stack.pop() is not None:
+            self.depth -= 1
+
+    def _parent(self):
+        for node in reversed(self.stack):
+            if node is not None:
+                return node
+
+    def _add_note(self, node, note, indent_level):
+        if not note:
+            return
+        lines = note.splitlines() if isinstance(note, str) else [str(line) for line in note]
+        prefix = ' ' * (indent_level + INDENT_WIDTH)
+        for text in lines:
+            self.line_number += 1
+            line = f"{prefix}**{text.rstrip()}**"
+            # Lines that leave nothing after sanitizing are skipped, as categorize_lines skips them
+            if node is not self.root and sanitize_and_clean_name(line, truncation=self.truncation).strip():
+                node['BodyLines'].append(line)
+
+
+def import_opml(path, budget=None, truncation='middle'):
+    """
+    Imports an OPML outline, streaming it with iterparse so only the open
+    branch of the document is held in memory.
+
+    Titles come from each <outline>'s `text` attribute (or `title`) and notes
+    from the `_note` attribute used by most outliners.
+
+    Args:
+        path (str): The path to the OPML file.
+        budget (Budget, optional): Limits checked as nodes are read.
+        truncation (str): How long titles are shortened in each node's Content.
+
+    Returns:
+        dict: The hierarchical structure.
+    """
+    builder = OutlineBuilder(budget, truncation)
+    open_elements = []
+    for event, element in ET.iterparse(path, events=('start', 'end')):
+        if element.tag != 'outline':
+            continue
+        if event == 'start':
+            title = element.get('text', element.get('title', ''))
+            builder.start(title, element.get('_note'))
+            open_elements.append(element)
+        else:
+            builder.end()
+            open_elements.pop()
+            # Drop finished subtrees, their attributes were read on the way in
+            if open_elements:
+                open_elements[-1].clear()
+            else:
+                element.clear()
+    return builder.root
+
+
+def _node_parts(item):
+    """
+    Splits a JSON or YAML outline item into (title, note, children).
+
+    An item is a plain value (a leaf title), a mapping with title, children and
+    note keys, or a mapping of one title to its list of children.
+    """
+    if isinstance(item, dict):
+        title = next((item[key] for key in _TITLE_KEYS if key in item), None)
+        if title is None and len(item) == 1:
+            title, children = next(iter(item.items()))
+            return title, None, children if isinstance(children, list) else [children]
+        children = next((item[key] for key in _CHILDREN_KEYS if key in item), [])
+        note = next((item[key] for key in _NOTE_KEYS if key in item), None)
+        return '' if title is None else title, note, children or []
+    return item, None, []
+
+
+def build_from_items(items, budget=None, truncation='middle'):
+    """
+    Builds the hierarchical structure from nested JSON or YAML items.
+
+    Args:
+        items (list or dict): The top-level items, or a mapping with a children key.
+        budget (Budget, optional): Limits checked as nodes are added.
+        truncation (str): How long titles are shortened in each node's Content.
+
+    Returns:
+        dict: The hierarchical structure.
+    """
+    if isinstance(items, dict):
+        items = next((items[key] for key in _CHILDREN_KEYS if key in items), [items])
+    builder = OutlineBuilder(budget, truncation)
+    pending = [iter(items)]  # Walked with an explicit stack so depth is not limited by recursion
+    while pending:
+        item = next(pending[-1], StopIteration)
+        if item is StopIteration:
+            pending.pop()
+            if pending:
+                builder.end()
+            continue
+        title, note, children = _node_parts(item)
+        builder.start('' if title is None else title, note)
+        pending.append(iter(children))
+    return builder.root
+
+
+def import_json(path, budget=None, truncation='middle'):
+    """
+    Imports a JSON outline, see build_from_items for the accepted shapes.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return build_from_items(json.load(f), budget, truncation)
+
+
+def import_yaml(path, budget=None, truncation='middle'):
+    """
+    Imports a YAML outline, see build_from_items for the accepted shapes.
+    """
+    if yaml is None:
+        raise ImportError("Importing YAML outlines requires PyYAML")
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(path, 'r', encoding='utf-8') as f:
+        return build_from_items(yaml.load(f, Loader=loader) or [], budget, truncation)
+
+
+# File extension -> function that reads that format into the hierarchical structure
+IMPORTERS = {
+    '.opml': import_opml,
+    '.json': import_json,
+    '.yaml': import_yaml,
+    '.yml': import_yaml,
+}
+
+
+def register_importer(extension, importer):
+    """
+    Adds or replaces the importer used for files with the given extension.
+
+    Args:
+        extension (str): The file extension, including the dot.
+        importer (function): Takes a path, an optional Budget and the truncation
+            of Content ('middle' or 'cut') and returns the hierarchical structure.
+    """
+    IMPORTERS[extension.lower()] = importer
+
+
+def load_outline(input_file, budget=None, hooks=None, truncation='middle'):
+    """
+    Reads an outline into the hierarchical structure: through the importer
+    registered for its extension, or as an indented list otherwise.
+
+    Args:
+        input_file (str): The outline file, or '-' for an indented list on stdin.
+        budget (Budget, optional): Limits checked while the outline is parsed.
+        hooks (Hooks, optional): Times reading and parsing as the 'parse' phase.
+            Only indented lists emit 'node_parsed' events.
+        truncation (str): How long titles are shortened in each node's Content,
+            content_truncation(sanitize_function) for the names they are written under.
+
+    Returns:
+        dict: The hierarchical structure.
+    """
+    if hooks is not None and hooks.listeners and not hooks.in_phase('parse'):
+        with hooks.phase('parse'):
+            return load_outline(input_file, budget, hooks, truncation)
+
+    importer = IMPORTERS.get(os.path.splitext(input_file)[1].lower())
+    if importer is not None:
+        return importer(input_file, budget, truncation)
+    with scan_outline(input_file) as scan:
+        list_content, indent_levels = scan.lines()
+    return categorize_lines(list_content, indent_levels, budget, hooks, truncation)
@@ -0,0 +1,154 @@
+import errno
+import logging
+import os
+import re
+
+# A body line made only of `**!include path**`, optionally as a list item, splices that file into the page
+_INCLUDE_RE = re.compile(r'\s*(?:(?:[-*+]|\d+[.)])\s*)?!include\s+(.+?)\s*')
+
+# Bytes handed to the kernel per call; copy_file_range and sendfile cap a call near 2 GiB anyway
+COPY_CHUNK = 1 << 30
+
+# Errors that mean "this kind of copy is not possible here", so the next method is tried
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSOCK}
+
+# Include paths already refused for leaving include_base, so each is logged once
+_refused = set()
+
+
+def include_path(line, include_base=None):
+    """
+    Returns the file an include directive points at, or None for any other body line.
+
+    With an `include_base`, only files inside it can be included: a directive
+    whose path leaves it, through '..', an absolute path or a symlink, is
+    logged and kept as a plain body line, so an outline cannot copy arbitrary
+    files into the output.
+
+    Args:
+        line (str): A body line, with '**' markers still in place.
+        include_base (str, optional): The directory relative paths are resolved
+            against and include files must stay in. Without it paths are used as given.
+    """
+    if '!include' not in line:
+        return None
+    match = _INCLUDE_RE.fullmatch(line.replace('**', ''))
+    if not match:
+        return None
+    path = match.group(1)
+    if len(path) >= 2 and path[0] == path[-1] and path[0] in '"\'':
+        path = path[1:-1]
+    if include_base is not None:
+        path = os.path.join(include_base, path)
+        base = os.path.realpath(include_base)
+        if os.path.commonpath([os.path.realpath(path), base]) != base:
+            if path not in _refused:
+                _refused.add(path)
+                logging.warning(f"Not including {path}: it is outside {include_base}")
+            return None
+    return path
+
+
+def _copy_range(src_fd, dst_fd, offset, size):
+    while offset < size:
+        copied = os.copy_file_range(src_fd, dst_fd, min(size - offset, COPY_CHUNK), offset)
+        if copied == 0:
+            break
+        offset += copied
+    return offset
+
+
+def _sendfile(src_fd, dst_fd, offset, size):
+    while offset < size:
+        copied = os.sendfile(dst_fd, src_fd, offset, min(size - offset, COPY_CHUNK))
+        if copied == 0:
+            break
+        offset += copied
+    return offset
+
+
+def _read_write(src_fd, dst_fd, offset, size):
+    while offset < size:
+        data = os.pread(src_fd, min(size - offset, 1 << 20), offset)
+        if not data:
+            break
+        os.write(dst_fd, data)
+        offset += len(data)
+    return offset
+
+
+def splice_file(dst_fd, src_path):
+    """
+    Appends a file at the current offset of `dst_fd` without reading it into Python.
+
+    copy_file_range is tried first, then sendfile, then a bounded read/write loop
+    for platforms and filesystems that support neither. A newline is added when
+    the file does not end with one, so the next body line starts on its own line.
+
+    Args:
+        dst_fd (int): The descriptor of the file being written, flushed up to this point.
+        src_path (str): The file to include.
+
+    Returns:
+        int: The number of bytes appended.
+    """
+    src_fd = os.open(src_path, os.O_RDONLY)
+    try:
+        size = os.fstat(src_fd).st_size
+        start = os.lseek(dst_fd, 0, os.SEEK_CUR)
+        offset = 0
+        for copy in (_copy_range, _sendfile, _read_write):
+            if copy is _copy_range and not hasattr(os, 'copy_file_range'):
+                continue
+            if copy is _sendfile and not hasattr(os, 'sendfile'):
+                continue
+            try:
+                offset = copy(src_fd, dst_fd, offset, size)
+                break
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+                # Every method advances the destination offset, so resume where this one stopped
+                offset = os.lseek(dst_fd, 0, os.SEEK_CUR) - start
+        if offset and os.pread(src_fd, 1, offset - 1) != b'\n':
+            os.write(dst_fd, b'\n')
+            return offset + 1
+        return offset
+    finally:
+        os.close(src_fd)
+
+
+def included_size(path):
+    """
+    Returns how many bytes splice_file will append for `path`, or None if it cannot be read.
+    """
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b'\n':
+                    size += 1
+            return size
+    except OSError:
+        return None
+
+
+def write_body_line(md_file, line, include_base=None):
+    """
+    Writes one body line to an open text file, splicing in the file it includes if any.
+
+    Args:
+        md_file (file): The Markdown file being written.
+        line (str): The body line, with '**' markers still in place.
+        include_base (str, optional): The directory relative include paths are resolved against.
+    """
+    path = include_path(line, include_base)
+    if path is not None:
+        md_file.flush()  # Everything before the include must reach the descriptor first
+        try:
+            splice_file(md_file.fileno(), path)
+            return
+        except OSError as e:
+            logging.error(f"Failed to include {path}: {e}")
+    md_file.write(line.replace('**', '') + '\n')
@@ -0,0 +1,128 @@
+import json
+import os
+import re
+from urllib.parse import quote
+
+from .engine import page_layout
+from .plan import page_size
+
+# [[Node Title]], [[Node Title|label]] or [[id:UniqueID]]
+LINK_RE = re.compile(r'\[\[([^\[\]|]+?)(?:\|([^\[\]]+?))?\]\]')
+
+ID_PREFIX = 'id:'
+
+PATH_MAP_NAME = 'path-map.json'
+
+# List markers in front of a title: -, *, +, 1. or 1)
+_MARKER_RE = re.compile(r'^\s*(?:[-*+]|\d+[.)])?\s*')
+
+
+def title_key(text):
+    """
+    Returns the key a node title or link target is looked up by: without
+    indentation and list marker, case-folded, with runs of whitespace collapsed.
+    """
+    return ' '.join(_MARKER_RE.sub('', text, count=1).split()).casefold()
+
+
+def link_index(plan):
+    """
+    Indexes the pages of a plan by unique ID and by title.
+
+    Returns:
+        tuple: ({unique ID: entry}, {title key: entry}, {title key: count}).
+        Only entries that write a file are linkable; a title used more than once
+        maps to its first page.
+    """
+    by_id = {}
+    by_title = {}
+    title_counts = {}
+    for entry in plan:
+        if not entry['File']:
+            continue
+        by_id[entry['UniqueID']] = entry
+        key = title_key(entry['Node']['FULLLINE'])
+        title_counts[key] = title_counts.get(key, 0) + 1
+        by_title.setdefault(key, entry)
+    return by_id, by_title, title_counts
+
+
+def relative_link(source_file, target_file):
+    """
+    Returns a Markdown link target from one page to another, relative to the
+    source page's folder and percent-encoded.
+    """
+    path = os.path.relpath(target_file, os.path.dirname(source_file))
+    return quote(path.replace(os.sep, '/'))
+
+
+def resolve_links(plan, include_base=None):
+    """
+    Rewrites `[[Node Title]]` links in body lines into relative Markdown links.
+
+    A link names its target by title, matched as title_key does, or by unique ID
+    as `[[id:<UniqueID>]]`; `[[target|label]]` sets the link text. Links that
+    match no page are left as written.
+
+    The tree is not modified: entries with links get a copy of their node with
+    the rewritten 'BodyLines', which write_plan and the other plan writers use,
+    and their 'Bytes' are updated.
+
+    Args:
+        plan (list): The planned entries, see plan_structure.
+        include_base (str, optional): The directory include directives are resolved against.
+
+    Returns:
+        list: Problems found, as dicts with 'UniqueID' (the page with the link),
+        'Target' and 'Problem' ('unresolved', or 'ambiguous' when the title
+        belongs to several pages and the first one was used).
+    """
+    by_id, by_title, title_counts = link_index(plan)
+    problems = []
+
+    for entry in plan:
+        if not entry['File']:
+            continue
+        node = entry['Node']
+        lines = node.get('BodyLines', [])
+        if not any('[[' in line for line in lines):
+            continue
+
+        def replace(match):
+            target, label = match.group(1).strip(), match.group(2)
+            if target.startswith(ID_PREFIX):
+                found = by_id.get(target[len(ID_PREFIX):].strip())
+            else:
+                key = title_key(target)
+                found = by_title.get(key)
+                if found is not None and title_counts[key] > 1:
+                    problems.append({'UniqueID': entry['UniqueID'], 'Target': target, 'Problem': 'ambiguous'})
+            if found is None:
+                problems.append({'UniqueID': entry['UniqueID'], 'Target': target, 'Problem': 'unresolved'})
+                return match.group(0)
+            text = label.strip() if label else target
+            return f"[{text}]({relative_link(entry['File'], found['File'])})"
+
+        resolved = [LINK_RE.sub(replace, line) if '[[' in line else line for line in lines]
+        if resolved != lines:
+            node = dict(node, BodyLines=resolved)
+            entry['Node'] = node
+            entry['Bytes'] = page_size(page_layout(node), resolved, include_base)
+
+    return problems
+
+
+def dump_path_map(plan, base_dir, f):
+    """
+    Writes the final unique ID to path mapping as JSON, for downstream tools.
+
+    Each unique ID maps to {'Path': the node's folder or file path without
+    '.md', 'File': its Markdown file or None}, relative to `base_dir`.
+    """
+    def relative(path):
+        return os.path.relpath(path, base_dir).replace(os.sep, '/') if path else None
+
+    path_map = {entry['UniqueID']: {'Path': relative(entry['Path']), 'File': relative(entry['File'])}
+                for entry in plan}
+    json.dump(path_map, f, indent=2, ensure_ascii=False)
+    f.write('\n')
@@ -0,0 +1,210 @@
+import argparse
+import sys
+
+from .budget import add_sanitizer_arguments, sanitizer_from_args
+from .engine import content_truncation, sanitize_and_clean_name
+from .scan import scan_outline
+
+ERROR = 'error'
+WARNING = 'warning'
+
+
+class _Level:
+    """
+    An open node on the indentation stack: just enough to check its children.
+    """
+
+    __slots__ = ('indent', 'line_number', 'content', 'names', 'has_children', 'has_folder_child', 'renamed')
+
+    def __init__(self, indent, line_number, content):
+        self.indent = indent
+        self.line_number = line_number
+        self.content = content
+        self.names = {}  # Sanitized child name -> nodes that were written under that name
+        self.has_children = False
+        self.has_folder_child = False
+        self.renamed = []  # (node, earlier node or None, name) renamed if the children become folders
+
+
+def _diagnostic(line_number, severity, code, message):
+    return {'Line': line_number, 'Severity': severity, 'Code': code, 'Message': message}
+
+
+def _renamed(node, earlier, name):
+    if earlier is None:
+        return _diagnostic(node.line_number, WARNING, 'renamed',
+                           f"Name '{name}' is the path of the folder it goes into, this node gets a collision suffix")
+    return _diagnostic(node.line_number, WARNING, 'renamed',
+                       f"Folder '{name}' from line {earlier.line_number} already exists, this node gets a "
+                       f"collision suffix" + _truncation_note(node, earlier))
+
+
+def _closed(level):
+    # With empty folders allowed, a node's children all become folders if any has
+    # children of its own, and are all skipped otherwise
+    if level.has_folder_child:
+        for node, earlier, name in level.renamed:
+            yield _renamed(node, earlier, name)
+
+
+def lint_lines(lines, sanitize_function=sanitize_and_clean_name, allow_empty_folders=False):
+    """
+    Checks an outline in one pass without building the tree.
+
+    Only an indentation stack with the sanitized names of each open node's
+    children is kept, so memory follows the outline's depth and fan-out rather
+    than its size.
+
+    Args:
+        lines (iterable): (line_number, line, indent_level) for every line.
+        sanitize_function (function): The function create_structure will sanitize names with.
+        allow_empty_folders (bool): Whether create_structure will allow empty folders;
+            leaves then become folders next to a sibling with children, or are
+            skipped, and never overwrite each other.
+
+    Yields:
+        dict: Diagnostics with 'Line', 'Severity', 'Code' and 'Message'.
+    """
+    root = _Level(-1, 0, None)
+    stack = [root]
+    indent_style = None  # (character, line number) of the first indented line
+    pending = None  # (node, earlier node) to check once we know if node is a leaf
+    truncation = content_truncation(sanitize_function)
+
+    for line_number, line, indent_level in lines:
+        if not line:
+            continue
+        content = sanitize_and_clean_name(line, truncation=truncation).strip()
+        if not content:
+            continue
+
+        if '**' in line:
+            if len(stack) == 1:
+                yield _diagnostic(line_number, ERROR, 'body-before-heading',
+                                  "Body line appears before any heading and has no file to go into")
+            continue
+
+        # Indentation characters
+        indentation = line[:indent_level]
+        if '\t' in indentation and ' ' in indentation:
+            yield _diagnostic(line_number, WARNING, 'mixed-indent',
+                              "Indentation mixes tabs and spaces; each counts as one level")
+        elif indentation:
+            character = indentation[0]
+            if indent_style is None:
+                indent_style = (character, line_number)
+            elif character != indent_style[0] and character in ' \t':
+                used = 'tabs' if character == '\t' else 'spaces'
+                earlier = 'spaces' if character == '\t' else 'tabs'
+                yield _diagnostic(line_number, WARNING, 'inconsistent-indent',
+                                  f"Indented with {used} while line {indent_style[1]} uses {earlier}")
+
+        popped = []
+        while stack[-1].indent >= indent_level:
+            level = stack.pop()
+            popped.append(level.indent)
+            if allow_empty_folders:
+                yield from _closed(level)
+        parent = stack[-1]
+        if popped and indent_level not in popped:
+            yield _diagnostic(line_number, WARNING, 'misaligned-dedent',
+                              f"Dedent to column {indent_level} matches no open level; "
+                              f"the line becomes a child of line {parent.line_number}" if parent is not root
+                              else f"Dedent to column {indent_level} matches no open level")
+
+        # The previous node is a folder exactly when this node is its child
+        if pending is not None:
+            node, earlier = pending
+            if node is not parent:
+                yield _diagnostic(node.line_number, ERROR, 'overwrite',
+                                  f"Overwrites the file written for line {earlier.line_number}: both are named "
+                                  f"'{sanitize_function(node.content)}'" + _truncation_note(node, earlier))
+            pending = None
+        parent.has_children = True
+        if len(stack) > 1:
+            stack[-2].has_folder_child = True
+
+        node = _Level(indent_level, line_number, content)
+        name = sanitize_function(content)
+        if name == '..' or '/' in name or '\\' in name:
+            yield _diagnostic(line_number, ERROR, 'invalid-path', f"Name '{name}' does not stay inside its folder")
+
+        # '' and '.' name the folder itself, which always exists, so they get a suffix
+        claimed = None if name in ('', '.') else parent.names.get(name)
+        if allow_empty_folders:
+            if name in ('', '.') or claimed is not None:
+                parent.renamed.append((node, claimed, name))
+            else:
+                parent.names[name] = node
+        elif name in ('', '.'):
+            yield _renamed(node, None, name)
+        elif claimed is None:
+            parent.names[name] = [node]
+        elif any(earlier.has_children for earlier in claimed):
+            earlier = next(earlier for earlier in claimed if earlier.has_children)
+            yield _renamed(node, earlier, name)
+        else:
+            pending = (node, claimed[-1])
+            claimed.append(node)
+
+        stack.append(node)
+
+    if allow_empty_folders:
+        for level in stack:
+            yield from _closed(level)
+
+    if pending is not None:
+        node, earlier = pending
+        yield _diagnostic(node.line_number, ERROR, 'overwrite',
+                          f"Overwrites the file written for line {earlier.line_number}: both are named "
+                          f"'{sanitize_function(node.content)}'" + _truncation_note(node, earlier))
+
+
+def _truncation_note(node, earlier):
+    if node.content != earlier.content:
+        return " (different titles that become the same name after sanitizing and truncation)"
+    return ""
+
+
+def iter_outline(scan):
+    """
+    Yields (line_number, line, indent_level) from a scanned outline, chunk by chunk.
+    """
+    line_number = 0
+    for lines, indents in scan.chunks():
+        for line, indent_level in zip(lines, indents):
+            line_number += 1
+            yield line_number, line, indent_level
+
+
+def lint_outline(source, sanitize_function=sanitize_and_clean_name, allow_empty_folders=False):
+    """
+    Lints an outline file (or '-' for stdin) in a single streaming pass.
+
+    Returns:
+        list: The diagnostics, sorted by line.
+    """
+    with scan_outline(source) as scan:
+        return sorted(lint_lines(iter_outline(scan), sanitize_function, allow_empty_folders),
+                      key=lambda diagnostic: diagnostic['Line'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check an outline for problems before converting it.")
+    parser.add_argument('input_file', help="The outline to check, '-' for stdin")
+    add_sanitizer_arguments(parser)
+    parser.add_argument('--strict', action='store_true', help="Fail on warnings too")
+    args = parser.parse_args()
+
+    sanitize_function = sanitizer_from_args(args)
+    diagnostics = lint_outline(args.input_file, sanitize_function, args.allow_empty_folders)
+    for diagnostic in diagnostics:
+        print(f"{args.input_file}:{diagnostic['Line']}: {diagnostic['Severity']}: "
+              f"{diagnostic['Message']} [{diagnostic['Code']}]")
+
+    failing = [d for d in diagnostics if d['Severity'] == ERROR or args.strict]
+    sys.exit(1 if failing else 0)
+
+
+if __name__ == "__main__":
+    main()
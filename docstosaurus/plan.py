@@ -0,0 +1,438 @@
+import argparse
+import json
+import os
+import sys
+from itertools import repeat
+
+from .budget import (BudgetExceeded, add_budget_arguments, add_sanitizer_arguments, budget_from_args, format_report,
+                     sanitizer_from_args)
+from .engine import configure_logging, content_truncation, page_layout, sanitize_and_clean_name, write_page
+from .importers import load_outline
+from .include import include_path, included_size
+
+# Names that normpath would collapse, so they take the slow, checked path
+_SPECIAL_NAMES = ('', '.', '..')
+
+# Extra bytes per newline once text mode translates '\n' on this platform
+_NEWLINE_EXTRA = len(os.linesep) - 1
+
+# Docusaurus reads a folder's sidebar label and position from this file
+CATEGORY_NAME = '_category_.json'
+
+
+def render_page(layout, lines):
+    """
+    Renders a page exactly as write_page writes it, without splicing includes.
+
+    Args:
+        layout (tuple): (head, tail), see page_layout.
+        lines (list): The body lines, with '**' markers still in place.
+
+    Returns:
+        str: The file text, with '\n' line endings.
+    """
+    head, tail = layout
+    parts = [head]
+    for line in lines:
+        parts.append(line.replace('**', '') + '\n')
+    parts.append(tail)
+    return ''.join(parts)
+
+
+def rendered_size(text):
+    """
+    Returns how many bytes a rendered file takes on disk on this platform.
+    """
+    return len(text.encode('utf-8')) + text.count('\n') * _NEWLINE_EXTRA
+
+
+def page_size(layout, lines, include_base=None):
+    """
+    Returns how many bytes write_page writes for a page, counting included
+    files at their size instead of their directive line.
+    """
+    size = rendered_size(render_page(layout, lines))
+    for line in lines:
+        if '!include' in line:
+            size += _included_extra(line, include_base)
+    return size
+
+
+def body_line_size(line, include_base=None):
+    """
+    Returns how many bytes write_page writes for one body line.
+    """
+    size = rendered_size(line.replace('**', '') + '\n')
+    if '!include' in line:
+        size += _included_extra(line, include_base)
+    return size
+
+
+def _included_extra(line, include_base):
+    # What splicing the included file adds over writing the directive line itself
+    path = include_path(line, include_base)
+    spliced = included_size(path) if path is not None else None
+    if spliced is None:
+        return 0
+    return spliced - rendered_size(line.replace('**', '') + '\n')
+
+
+def bucket_children(names, bucket_size, by_name=True):
+    """
+    Splits a folder's children into buckets of consecutive names.
+
+    Children are ordered by name, the order a flat folder lists them in, and cut
+    into runs of `bucket_size`. A run of equal names is never cut, so children
+    that collide or overwrite each other stay in the same folder, and a bucket
+    can grow past `bucket_size` for them.
+
+    Args:
+        names (list): The sanitized names of the children, in outline order.
+        bucket_size (int): The most children per bucket.
+        by_name (bool): Order by name; otherwise the children keep outline order,
+            the order their sidebar_position from assign_doc_keys lists them in.
+
+    Returns:
+        list: Per bucket, the indices of its children in that order.
+    """
+    order = sorted(range(len(names)), key=names.__getitem__) if by_name else range(len(names))
+    buckets = []
+    current = []
+    for index in order:
+        if len(current) >= bucket_size and names[index] != names[current[-1]]:
+            buckets.append(current)
+            current = []
+        current.append(index)
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def category_json(label, position):
+    """
+    Renders the _category_.json written for a bucket folder.
+    """
+    return json.dumps({'label': label, 'position': position}, ensure_ascii=False, indent=2) + '\n'
+
+
+def plan_structure(node, parent_path, sanitize_function, allow_empty_folders=False, id_to_path_map=None,
+                   include_base=None, budget=None, collisions=None, hooks=None, bucket_size=None):
+    """
+    Plans everything create_structure would do for a tree, entirely in memory.
+
+    Name collisions are resolved the way create_structure resolves them: against
+    what already exists on disk plus everything planned earlier in the same run.
+    Disk is only consulted inside directories that already exist.
+
+    Args:
+        node (dict): The root of the hierarchical structure.
+        parent_path (str): The base directory.
+        sanitize_function (function): The function to use for sanitizing names.
+        allow_empty_folders (bool): Whether to allow empty folders.
+        id_to_path_map (dict, optional): Filled with the mapping from unique IDs to paths.
+        include_base (str, optional): The directory include directives are resolved against.
+        budget (Budget, optional): Limits on bytes, files per directory and time,
+            checked as each entry is planned.
+        collisions (set, optional): Unique IDs of the nodes that get a collision
+            suffix. When given, these decisions are replayed instead of being
+            taken from disk, e.g. to re-plan a run that already wrote part of the
+            tree, and 'Action' only reflects overwrites within the plan.
+        hooks (Hooks, optional): Receives 'path_planned' and 'collision_resolved'
+            events and 'phase_finished' for the 'plan' phase.
+        bucket_size (int, optional): The most children a folder gets. The children
+            of a bigger node go into numbered bucket folders of consecutive names,
+            see bucket_children, nested when there are more buckets than that.
+            Each has a _category_.json with its name range as label and its
+            position, so the sidebar lists the pages in the same order as the
+            flat folder would. Children with doc keys from assign_doc_keys are
+            bucketed in outline order instead, which their sidebar_position
+            follows, so the sidebar keeps following the outline.
+
+    Returns:
+        list: One entry per node, in the order create_structure visits them. Each
+        entry has 'UniqueID', 'Content', 'Kind' ('directory', 'file' or 'skipped'),
+        'Path', 'File' (the Markdown file, or None), 'Collision' (the suffix added,
+        or None), 'Action' ('create' or 'overwrite'), 'Bytes' and 'Node'.
+        Bucket folders come before their node's children as entries of kind
+        'bucket', with no 'Node', the _category_.json path as 'Category'
+        and their sidebar 'Position'.
+    """
+    if hooks is not None:
+        if not hooks.listeners:
+            hooks = None
+        elif not hooks.in_phase('plan'):
+            with hooks.phase('plan'):
+                return plan_structure(node, parent_path, sanitize_function, allow_empty_folders, id_to_path_map,
+                                      include_base, budget, collisions, hooks, bucket_size)
+
+    if id_to_path_map is None:
+        id_to_path_map = {}
+    plan = []
+    planned = set()  # Paths created by earlier entries of this plan
+
+    def exists(path, parent_on_disk):
+        return path in planned or (parent_on_disk and os.path.exists(path))
+
+    def place(node, node_path, node_on_disk):
+        # (child, folder, folder with separator, folder exists on disk) per child
+        children = node.get('Children', [])
+        if not bucket_size or len(children) <= bucket_size:
+            prefix = os.path.join(node_path, '')
+            return zip(children, repeat(node_path), repeat(prefix), repeat(node_on_disk))
+
+        names = [sanitize_function(child['Content']) for child in children]
+        groups = bucket_children(names, bucket_size, by_name=children[0].get('FrontMatter') is None)
+        # A folder holds no more than bucket_size buckets either, so huge nodes get ranges of ranges
+        while len(groups) > bucket_size:
+            groups = [groups[i:i + bucket_size] for i in range(0, len(groups), bucket_size)]
+        placed = [None] * len(children)
+
+        def add_buckets(groups, folder_path, folder_on_disk, unique_id):
+            width = len(str(len(groups)))
+            for position, group in enumerate(groups, 1):
+                first = last = group
+                while isinstance(first, list):
+                    first, last = first[0], last[-1]
+                folder = os.path.join(folder_path, f"{position:0{width}d}")
+                label = f"{names[first]} – {names[last]}"
+                on_disk = folder_on_disk and os.path.isdir(folder)
+                planned.add(folder)
+                entry = {
+                    'UniqueID': f"{unique_id}:{position}",
+                    'Content': label,
+                    'Kind': 'bucket',
+                    'Path': folder,
+                    'File': None,
+                    'Category': os.path.join(folder, CATEGORY_NAME),
+                    'Position': position,
+                    'Collision': None,
+                    'Action': 'create',
+                    'Bytes': rendered_size(category_json(label, position)),
+                    'Node': None
+                }
+                plan.append(entry)
+                if hooks is not None:
+                    hooks.emit({'Event': 'path_planned', 'UniqueID': entry['UniqueID'], 'Path': folder,
+                                'Kind': 'bucket'})
+                if budget is not None:
+                    budget.add_entry(entry)
+                if isinstance(group[0], list):
+                    add_buckets(group, folder, on_disk, entry['UniqueID'])
+                    continue
+                prefix = os.path.join(folder, '')
+                for index in group:
+                    placed[index] = (children[index], folder, prefix, on_disk)
+
+        add_buckets(groups, node_path, node_on_disk, node['UniqueID'])
+        return placed
+
+    def visit(node, node_path, node_on_disk):
+        for child, parent_path, prefix, parent_on_disk in place(node, node_path, node_on_disk):
+            content = child['Content']
+            sanitized_name = sanitize_function(content)
+            normalized_parent_path = parent_path
+            if sanitized_name in _SPECIAL_NAMES or os.sep in sanitized_name or (os.altsep and os.altsep in sanitized_name):
+                normalized_current_path = os.path.normpath(os.path.join(parent_path, sanitized_name))
+                if not os.path.commonpath([normalized_current_path, normalized_parent_path]) == normalized_parent_path:
+                    raise ValueError(f"Invalid path detected: {normalized_current_path} is not within {normalized_parent_path}")
+            else:
+                # A plain name joined to a normalized parent is already normalized and inside it
+                normalized_current_path = prefix + sanitized_name
+
+            collision = None
+            if collisions is not None:
+                collided = child['UniqueID'] in collisions
+            else:
+                collided = exists(normalized_current_path, parent_on_disk)
+            if collided:
+                collision = '_' + child['UniqueID'][:6]
+                sanitized_name += collision
+                normalized_current_path = os.path.join(normalized_parent_path, sanitized_name)
+                if hooks is not None:
+                    hooks.emit({'Event': 'collision_resolved', 'UniqueID': child['UniqueID'],
+                                'Path': normalized_current_path, 'Suffix': collision})
+
+            id_to_path_map[child['UniqueID']] = normalized_current_path
+
+            if child['Children']:
+                kind = 'directory'
+            elif allow_empty_folders:
+                siblings_have_children = any(sibling['Children'] for sibling in node['Children'] if sibling != child)
+                kind = 'directory' if siblings_have_children else 'skipped'
+            else:
+                kind = 'file'
+
+            entry = {
+                'UniqueID': child['UniqueID'],
+                'Content': content,
+                'Kind': kind,
+                'Path': normalized_current_path,
+                'File': None,
+                'Collision': collision,
+                'Action': 'create',
+                'Bytes': 0,
+                'Node': child
+            }
+            plan.append(entry)
+            if hooks is not None:
+                hooks.emit({'Event': 'path_planned', 'UniqueID': child['UniqueID'], 'Path': normalized_current_path,
+                            'Kind': kind})
+            if kind == 'skipped':
+                if budget is not None:
+                    budget.add_entry(entry)
+                continue
+
+            if kind == 'directory':
+                on_disk = parent_on_disk and os.path.isdir(normalized_current_path)
+                planned.add(normalized_current_path)
+                # The base folder comes into existence with the first thing written to it
+                planned.add(normalized_parent_path)
+                md_file_path = os.path.join(normalized_current_path, 'index.md')
+                file_parent_on_disk = on_disk
+            else:
+                on_disk = False
+                md_file_path = f"{normalized_current_path}.md"
+                file_parent_on_disk = parent_on_disk
+                if normalized_current_path != normalized_parent_path:
+                    planned.add(normalized_parent_path)  # Not for an empty name, whose file goes next to the folder
+
+            if exists(md_file_path, file_parent_on_disk):
+                entry['Action'] = 'overwrite'
+            planned.add(md_file_path)
+            entry['File'] = md_file_path
+            entry['Bytes'] = page_size(page_layout(child), child.get('BodyLines', []), include_base)
+            if budget is not None:
+                budget.add_entry(entry)
+
+            if child['Children']:
+                visit(child, normalized_current_path, on_disk)
+
+    visit(node, os.path.normpath(parent_path), collisions is None and os.path.isdir(parent_path))
+    return plan
+
+
+def write_plan(plan, include_base=None, hooks=None):
+    """
+    Carries out a plan from plan_structure, producing the same tree create_structure would.
+
+    Args:
+        plan (list): The planned entries.
+        include_base (str, optional): The directory include directives are resolved against.
+        hooks (Hooks, optional): Receives a 'file_written' event per file and
+            'phase_finished' for the 'write' phase.
+    """
+    if hooks is None or not hooks.listeners:
+        for entry in plan:
+            write_entry(entry, include_base)
+        return
+
+    with hooks.phase('write'):
+        for entry in plan:
+            write_entry(entry, include_base)
+            if entry['File']:
+                hooks.emit({'Event': 'file_written', 'Path': entry['File'], 'Bytes': entry['Bytes']})
+
+
+def write_entry(entry, include_base=None):
+    """
+    Carries out one planned entry: creates its directory, if any, and writes its file.
+    """
+    if entry['Kind'] == 'skipped':
+        return
+    if entry['Kind'] == 'bucket':
+        os.makedirs(entry['Path'], exist_ok=True)
+        with open(entry['Category'], 'w', encoding='utf-8') as f:
+            f.write(category_json(entry['Content'], entry['Position']))
+        return
+    if entry['Kind'] == 'directory':
+        os.makedirs(entry['Path'], exist_ok=True)
+    child = entry['Node']
+    write_page(entry['File'], page_layout(child), child.get('BodyLines', []), include_base)
+
+
+def summarize_plan(plan):
+    """
+    Counts what a plan will do.
+
+    Returns:
+        dict: Directory, file, skipped, collision and overwrite counts and total bytes.
+    """
+    summary = {'Directories': 0, 'Files': 0, 'Skipped': 0, 'Collisions': 0, 'Overwrites': 0, 'Bytes': 0}
+    for entry in plan:
+        if entry['Kind'] in ('directory', 'bucket'):
+            summary['Directories'] += 1
+        elif entry['Kind'] == 'skipped':
+            summary['Skipped'] += 1
+        if entry['File']:
+            summary['Files'] += 1
+        if entry['Collision']:
+            summary['Collisions'] += 1
+        if entry['Action'] == 'overwrite':
+            summary['Overwrites'] += 1
+        summary['Bytes'] += entry['Bytes']
+    return summary
+
+
+def dump_plan(plan, base_dir, f):
+    """
+    Writes a plan as JSON, one entry per line inside the 'Entries' list.
+    """
+    f.write('{"BaseDir": ' + json.dumps(base_dir) + ',\n')
+    f.write(' "Summary": ' + json.dumps(summarize_plan(plan)) + ',\n')
+    f.write(' "Entries": [')
+    separator = '\n  '
+    for entry in plan:
+        f.write(separator)
+        f.write(json.dumps({key: value for key, value in entry.items() if key != 'Node'}, ensure_ascii=False))
+        separator = ',\n  '
+    f.write('\n ]}\n')
+
+
+def dry_run(input_file, base_dir, sanitize_function=sanitize_and_clean_name, allow_empty_folders=False, budget=None,
+            hooks=None, bucket_size=None):
+    """
+    Parses an outline and plans its conversion without writing anything.
+
+    Args:
+        budget (Budget, optional): Limits enforced while parsing and planning.
+        hooks (Hooks, optional): Receives the parse and plan events.
+        bucket_size (int, optional): Split folders with more children into bucket
+            folders, see plan_structure.
+
+    Returns:
+        list: The plan, see plan_structure.
+    """
+    root = load_outline(input_file, budget, hooks, content_truncation(sanitize_function))
+    include_base = os.path.dirname(os.path.abspath(input_file))
+    return plan_structure(root, base_dir, sanitize_function, allow_empty_folders, include_base=include_base,
+                          budget=budget, hooks=hooks, bucket_size=bucket_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the write plan for an outline as JSON without touching disk.")
+    parser.add_argument('input_file', help="The outline to convert (indented list, OPML, JSON or YAML), '-' for stdin")
+    parser.add_argument('base_dir', help="The base directory the conversion would write into")
+    parser.add_argument('-o', '--output', help="Where to write the JSON plan (default: stdout)")
+    add_sanitizer_arguments(parser)
+    parser.add_argument('--bucket-size', type=int, help="Split folders with more children than this into buckets")
+    add_budget_arguments(parser)
+    args = parser.parse_args()
+
+    configure_logging()
+
+    sanitize_function = sanitizer_from_args(args)
+    try:
+        plan = dry_run(args.input_file, args.base_dir, sanitize_function, args.allow_empty_folders,
+                       budget_from_args(args), bucket_size=args.bucket_size)
+    except BudgetExceeded as e:
+        sys.stderr.write(format_report(e.report) + '\n')
+        sys.exit(2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            dump_plan(plan, args.base_dir, f)
+    else:
+        dump_plan(plan, args.base_dir, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
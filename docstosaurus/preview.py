@@ -0,0 +1,204 @@
+import os
+import tkinter as tk
+from tkinter import ttk
+
+from .engine import page_title
+
+# Rows inserted per expansion; bigger folders are split into ranges of this many
+PAGE_SIZE = 500
+
+_PLACEHOLDER = ':placeholder'
+
+
+def planned_files(plan, base_dir):
+    """
+    Returns {unique ID: (planned file relative to base_dir, note)} for the preview.
+    """
+    files = {}
+    for entry in plan:
+        if entry['File'] is None:
+            files[entry['UniqueID']] = ('', "not written")
+            continue
+        if entry['Collision']:
+            note = f"renamed with {entry['Collision']}"
+        elif entry['Action'] == 'overwrite':
+            note = "overwrites an existing file"
+        else:
+            note = ''
+        files[entry['UniqueID']] = (os.path.relpath(entry['File'], base_dir), note)
+    return files
+
+
+def _step(count):
+    # The range size per row that keeps a level at PAGE_SIZE rows or fewer
+    step = 1
+    while count > step * PAGE_SIZE:
+        step *= PAGE_SIZE
+    return step
+
+
+class TreePreview:
+    """
+    A window showing a parsed outline in a ttk.Treeview that only inserts rows
+    when their parent is expanded.
+
+    A node with more than PAGE_SIZE children shows ranges of children instead,
+    nested as deep as needed, so no expansion inserts more than PAGE_SIZE rows
+    and the widget stays responsive however big the outline is.
+    """
+
+    def __init__(self, master, root, files=None, title="Structure Preview"):
+        """
+        Args:
+            master (tk.Misc): The window that owns the preview.
+            root (dict): The tree from categorize_lines or an importer.
+            files (dict, optional): Planned files per unique ID, see planned_files.
+            title (str): The window title.
+        """
+        self.root = root
+        self.files = files or {}
+        self.containers = {}  # Row id -> (node, first child, end) for rows that have children
+        self.filled = set()
+
+        self.window = tk.Toplevel(master)
+        self.window.title(title)
+
+        search_frame = tk.Frame(self.window)
+        search_frame.pack(fill='x', padx=5, pady=5)
+        self.query = tk.StringVar()
+        search_entry = tk.Entry(search_frame, textvariable=self.query)
+        search_entry.pack(side='left', fill='x', expand=True)
+        search_entry.bind('<Return>', lambda event: self.find_next())
+        tk.Button(search_frame, text="Find Next", command=self.find_next).pack(side='left', padx=5)
+        self.status = tk.Label(search_frame, anchor='w', width=30)
+        self.status.pack(side='left')
+
+        tree_frame = tk.Frame(self.window)
+        tree_frame.pack(fill='both', expand=True)
+        self.tree = ttk.Treeview(tree_frame, columns=('File', 'Note'), selectmode='browse')
+        self.tree.heading('#0', text="Node")
+        self.tree.heading('File', text="Planned File")
+        self.tree.heading('Note', text="Note")
+        self.tree.column('#0', width=320)
+        self.tree.column('File', width=320)
+        self.tree.column('Note', width=180)
+        scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+        self.tree.bind('<<TreeviewOpen>>', self.on_open)
+
+        self.containers[''] = (root, 0, len(root.get('Children', [])))
+        self.fill('')
+
+    def on_open(self, event=None):
+        self.fill(self.tree.focus())
+
+    def fill(self, item):
+        """
+        Inserts the rows under an item the first time it is expanded.
+        """
+        if item in self.filled or item not in self.containers:
+            return
+        self.filled.add(item)
+        if self.tree.exists(item + _PLACEHOLDER):
+            self.tree.delete(item + _PLACEHOLDER)
+
+        node, start, end = self.containers[item]
+        children = node['Children']
+        step = _step(end - start)
+        if step == 1:
+            for child in children[start:end]:
+                self._insert_node(item, child)
+            return
+        for first in range(start, end, step):
+            last = min(first + step, end)
+            group = f"{node['UniqueID']}:{first}:{last}"
+            self.tree.insert(item, 'end', iid=group, text=f"[{first + 1} to {last} of {len(children)}]")
+            self._add_container(group, node, first, last)
+
+    def _insert_node(self, parent_item, node):
+        file, note = self.files.get(node['UniqueID'], ('', ''))
+        item = node['UniqueID']
+        self.tree.insert(parent_item, 'end', iid=item, text=page_title(node).strip(), values=(file, note))
+        if node['Children']:
+            self._add_container(item, node, 0, len(node['Children']))
+
+    def _add_container(self, item, node, start, end):
+        self.containers[item] = (node, start, end)
+        # Gives the row an expand arrow until its real rows are inserted
+        self.tree.insert(item, 'end', iid=item + _PLACEHOLDER, text="...")
+
+    def _row_for(self, item, index):
+        # The row under `item` that holds child number `index` of its node
+        node, start, end = self.containers[item]
+        step = _step(end - start)
+        if step == 1:
+            return node['Children'][index]['UniqueID']
+        first = start + (index - start) // step * step
+        return f"{node['UniqueID']}:{first}:{min(first + step, end)}"
+
+    def reveal(self, path):
+        """
+        Expands the rows down to a node and selects it.
+
+        Args:
+            path (list): The node's ancestors from the top level down, then the node.
+        """
+        item = ''
+        parent = self.root
+        for node in path:
+            index = next(i for i, child in enumerate(parent['Children']) if child is node)
+            while item != node['UniqueID']:
+                self.fill(item)
+                if item:
+                    self.tree.item(item, open=True)
+                item = self._row_for(item, index)
+            parent = node
+        self.tree.selection_set(item)
+        self.tree.focus(item)
+        self.tree.see(item)
+
+    def _walk(self):
+        # Yields (ancestors plus node) for every node, in outline order
+        path = []
+        stack = [iter(self.root.get('Children', []))]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                if path:
+                    path.pop()
+                continue
+            yield path + [child]
+            if child['Children']:
+                path.append(child)
+                stack.append(iter(child['Children']))
+
+    def find_next(self):
+        """
+        Selects the next node after the selected one whose title or planned file
+        contains the search text, wrapping around at the end.
+        """
+        query = self.query.get().strip().lower()
+        if not query:
+            return
+        selected = self.tree.focus()
+        passed = not selected
+        first = None
+        for path in self._walk():
+            node = path[-1]
+            if node['UniqueID'] == selected:
+                passed = True
+                continue
+            if query in page_title(node).lower() or query in self.files.get(node['UniqueID'], ('',))[0].lower():
+                if passed:
+                    first = path
+                    break
+                if first is None:
+                    first = path
+        if first is None:
+            self.status.config(text=f"Nothing matches '{query}'")
+            return
+        self.status.config(text='')
+        self.reveal(first)
@@ -0,0 +1,83 @@
+import io
+import sys
+
+# Outlines are read in batches of lines adding up to roughly this many bytes, so
+# a multi-GB file is never held as a single list of lines.
+CHUNK_SIZE = 1 << 23
+
+
+class OutlineScan:
+    """
+    An outline read in text mode in batches of lines.
+
+    CPython's text-mode reader already splits and decodes lines in C; scanning
+    the bytes of a memory-mapped file for newlines and indentation in Python
+    (or with NumPy) measured slower, so reading stays in text mode and the
+    batches only keep memory bounded for the streaming consumers.
+    """
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE, owned=True):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self._owned = owned
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.stream is None:
+            return
+        if self._owned:
+            self.stream.close()
+        else:
+            self.stream.detach()  # Leave the caller's binary file open
+        self.stream = None
+
+    def chunks(self):
+        """
+        Yields the outline chunk by chunk as lines and their indentation.
+
+        Lines match what `[line.rstrip() for line in f]` produces for a file opened
+        in text mode, and indentation matches `len(line) - len(line.lstrip())`.
+
+        Yields:
+            tuple: (lines, indent_levels) for one chunk.
+        """
+        while True:
+            batch = self.stream.readlines(self.chunk_size)
+            if not batch:
+                return
+            lines = [line.rstrip() for line in batch]
+            yield lines, [len(line) - len(line.lstrip()) for line in lines]
+
+    def lines(self):
+        """
+        Reads the whole outline.
+
+        Returns:
+            tuple: (lines, indent_levels), ready for `categorize_lines`.
+        """
+        lines = [line.rstrip() for line in self.stream]
+        return lines, [len(line) - len(line.lstrip()) for line in lines]
+
+
+def scan_outline(source, chunk_size=CHUNK_SIZE):
+    """
+    Opens an outline for chunked reading.
+
+    Args:
+        source (str or file): A path, '-' for stdin, or a binary file object.
+        chunk_size (int): Approximate number of bytes read at a time.
+
+    Returns:
+        OutlineScan: The outline. Close it (or use it as a context manager) to
+        release the file.
+    """
+    if source == '-':
+        return OutlineScan(io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8'), chunk_size, owned=False)
+    if isinstance(source, str):
+        return OutlineScan(open(source, 'r', encoding='utf-8'), chunk_size)
+    return OutlineScan(io.TextIOWrapper(source, encoding='utf-8'), chunk_size, owned=False)
@@ -0,0 +1,169 @@
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import tempfile
+
+from .budget import (BudgetExceeded, add_budget_arguments, add_sanitizer_arguments, budget_from_args, format_report,
+                     sanitizer_from_args)
+from .engine import configure_logging, content_truncation, page_title
+from .importers import load_outline
+from .plan import plan_structure
+
+SEARCH_INDEX_NAME = 'search-index.json'
+SEARCH_INDEX_VERSION = 1
+
+# A title word counts as much as this many body words
+TITLE_WEIGHT = 10
+
+_TOKEN_RE = re.compile(r'\w\w+')
+
+
+def tokenize(text):
+    """
+    Splits text into lowercase search tokens of two or more word characters.
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+class SearchIndex:
+    """
+    An inverted index over the pages of a conversion, built from the tree in
+    memory so the generated site never has to be crawled.
+
+    Pages are keyed by their Markdown file, so a file the outline writes more
+    than once is indexed with its final content, as it ends up on disk.
+    """
+
+    def __init__(self, base_dir):
+        self.base_dir = os.path.normpath(base_dir)
+        self.pages = {}  # Relative file -> (title, {token: weight})
+
+    def add(self, path, title, lines):
+        """
+        Indexes one page.
+
+        Args:
+            path (str): The Markdown file, inside `base_dir`.
+            title (str): The page title.
+            lines (list): The body lines, with '**' markers still in place.
+        """
+        weights = {}
+        for token in tokenize(title):
+            weights[token] = weights.get(token, 0) + TITLE_WEIGHT
+        for line in lines:
+            if '!include' in line:
+                continue  # The included file is not in memory
+            for token in tokenize(line.replace('**', '')):
+                weights[token] = weights.get(token, 0) + 1
+        relative = os.path.relpath(path, self.base_dir).replace(os.sep, '/')
+        self.pages[relative] = (title, weights)
+
+    def add_node(self, path, node):
+        self.add(path, page_title(node).strip(), node.get('BodyLines', []))
+
+    def add_plan(self, plan):
+        """
+        Indexes every file of a plan from plan_structure.
+        """
+        for entry in plan:
+            if entry['File']:
+                self.add_node(entry['File'], entry['Node'])
+
+    def add_tree(self, root, id_to_path_map, allow_empty_folders=False):
+        """
+        Indexes the files create_structure wrote for a tree, using the paths it
+        recorded in `id_to_path_map`.
+        """
+        def visit(node):
+            for child in node.get('Children', []):
+                path = id_to_path_map[child['UniqueID']]
+                if child['Children']:
+                    self.add_node(os.path.join(path, 'index.md'), child)
+                    visit(child)
+                elif not allow_empty_folders:
+                    self.add_node(f"{path}.md", child)
+                elif any(sibling['Children'] for sibling in node['Children'] if sibling != child):
+                    self.add_node(os.path.join(path, 'index.md'), child)
+
+        visit(root)
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: 'Version'; 'Docs', a list of [file relative to the base directory,
+            title]; and 'Index', mapping each token to a flat list of alternating
+            doc numbers and weights, heaviest first.
+        """
+        docs = []
+        postings = {}
+        for number, (path, (title, weights)) in enumerate(sorted(self.pages.items())):
+            docs.append([path, title])
+            for token, weight in weights.items():
+                postings.setdefault(token, []).append((weight, number))
+        index = {}
+        for token in sorted(postings):
+            flat = []
+            for weight, number in sorted(postings[token], key=lambda posting: (-posting[0], posting[1])):
+                flat.append(number)
+                flat.append(weight)
+            index[token] = flat
+        return {'Version': SEARCH_INDEX_VERSION, 'Docs': docs, 'Index': index}
+
+    def write(self, path):
+        """
+        Writes the index as compact JSON, gzip-compressed if `path` ends in '.gz'.
+        """
+        data = json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if path.endswith('.gz'):
+            with gzip.open(path, 'wb') as f:
+                f.write(data)
+        else:
+            with open(path, 'wb') as f:
+                f.write(data)
+
+
+def index_outline(input_file, sanitize_function, allow_empty_folders=False, budget=None):
+    """
+    Indexes the pages a conversion of an outline into an empty directory writes,
+    without writing them.
+
+    Returns:
+        SearchIndex: The index, with paths relative to the output directory.
+    """
+    root = load_outline(input_file, budget, truncation=content_truncation(sanitize_function))
+    include_base = os.path.dirname(os.path.abspath(input_file))
+    with tempfile.TemporaryDirectory() as empty_dir:
+        plan = plan_structure(root, empty_dir, sanitize_function, allow_empty_folders, include_base=include_base,
+                              budget=budget)
+        index = SearchIndex(empty_dir)
+        index.add_plan(plan)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the search index for the pages an outline converts to.")
+    parser.add_argument('input_file', help="The outline (indented list, OPML, JSON or YAML), '-' for stdin")
+    parser.add_argument('-o', '--output', default=SEARCH_INDEX_NAME,
+                        help=f"Where to write the index, gzipped if it ends in .gz (default: {SEARCH_INDEX_NAME})")
+    add_sanitizer_arguments(parser)
+    add_budget_arguments(parser)
+    args = parser.parse_args()
+
+    configure_logging()
+
+    sanitize_function = sanitizer_from_args(args)
+    try:
+        index = index_outline(args.input_file, sanitize_function, args.allow_empty_folders, budget_from_args(args))
+    except BudgetExceeded as e:
+        sys.stderr.write(format_report(e.report) + '\n')
+        sys.exit(2)
+    index.write(args.output)
+    print(f"Indexed {len(index.pages)} pages into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
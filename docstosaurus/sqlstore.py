@@ -0,0 +1,253 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+
+from .budget import (BudgetExceeded, add_budget_arguments, add_sanitizer_arguments, budget_from_args, format_report,
+                     sanitizer_from_args)
+from .dockeys import assign_doc_keys
+from .engine import configure_logging, content_truncation, page_layout, page_title
+from .importers import load_outline
+from .include import include_path
+from .links import resolve_links
+from .plan import plan_structure
+from .templates import apply_templates, load_templates
+
+SQLITE_STORE_VERSION = 1
+
+# Rows inserted per transaction
+BATCH_SIZE = 10000
+
+_SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE docs (
+    id INTEGER PRIMARY KEY,
+    unique_id TEXT NOT NULL,
+    parent_id INTEGER REFERENCES docs (id),
+    position INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    file TEXT,
+    title TEXT NOT NULL,
+    head TEXT,
+    body TEXT,
+    tail TEXT
+);
+"""
+
+# Created after the bulk insert, which is faster than keeping them up to date row by row
+_INDEXES = (
+    "CREATE INDEX docs_unique_id ON docs (unique_id)",
+    "CREATE INDEX docs_parent ON docs (parent_id, position)",
+    "CREATE UNIQUE INDEX docs_file ON docs (file) WHERE file IS NOT NULL",
+)
+
+_INSERT = ("INSERT INTO docs (id, unique_id, parent_id, position, depth, kind, path, file, title, head, body, tail) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+def body_text(lines, include_base=None):
+    """
+    Returns the body of a page as write_page writes it: '**' markers removed
+    and included files spliced in, each ending in a newline.
+    """
+    parts = []
+    for line in lines:
+        path = include_path(line, include_base)
+        if path is not None:
+            try:
+                with open(path, encoding='utf-8', errors='replace') as f:
+                    text = f.read()
+                parts.append(text if not text or text.endswith('\n') else text + '\n')
+                continue
+            except OSError as e:
+                logging.error(f"Failed to include {path}: {e}")
+        parts.append(line.replace('**', '') + '\n')
+    return ''.join(parts)
+
+
+def _rows(plan, base_dir, include_base, replaced):
+    # One row per node of the plan, in plan order
+    skip = len(os.path.join(base_dir, ''))
+    parent_of = {}  # Unique ID -> row id of the parent
+    position_of = {}  # Unique ID -> index in the parent's Children, from 1
+    top_level = 0  # The root is not in the plan, which lists its children in outline order
+    depth_of = {}  # Row id -> depth
+    row_of_file = {}
+    row_id = 0
+    for entry in plan:
+        node = entry['Node']
+        if node is None:
+            continue  # Bucket folders only exist on disk; their pages keep their outline parent
+        row_id += 1
+        parent = parent_of.get(entry['UniqueID'])
+        if parent is None:
+            top_level += 1
+            position = top_level
+        else:
+            position = position_of[entry['UniqueID']]
+        depth = depth_of[parent] + 1 if parent is not None else 1
+        depth_of[row_id] = depth
+        for child_position, child in enumerate(node['Children'], 1):
+            parent_of[child['UniqueID']] = row_id
+            position_of[child['UniqueID']] = child_position
+
+        file = head = body = tail = None
+        if entry['File']:
+            file = entry['File'][skip:].replace(os.sep, '/')
+            earlier = row_of_file.get(file)
+            if earlier is not None:
+                replaced.append(earlier)  # Overwritten on disk, so the later page owns the file
+            row_of_file[file] = row_id
+            head, tail = page_layout(node)
+            body = body_text(node.get('BodyLines', []), include_base)
+        yield (row_id, entry['UniqueID'], parent, position, depth, entry['Kind'],
+               entry['Path'][skip:].replace(os.sep, '/'), file, page_title(node).strip(), head, body, tail)
+
+
+def write_plan_sqlite(plan, db_path, base_dir, include_base=None, full_text=False, batch_size=BATCH_SIZE):
+    """
+    Writes the pages of a plan into one SQLite file instead of a tree of files.
+
+    Every node is a row of `docs` with its parent's row in `parent_id`, its
+    place among its siblings in the outline in `position`, and its `path` and `file` relative
+    to `base_dir` as the file conversion would write them. A page is
+    `head || body || tail`: the layout from page_layout around the body with
+    includes spliced in. Skipped nodes have no file or page. Bucket folders get
+    no row. `file` is unique; a page the conversion overwrites keeps its row
+    without a file.
+
+    Rows go in with one prepared INSERT run over batches of `batch_size`, one
+    transaction each, and the indexes on unique ID, parent and file are built
+    once at the end. The database is built under a temporary name with
+    journaling off and renamed over `db_path` once complete, so readers never
+    see a partial store.
+
+    Args:
+        plan (list): The planned entries from plan_structure.
+        db_path (str): The SQLite file to write; an existing one is replaced.
+        base_dir (str): The base directory the plan was made for.
+        include_base (str, optional): The directory include directives are resolved against.
+        full_text (bool): Also build `docs_fts`, an FTS5 index over the titles
+            and bodies of the pages, queried with
+            `SELECT rowid FROM docs_fts WHERE docs_fts MATCH ?`.
+        batch_size (int): Rows per transaction.
+
+    Returns:
+        dict: 'Rows', 'Pages' and 'DatabaseBytes', the size of the database file.
+    """
+    directory = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.docstosaurus-', suffix='.db', dir=directory)
+    os.close(fd)
+    try:
+        connection = sqlite3.connect(temp_path, isolation_level=None)
+        try:
+            connection.execute('PRAGMA journal_mode = OFF')
+            connection.execute('PRAGMA synchronous = OFF')
+            connection.executescript(_SCHEMA)
+
+            replaced = []
+            rows = _rows(plan, base_dir, include_base, replaced)
+            count = 0
+            while True:
+                batch = [row for _, row in zip(range(batch_size), rows)]
+                if not batch:
+                    break
+                connection.execute('BEGIN')
+                connection.executemany(_INSERT, batch)
+                connection.execute('COMMIT')
+                count += len(batch)
+
+            connection.execute('BEGIN')
+            connection.executemany("UPDATE docs SET file = NULL, head = NULL, body = NULL, tail = NULL WHERE id = ?",
+                                   ((row_id,) for row_id in replaced))
+            for statement in _INDEXES:
+                connection.execute(statement)
+            pages = connection.execute("SELECT count(*) FROM docs WHERE file IS NOT NULL").fetchone()[0]
+            if full_text:
+                try:
+                    connection.execute("CREATE VIRTUAL TABLE docs_fts USING fts5(title, body, content='docs', "
+                                       "content_rowid='id')")
+                except sqlite3.OperationalError as e:
+                    raise RuntimeError(f"Full-text indexing needs SQLite with FTS5: {e}") from None
+                connection.execute("INSERT INTO docs_fts (rowid, title, body) "
+                                   "SELECT id, title, body FROM docs WHERE file IS NOT NULL")
+            meta = {'Version': SQLITE_STORE_VERSION, 'FullText': bool(full_text)}
+            connection.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                                   ((key, json.dumps(value)) for key, value in meta.items()))
+            connection.execute('COMMIT')
+        finally:
+            connection.close()
+        os.replace(temp_path, db_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return {'Rows': count, 'Pages': pages, 'DatabaseBytes': os.path.getsize(db_path)}
+
+
+def convert_to_sqlite(input_file, db_path, sanitize_function, allow_empty_folders=False, budget=None,
+                      full_text=False, links=False, doc_keys=False, templates=None):
+    """
+    Converts an outline into a SQLite store, with the paths a conversion into
+    an empty directory would use. See write_plan_sqlite.
+
+    Args:
+        links (bool): Resolve `[[Node Title]]` links in body lines, see resolve_links.
+        doc_keys (bool): Put Docusaurus ids, slugs and sidebar positions in the
+            front matter, see assign_doc_keys.
+        templates (dict, optional): Page templates per depth, see apply_templates.
+
+    Returns:
+        dict: The counts from write_plan_sqlite, plus 'LinkProblems' when links are resolved.
+    """
+    root = load_outline(input_file, budget, truncation=content_truncation(sanitize_function))
+    if doc_keys:
+        assign_doc_keys(root)
+    if templates:
+        apply_templates(root, templates)
+    include_base = os.path.dirname(os.path.abspath(input_file))
+    with tempfile.TemporaryDirectory() as empty_dir:
+        plan = plan_structure(root, empty_dir, sanitize_function, allow_empty_folders, include_base=include_base,
+                              budget=budget)
+        link_problems = resolve_links(plan, include_base) if links else None
+        stats = write_plan_sqlite(plan, db_path, empty_dir, include_base, full_text)
+    if link_problems is not None:
+        stats['LinkProblems'] = link_problems
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert an outline into a SQLite database of pages.")
+    parser.add_argument('input_file', help="The outline (indented list, OPML, JSON or YAML)")
+    parser.add_argument('db_path', help="The SQLite file to write")
+    add_sanitizer_arguments(parser)
+    parser.add_argument('--full-text', action='store_true', help="Build an FTS5 index over titles and bodies")
+    parser.add_argument('--resolve-links', action='store_true', help="Turn [[Node Title]] in body lines into links")
+    parser.add_argument('--doc-keys', action='store_true', help="Add ids, slugs and sidebar positions to front matter")
+    parser.add_argument('--templates', help="Lay pages out with the page.md and level-N.md templates in this folder")
+    add_budget_arguments(parser)
+    args = parser.parse_args()
+
+    configure_logging()
+
+    sanitize_function = sanitizer_from_args(args)
+    try:
+        stats = convert_to_sqlite(args.input_file, args.db_path, sanitize_function, args.allow_empty_folders,
+                                  budget_from_args(args), args.full_text, args.resolve_links, args.doc_keys,
+                                  load_templates(args.templates) if args.templates else None)
+    except BudgetExceeded as e:
+        sys.stderr.write(format_report(e.report) + '\n')
+        sys.exit(2)
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
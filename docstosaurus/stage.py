@@ -0,0 +1,152 @@
+import argparse
+import ctypes
+import ctypes.util
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+
+from .engine import configure_logging
+
+# Sibling directories of the base directory
+STAGING_SUFFIX = '.staging'
+PREVIOUS_SUFFIX = '.previous'
+
+# renameat2() arguments for an atomic exchange of two paths (Linux 3.15+)
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+
+def _renameat2():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        function = libc.renameat2
+    except (OSError, AttributeError, TypeError):
+        return None
+    function.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    function.restype = ctypes.c_int
+    return function
+
+
+_renameat2_function = _renameat2()
+
+
+def exchange(path_a, path_b):
+    """
+    Swaps two directories, atomically with renameat2() where the platform
+    supports it. Elsewhere it falls back to three renames through a temporary
+    name, which is not atomic: in between, `path_a` briefly does not exist and
+    then holds the contents of `path_b`.
+    """
+    if _renameat2_function is not None:
+        result = _renameat2_function(_AT_FDCWD, os.fsencode(path_a), _AT_FDCWD, os.fsencode(path_b),
+                                     _RENAME_EXCHANGE)
+        if result == 0:
+            return
+        error = ctypes.get_errno()
+        logging.warning(f"renameat2 exchange failed ({os.strerror(error)}), swapping {path_a} and {path_b} "
+                        f"with three renames, which is not atomic")
+    else:
+        logging.warning(f"No renameat2 on this platform, swapping {path_a} and {path_b} with three renames, "
+                        f"which is not atomic")
+    temporary = path_a + '.swap'
+    os.rename(path_a, temporary)
+    os.rename(path_b, path_a)
+    os.rename(temporary, path_b)
+
+
+def staging_path(base_dir):
+    return os.path.normpath(base_dir) + STAGING_SUFFIX
+
+
+def previous_path(base_dir):
+    return os.path.normpath(base_dir) + PREVIOUS_SUFFIX
+
+
+def create_staging_dir(base_dir, keep_existing=False):
+    """
+    Creates the staging directory next to `base_dir`, on the same filesystem so it
+    can be renamed into place.
+
+    Args:
+        base_dir (str): The live output directory.
+        keep_existing (bool): Reuse a staging directory left by an interrupted run
+            (to resume it) instead of starting from an empty one.
+
+    Returns:
+        str: The staging directory.
+    """
+    staging_dir = staging_path(base_dir)
+    if os.path.exists(staging_dir) and not keep_existing:
+        shutil.rmtree(staging_dir)
+    os.makedirs(staging_dir, exist_ok=True)
+    return staging_dir
+
+
+def swap_into_place(staging_dir, base_dir):
+    """
+    Replaces `base_dir` with the staging directory in one step where exchange
+    can do so atomically, keeping the tree it replaces as the previous tree for
+    rollback.
+
+    Returns:
+        str: The previous tree, or None if `base_dir` did not exist.
+    """
+    base_dir = os.path.normpath(base_dir)
+    if not os.path.exists(base_dir):
+        os.rename(staging_dir, base_dir)
+        return None
+
+    previous_dir = previous_path(base_dir)
+    if os.path.exists(previous_dir):
+        shutil.rmtree(previous_dir)
+    # With renameat2, consumers of base_dir see a single change: the old tree swapped for the new one
+    exchange(staging_dir, base_dir)
+    os.rename(staging_dir, previous_dir)
+    return previous_dir
+
+
+def rollback(base_dir):
+    """
+    Swaps the previous tree back into place; the rolled back tree becomes the previous one.
+    """
+    previous_dir = previous_path(base_dir)
+    if not os.path.isdir(previous_dir):
+        raise FileNotFoundError(f"No previous tree to roll back to: {previous_dir}")
+    exchange(previous_dir, os.path.normpath(base_dir))
+
+
+@contextmanager
+def staged_output(base_dir, keep_existing=False):
+    """
+    Yields a staging directory to build into and swaps it into place if the
+    block completes. On error the live tree is left untouched; the staging
+    directory is kept when `keep_existing` is set, so the run can be resumed,
+    and removed otherwise.
+
+    Example:
+        with staged_output(base_dir) as output_dir:
+            create_structure(root, output_dir, ...)
+    """
+    staging_dir = create_staging_dir(base_dir, keep_existing)
+    try:
+        yield staging_dir
+    except BaseException:
+        if not keep_existing:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    swap_into_place(staging_dir, base_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll a staged output directory back to its previous tree.")
+    parser.add_argument('base_dir', help="The live output directory")
+    args = parser.parse_args()
+
+    configure_logging(logging.INFO)
+    rollback(args.base_dir)
+    print(f"Rolled back {args.base_dir}; the tree it replaced is now {previous_path(args.base_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import re
+import time
+
+from .engine import page_layout, sanitize_and_clean_name
+from .plan import body_line_size, render_page, rendered_size
+from .scan import scan_outline
+
+# Bytes of a page with an empty title and no body lines
+_EMPTY_PAGE = rendered_size(render_page(page_layout({'FULLLINE': ''}), []))
+
+# A word character is never removed by sanitizing, so such a line always has content
+_WORD_RE = re.compile(r'\w')
+
+
+# Fields of an open node on the stack, kept in a list for speed
+_INDENT, _CHILDREN, _BRANCHES, _LEAF_BYTES, _BYTES = range(5)
+
+
+def _fan_out_bucket(children):
+    # 0, 1, 2-3, 4-7, ...: powers of two keep the histogram short for any outline
+    if children < 2:
+        return str(children)
+    low = 1 << (children.bit_length() - 1)
+    return f"{low}-{2 * low - 1}"
+
+
+def stats_chunks(chunks, allow_empty_folders=False, include_base=None):
+    """
+    Computes outline statistics in one pass without building the tree.
+
+    Nodes are told apart from body and blank lines exactly as categorize_lines
+    does, and only an indentation stack is kept, so memory follows the depth of
+    the outline rather than its size. Predictions follow create_structure into
+    an empty base directory: every node writes one page (index.md for a folder)
+    except the leaves skipped with `allow_empty_folders`. Pages overwritten by a
+    sibling with the same name are counted as written.
+
+    Args:
+        chunks (iterable): (lines, indent_levels) chunks, as OutlineScan.chunks yields.
+        allow_empty_folders (bool): Predict for create_structure with empty folders allowed.
+        include_base (str, optional): The directory include directives are resolved against.
+
+    Returns:
+        dict: 'Lines', 'Nodes', 'BodyLines', 'OrphanBodyLines' (before any node),
+        'MaxDepth', 'Depths' (nodes per depth, from depth 1), 'FanOut' (folders
+        per child-count bucket), 'TopLevel', 'MaxFanOut', 'Directories', 'Files',
+        'Skipped' and 'Bytes'.
+    """
+    lines_read = body_lines = orphan_body_lines = 0
+    directories = files = skipped = total_bytes = 0
+    depths = []
+    fan_out = {}
+    max_fan_out = 0
+
+    # Each open node is [indent, children, branches (children with children),
+    # bytes of its leaf children, bytes of its own page]
+    root = [-1, 0, 0, 0, 0]
+    stack = [root]
+
+    def close_to(indent_level):
+        # Pops the nodes a line at this indentation closes, as categorize_lines does
+        nonlocal directories, files, skipped, total_bytes, max_fan_out
+        while stack and stack[-1][_INDENT] >= indent_level:
+            node = stack.pop()
+            children = node[_CHILDREN]
+            if not children:
+                if stack:
+                    stack[-1][_LEAF_BYTES] += node[_BYTES]
+                continue
+            if node is not root:
+                directories += 1
+                files += 1
+                total_bytes += node[_BYTES]
+                bucket = _fan_out_bucket(children)
+                fan_out[bucket] = fan_out.get(bucket, 0) + 1
+                max_fan_out = max(max_fan_out, children)
+            leaves = children - node[_BRANCHES]
+            if not allow_empty_folders:
+                files += leaves
+                total_bytes += node[_LEAF_BYTES]
+            elif node[_BRANCHES]:
+                # Leaves next to a folder become folders themselves
+                directories += leaves
+                files += leaves
+                total_bytes += node[_LEAF_BYTES]
+            else:
+                skipped += leaves
+
+    sanitize = sanitize_and_clean_name
+    word = _WORD_RE.search
+    for lines, indents in chunks:
+        lines_read += len(lines)
+        for line, indent_level in zip(lines, indents):
+            if not line:
+                continue
+            if not word(line) and not sanitize(line).strip():
+                continue
+
+            if '**' in line:
+                if len(stack) == 1:
+                    orphan_body_lines += 1
+                else:
+                    body_lines += 1
+                    stack[-1][_BYTES] += body_line_size(line, include_base)
+                continue
+
+            if stack[-1][_INDENT] >= indent_level:
+                close_to(indent_level)
+            parent = stack[-1]
+            parent[_CHILDREN] += 1
+            if parent[_CHILDREN] == 1 and parent is not root:
+                stack[-2][_BRANCHES] += 1
+
+            depth = len(stack)
+            if depth > len(depths):
+                depths.append(0)
+            depths[depth - 1] += 1
+
+            size = len(line) if line.isascii() else len(line.encode('utf-8'))
+            if '"' in line:
+                size += line.count('"')  # escape_title adds a backslash per quote
+            stack.append([indent_level, 0, 0, 0, _EMPTY_PAGE + size])
+
+    close_to(-1)
+
+    return {'Lines': lines_read, 'Nodes': sum(depths), 'BodyLines': body_lines, 'OrphanBodyLines': orphan_body_lines,
+            'MaxDepth': len(depths), 'Depths': depths, 'TopLevel': root[_CHILDREN],
+            'MaxFanOut': max_fan_out,
+            'FanOut': dict(sorted(fan_out.items(), key=lambda item: int(item[0].split('-')[0]))),
+            'Directories': directories, 'Files': files, 'Skipped': skipped, 'Bytes': total_bytes}
+
+
+def outline_stats(source, allow_empty_folders=False):
+    """
+    Computes the statistics of an indented-list outline file, or '-' for stdin,
+    in a single streaming pass. See stats_chunks.
+    """
+    include_base = os.path.dirname(os.path.abspath(source)) if source != '-' else os.getcwd()
+    started = time.perf_counter()
+    with scan_outline(source) as scan:
+        report = stats_chunks(scan.chunks(), allow_empty_folders, include_base)
+    report['Seconds'] = time.perf_counter() - started
+    return report
+
+
+def format_stats(report):
+    """
+    Formats a statistics report as a few lines of text.
+    """
+    depths = ' '.join(f"{depth}:{count}" for depth, count in enumerate(report['Depths'], 1))
+    fan_out = ' '.join(f"{bucket}:{count}" for bucket, count in report['FanOut'].items())
+    return '\n'.join([
+        f"Lines: {report['Lines']}  Nodes: {report['Nodes']}  Body lines: {report['BodyLines']}"
+        + (f"  Body lines before any node: {report['OrphanBodyLines']}" if report['OrphanBodyLines'] else ""),
+        f"Depth: max {report['MaxDepth']}  nodes per depth {depths or '-'}",
+        f"Fan-out: {report['TopLevel']} top-level, max {report['MaxFanOut']}  folders by children {fan_out or '-'}",
+        f"Predicted: {report['Directories']} directories, {report['Files']} files, {report['Skipped']} skipped, "
+        f"{report['Bytes']} bytes",
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the shape of an outline and predict its conversion.")
+    parser.add_argument('input_file', help="The indented-list outline, '-' for stdin")
+    parser.add_argument('--allow-empty-folders', action='store_true', help="Predict with empty folders allowed")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = outline_stats(args.input_file, args.allow_empty_folders)
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(format_stats(report))
+        print(f"Scanned in {report['Seconds']:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import argparse
+import os
+import re
+import string
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .engine import configure_logging, escape_title, front_matter, page_title
+from .importers import load_outline
+
+# The layout create_structure writes, as a template
+STANDARD_TEMPLATE = "---\n{front_matter}---\n\n\n{body}"
+
+# Template file used for every level without its own, and the pattern for one level's
+DEFAULT_TEMPLATE_NAME = 'page.md'
+LEVEL_TEMPLATE_NAME = 'level-{}.md'
+
+# The fields a template can use, in the order render functions take them
+FIELDS = (
+    'title',         # The node's line as in the outline, see page_title
+    'name',          # The title without indentation and list marker
+    'quoted_title',  # The title as a double-quoted YAML string
+    'keys',          # The id, slug and sidebar_position lines from assign_doc_keys, or ''
+    'front_matter',  # The front matter create_structure writes, keys included
+    'depth',         # 1 for top-level nodes
+    'position',      # The node's place among its siblings, from 1
+    'children',      # The number of child nodes
+    'parent',        # The parent's name, '' at the top level
+    'id',            # The unique ID
+)
+
+BODY_FIELD = 'body'
+
+# List markers in front of a title, as links.title_key removes them
+_MARKER_RE = re.compile(r'^\s*(?:[-*+]|\d+[.)])?\s*')
+
+# Nodes handed to a worker process at a time
+CHUNK_SIZE = 2048
+
+
+def compile_template(text, name='<template>'):
+    """
+    Compiles a page template into a render function.
+
+    A template is Markdown with `{field}` placeholders, using the names in
+    FIELDS, and `{body}` where the body lines go. Format specs and conversions
+    work as in str.format, e.g. `{position:03d}`, and `{{` and `}}` stand for
+    braces. Without `{body}` the body lines go at the end.
+
+    The template is turned into the source of one function returning a pair of
+    f-strings and compiled once, so rendering a node costs one call, without
+    parsing the template or looking fields up by name.
+
+    Args:
+        text (str): The template.
+        name (str): Where the template came from, for error messages.
+
+    Returns:
+        function: render(*fields) -> (head, tail), the text before and after
+        the body lines, taking the values of FIELDS in order.
+
+    Raises:
+        ValueError: The template uses an unknown field, puts `{body}` in more
+        than once, or has a malformed placeholder.
+    """
+    try:
+        parsed = list(string.Formatter().parse(text))
+    except ValueError as e:
+        raise ValueError(f"{name}: {e}") from None
+
+    parts = [[], []]  # Python source of the head and of the tail
+    side = 0
+    for literal, field, spec, conversion in parsed:
+        if literal:
+            parts[side].append(repr(literal))
+        if field is None:
+            continue
+        if field == BODY_FIELD:
+            if side or spec or conversion:
+                raise ValueError(f"{name}: {{body}} must appear once, without a format spec or conversion")
+            side = 1
+            continue
+        if field not in FIELDS:
+            raise ValueError(f"{name}: unknown field {{{field}}}; use {{body}} or one of {', '.join(FIELDS)}")
+        if any(c in '{}\'"\\' or c < ' ' or c == '\x7f' for c in spec) or (conversion and conversion not in 'rsa'):
+            raise ValueError(f"{name}: unsupported format spec or conversion in {{{field}}}")
+        placeholder = field + (f"!{conversion}" if conversion else '') + (f":{spec}" if spec else '')
+        parts[side].append(f"f'{{{placeholder}}}'")
+
+    source = (f"def render({', '.join(FIELDS)}):\n"
+              f"    return ({' '.join(parts[0]) or repr('')}, {' '.join(parts[1]) or repr('')})\n")
+    try:
+        code = compile(source, name, 'exec')
+    except SyntaxError as e:
+        raise ValueError(f"{name}: malformed placeholder: {e.msg}") from None
+    namespace = {}
+    exec(code, namespace)
+    return namespace['render']
+
+
+def load_templates(directory):
+    """
+    Reads the page templates in a directory: DEFAULT_TEMPLATE_NAME for every
+    level and 'level-1.md', 'level-2.md', ... for the pages of one depth.
+
+    Returns:
+        dict: {depth, or None for the default: template text}.
+    """
+    templates = {}
+    for file_name in sorted(os.listdir(directory)):
+        if file_name == DEFAULT_TEMPLATE_NAME:
+            level = None
+        elif file_name.startswith('level-') and file_name.endswith('.md') and file_name[6:-3].isdigit():
+            level = int(file_name[6:-3])
+        else:
+            continue
+        with open(os.path.join(directory, file_name), encoding='utf-8') as f:
+            templates[level] = f.read()
+    return templates
+
+
+def compile_templates(templates):
+    """
+    Compiles the templates load_templates returns, keeping their keys.
+    """
+    return {level: compile_template(text, LEVEL_TEMPLATE_NAME.format(level) if level else DEFAULT_TEMPLATE_NAME)
+            for level, text in templates.items()}
+
+
+def _template_fields(root, levels):
+    # (node, level, field values) for every node that has a template
+    default = None in levels
+    result = []
+    pending = [(root, 0, '')]
+    while pending:
+        node, depth, parent_name = pending.pop()
+        depth += 1
+        children = node.get('Children', [])
+        for position, child in enumerate(children, 1):
+            title = page_title(child)
+            name = _MARKER_RE.sub('', title, count=1).strip()
+            if depth in levels or default:
+                keys = child.get('FrontMatter', '')
+                quoted_title = escape_title(title)[7:-1]  # Without 'title: ' and the newline
+                fields = (title, name, quoted_title, keys, front_matter(child), depth, position,
+                          len(child['Children']), parent_name, child['UniqueID'])
+                result.append((child, depth if depth in levels else None, fields))
+            if child['Children']:
+                pending.append((child, depth, name))
+    return result
+
+
+_worker_templates = None
+
+
+def _start_worker(templates):
+    global _worker_templates
+    _worker_templates = compile_templates(templates)
+
+
+def _render_chunk(chunk):
+    return [_worker_templates[level](*fields) for level, fields in chunk]
+
+
+def apply_templates(root, templates, processes=None):
+    """
+    Renders the layout of every page from the templates once, before writing,
+    and stores it in the node's 'Layout', which page_layout returns to every
+    writer. Nodes at a depth without a template, when there is no default,
+    keep the standard layout.
+
+    Body lines are not part of the layout; they are written between its head
+    and tail as usual, so links, includes and '**' removal still apply to them.
+    Run assign_doc_keys first for the `{keys}` field to be filled.
+
+    Args:
+        root (dict): The tree from categorize_lines or an importer. It is modified.
+        templates (dict): {depth, or None for the default: template text}, see load_templates.
+        processes (int, optional): Render in a pool of this many processes, each
+            compiling the templates once. Only worth it for very large outlines
+            on many cores; for a few fields per page one process is faster than
+            shipping the results back.
+
+    Returns:
+        int: The number of nodes given a layout.
+    """
+    compiled = compile_templates(templates)  # Also reports template errors before any worker starts
+    work = _template_fields(root, set(compiled))
+    if processes and processes > 1 and len(work) > CHUNK_SIZE:
+        chunks = [[(level, fields) for _, level, fields in work[start:start + CHUNK_SIZE]]
+                  for start in range(0, len(work), CHUNK_SIZE)]
+        with ProcessPoolExecutor(processes, initializer=_start_worker, initargs=(templates,)) as executor:
+            layouts = [layout for rendered in executor.map(_render_chunk, chunks) for layout in rendered]
+    else:
+        layouts = [compiled[level](*fields) for _, level, fields in work]
+    for (node, _, _), layout in zip(work, layouts):
+        node['Layout'] = layout
+    return len(work)
+
+
+def clear_templates(root):
+    """
+    Removes the layouts apply_templates stored in a tree.
+    """
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        for child in node.get('Children', []):
+            child.pop('Layout', None)
+            pending.append(child)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check page templates and time rendering them for an outline.")
+    parser.add_argument('templates_dir', help="The folder with page.md and level-N.md templates")
+    parser.add_argument('input_file', nargs='?', help="An outline to render the templates for")
+    parser.add_argument('--processes', type=int, help="Render in a pool of this many processes")
+    parser.add_argument('--show', type=int, default=0, help="Print the layout of the first this many pages")
+    args = parser.parse_args()
+
+    configure_logging()
+
+    templates = load_templates(args.templates_dir)
+    compile_templates(templates)
+    names = [LEVEL_TEMPLATE_NAME.format(level) if level else DEFAULT_TEMPLATE_NAME for level in templates]
+    print(f"Templates: {', '.join(names) or 'none'}")
+    if args.input_file is None:
+        return
+
+    root = load_outline(args.input_file)
+    started = time.perf_counter()
+    count = apply_templates(root, templates, args.processes)
+    print(f"Rendered {count} layouts in {time.perf_counter() - started:.2f} seconds")
+    pending = list(reversed(root.get('Children', [])))
+    shown = 0
+    while pending and shown < args.show:
+        node = pending.pop()
+        pending.extend(reversed(node['Children']))
+        if 'Layout' in node:
+            head, tail = node['Layout']
+            print(f"--- {node['FULLLINE'].strip()}\n{head}[body]\n{tail}")
+            shown += 1
+
+
+if __name__ == "__main__":
+    main()